@@ -0,0 +1,93 @@
+import logging
+from enum import Enum
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.core.admin import require_admin
+from app.core.config import settings
+from app.core.profiler import profile_in_progress, profile_worker
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+class ProfileFormat(str, Enum):
+    """Output formats of the profiler endpoint."""
+    REPORT = "report"
+    COLLAPSED = "collapsed"
+    SPEEDSCOPE = "speedscope"
+
+
+@router.get(
+    "/admin/profile",
+    status_code=status.HTTP_200_OK,
+    summary="Profile Worker",
+    description=(
+        "Samples the stacks of the worker serving this request for a number of seconds and reports "
+        "event loop lag and slow callbacks. Disabled unless PROFILER_ENABLED and ADMIN_TOKEN are set."
+    ),
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+)
+async def profile(
+    seconds: float = Query(default=10.0, gt=0, description="How long to sample."),
+    format: ProfileFormat = Query(default=ProfileFormat.REPORT, description="report, collapsed or speedscope."),
+    interval_ms: float = Query(default=5.0, ge=1, le=1000, description="Sampling interval in milliseconds."),
+    slow_callback_ms: float | None = Query(default=None, gt=0, description="Slow callback threshold (default PROFILER_SLOW_CALLBACK_MS)."),
+    include_idle: bool = Query(default=False, description="Keep samples of threads waiting in select/poll/locks."),
+):
+    """
+    Profile the worker that serves this request.
+
+    With several workers, each request profiles only one of them; repeat the call
+    to cover others. The formats are:
+
+    - `report`: JSON with the collapsed stacks and the event loop report.
+    - `collapsed`: `thread;frame;...;frame count` lines for flamegraph.pl, inferno or speedscope.
+    - `speedscope`: a speedscope JSON document (one profile per thread).
+
+    For the raw formats, the event loop summary is returned in `X-Event-Loop-*` headers.
+
+    Args:
+        seconds: Capture duration, at most PROFILER_MAX_SECONDS.
+        format: The output format.
+        interval_ms: Sampling interval.
+        slow_callback_ms: Callbacks blocking the loop longer than this are reported.
+        include_idle: Whether to keep samples of idle threads.
+
+    Raises:
+        HTTPException 404: If the profiler (or admin access) is disabled.
+        HTTPException 403: If the admin token is missing or wrong.
+        HTTPException 409: If a capture is already running on this worker.
+        HTTPException 422: If `seconds` exceeds PROFILER_MAX_SECONDS.
+    """
+    if not settings.PROFILER_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if seconds > settings.PROFILER_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"seconds must be at most {settings.PROFILER_MAX_SECONDS}.",
+        )
+    if profile_in_progress():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already being captured.")
+
+    logger.info(f"Profiling worker for {seconds}s at {interval_ms}ms intervals")
+    profiler, loop_report = await profile_worker(
+        seconds,
+        interval=interval_ms / 1000,
+        slow_callback_ms=slow_callback_ms or settings.PROFILER_SLOW_CALLBACK_MS,
+        include_idle=include_idle,
+    )
+    if format == ProfileFormat.REPORT:
+        return {"event_loop": loop_report, "collapsed": profiler.collapsed()}
+
+    headers = {
+        "X-Event-Loop-Lag-Max-Ms": str(loop_report["lag"]["max_ms"]),
+        "X-Event-Loop-Lag-P99-Ms": str(loop_report["lag"]["p99_ms"]),
+        "X-Event-Loop-Slow-Callbacks": str(len(loop_report["slow_callbacks"]) + loop_report["slow_callbacks_dropped"]),
+    }
+    if format == ProfileFormat.COLLAPSED:
+        return PlainTextResponse(profiler.collapsed(), headers=headers)
+    headers["Content-Disposition"] = 'attachment; filename="profile.speedscope.json"'
+    return JSONResponse(profiler.speedscope(), headers=headers)
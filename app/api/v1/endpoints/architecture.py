@@ -1,10 +1,29 @@
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timezone
 
-from app.schemas.architecture import ArchitectureRequest, ArchitectureResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+
+from app.core.admin import require_admin
+from app.core.config import settings
+from app.core.http_cache import etag_matches, strong_etag
+from app.core.rate_limit import enforce_rate_limit
+from app.schemas.architecture import (
+    ArchitectureExportFormat,
+    ArchitectureRefineRequest,
+    ArchitectureRefineResponse,
+    ArchitectureRequest,
+    ArchitectureResponse,
+)
+from app.services.architecture_export import MEDIA_TYPES, export_architectures
 from app.services.architecture_service import ArchitectureService
+from app.services.architecture_store import ArchitectureStore, get_architecture_store
+from app.services.diagram_service import DiagramRenderer, get_diagram_renderer
+from app.services.refinement import diff_architectures, merge_constraints
 from app.core.exceptions import (
     ArchitectureGenerationError,
+    ArchitectureNotFoundError,
+    DeadlineExceededError,
     OpenAIServiceError,
     ParsingError,
     ServiceError,
@@ -20,10 +39,12 @@ logger = logging.getLogger(__name__)
     summary="Generate Software Architecture",
     description="Generates a software architecture based on a prompt, project type, and constraints using an AI model.",
     tags=["Architecture"],
+    dependencies=[Depends(enforce_rate_limit)],
 )
 async def generate_architecture(
     request: ArchitectureRequest,
-    service: ArchitectureService = Depends(ArchitectureService)
+    service: ArchitectureService = Depends(ArchitectureService),
+    store: ArchitectureStore = Depends(get_architecture_store),
 ):
     """
     Asynchronously generates software architecture based on user input using the ArchitectureService.
@@ -39,13 +60,15 @@ async def generate_architecture(
     Args:
         request: The request body containing prompt, project_type, and constraints.
         service: The injected asynchronous ArchitectureService instance.
+        store: The injected ArchitectureStore used to persist the result.
 
     Returns:
         An ArchitectureResponse containing the generated architecture diagram (Mermaid),
-        description, and recommendations.
+        description, recommendations, and the ID it was stored under.
 
     Raises:
         HTTPException 503: If the AI service (OpenAI) is unavailable or errors out.
+        HTTPException 504: If the request deadline (X-Request-Timeout) expires first.
         HTTPException 500: If the AI response cannot be parsed or validated.
         HTTPException 500: If there's an unexpected error during generation.
         HTTPException 500: If the ArchitectureService fails to initialize (e.g., config error).
@@ -58,8 +81,20 @@ async def generate_architecture(
             project_type=request.project_type,
             constraints=request.constraints,
         )
-        logger.info("Successfully generated architecture.")
-        return architecture
+        record = await store.save(
+            prompt=request.prompt,
+            project_type=request.project_type,
+            constraints=request.constraints,
+            architecture=architecture,
+        )
+        logger.info(f"Successfully generated architecture {record.id}.")
+        return record.architecture
+    except DeadlineExceededError as e:
+        logger.warning(f"Architecture generation exceeded its deadline: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e)
+        )
     except OpenAIServiceError as e:
         logger.error(f"OpenAI service error during generation: {e}", exc_info=True)
         raise HTTPException(
@@ -90,3 +125,274 @@ async def generate_architecture(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected internal server error occurred."
         )
+
+
+@router.get(
+    "/architectures/export",
+    status_code=status.HTTP_200_OK,
+    summary="Export Architectures",
+    description="Streams stored architectures, oldest first, as NDJSON or CSV, optionally filtered by project type and creation time. Requires the admin token.",
+    tags=["Architecture"],
+    response_class=StreamingResponse,
+    # A bulk download of every stored architecture is an operator action.
+    dependencies=[Depends(require_admin), Depends(enforce_rate_limit)],
+)
+async def export_architectures_endpoint(
+    format: ArchitectureExportFormat = ArchitectureExportFormat.NDJSON,
+    project_type: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    batch_size: int | None = Query(default=None, ge=1, description="Rows read per query (default EXPORT_BATCH_SIZE)."),
+    store: ArchitectureStore = Depends(get_architecture_store),
+):
+    """
+    Export stored architectures for analytics.
+
+    Records are read from the store in batches through an async cursor and written
+    to the response as they arrive, so server memory is bounded by the batch size
+    however many architectures match.
+
+    Args:
+        format: `ndjson` (one ArchitectureExportRecord per line, default) or `csv`.
+        project_type: Only export architectures of this project type.
+        start: Only export architectures created at or after this time (naive values are UTC).
+        end: Only export architectures created before this time.
+        batch_size: Rows read per query, at most EXPORT_MAX_BATCH_SIZE.
+        store: The injected ArchitectureStore.
+
+    Returns:
+        StreamingResponse: The matching architectures, as an attachment.
+
+    Raises:
+        HTTPException 404: If no admin token is configured.
+        HTTPException 403: If the X-Admin-Token header is missing or wrong.
+        HTTPException 422: If the range is empty or batch_size exceeds EXPORT_MAX_BATCH_SIZE.
+        HTTPException 429: If the client exceeded its rate limit.
+    """
+    start, end = (
+        value.replace(tzinfo=timezone.utc) if value is not None and value.tzinfo is None else value
+        for value in (start, end)
+    )
+    if start and end and start >= end:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="start must be before end.")
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    if batch_size > settings.EXPORT_MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"batch_size must be at most {settings.EXPORT_MAX_BATCH_SIZE}.",
+        )
+
+    logger.info(f"Exporting architectures as {format.value} (project_type={project_type}, start={start}, end={end})")
+    blocks = export_architectures(store, format, project_type, start, end, batch_size)
+    return StreamingResponse(
+        blocks,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="architectures.{format.value}"'},
+    )
+
+
+@router.get(
+    "/architecture/{architecture_id}",
+    response_model=ArchitectureResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get Architecture",
+    description="Returns a previously generated architecture by its ID. Supports conditional requests via ETag / If-None-Match.",
+    tags=["Architecture"],
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "The client's cached copy is current."}},
+)
+async def get_architecture(
+    architecture_id: str,
+    request: Request,
+    response: Response,
+    store: ArchitectureStore = Depends(get_architecture_store),
+):
+    """
+    Fetches a stored architecture.
+
+    The response carries a strong ETag derived from the stored content hash. A request
+    whose If-None-Match matches it is answered with an empty 304 Not Modified.
+
+    Args:
+        architecture_id: The ID returned when the architecture was generated.
+        request: The incoming request, for its If-None-Match header.
+        response: The outgoing response, for the ETag and Cache-Control headers.
+        store: The injected ArchitectureStore.
+
+    Returns:
+        The stored ArchitectureResponse, or an empty 304 response.
+
+    Raises:
+        HTTPException 404: If no architecture exists with the given ID.
+        HTTPException 500: If the store cannot be read.
+    """
+    try:
+        record = await store.get(architecture_id)
+        etag = strong_etag(record.content_hash)
+        # Clients may reuse their copy, but must revalidate it first.
+        cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+        response.headers.update(cache_headers)
+        return record.architecture
+    except ArchitectureNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ServiceError as e:
+        logger.error(f"Failed to load architecture {architecture_id}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to load architecture: {e}"
+        )
+
+
+@router.get(
+    "/architecture/{architecture_id}/diagram.svg",
+    response_class=Response,
+    status_code=status.HTTP_200_OK,
+    summary="Get Architecture Diagram",
+    description="Returns the architecture's Mermaid flowchart rendered server-side as SVG. Supports ETag / If-None-Match.",
+    tags=["Architecture"],
+    responses={
+        status.HTTP_200_OK: {"content": {"image/svg+xml": {}}},
+        status.HTTP_304_NOT_MODIFIED: {"description": "The client's cached copy is current."},
+    },
+)
+async def get_architecture_diagram(
+    architecture_id: str,
+    request: Request,
+    store: ArchitectureStore = Depends(get_architecture_store),
+    renderer: DiagramRenderer = Depends(get_diagram_renderer),
+):
+    """
+    Renders a stored architecture's diagram as SVG.
+
+    Renders are cached by diagram hash, so repeat views (and identical diagrams of
+    different architectures) are served without re-running the layout.
+
+    Args:
+        architecture_id: The ID returned when the architecture was generated.
+        request: The incoming request, for its If-None-Match header.
+        store: The injected ArchitectureStore.
+        renderer: The injected DiagramRenderer.
+
+    Returns:
+        An image/svg+xml response, or an empty 304 response.
+
+    Raises:
+        HTTPException 404: If no architecture exists with the given ID.
+        HTTPException 500: If the store cannot be read.
+    """
+    try:
+        record = await store.get(architecture_id)
+    except ArchitectureNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ServiceError as e:
+        logger.error(f"Failed to load architecture {architecture_id}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to load architecture: {e}"
+        )
+
+    svg, rendered_hash = await renderer.render(record.architecture.architecture_diagram)
+    etag = strong_etag(rendered_hash)
+    cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+    return Response(content=svg, media_type="image/svg+xml", headers=cache_headers)
+
+
+@router.post(
+    "/architecture/{architecture_id}/refine",
+    response_model=ArchitectureRefineResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Refine Architecture",
+    description="Derives a new version of a stored architecture from a delta (constraint changes and/or an instruction) by asking the AI model for a patch instead of a full regeneration.",
+    tags=["Architecture"],
+    dependencies=[Depends(enforce_rate_limit)],
+)
+async def refine_architecture(
+    architecture_id: str,
+    request: ArchitectureRefineRequest,
+    service: ArchitectureService = Depends(ArchitectureService),
+    store: ArchitectureStore = Depends(get_architecture_store),
+):
+    """
+    Refines a stored architecture incrementally.
+
+    Only a compact view of the current version is sent to the model, which replies
+    with diagram, description and recommendation edits that are applied server-side.
+    The result is stored as a new version linked to its parent.
+
+    Args:
+        architecture_id: The architecture to refine.
+        request: The constraint changes and/or follow-up instruction.
+        service: The injected asynchronous ArchitectureService instance.
+        store: The injected ArchitectureStore.
+
+    Returns:
+        An ArchitectureRefineResponse with the new version and its structural diff.
+
+    Raises:
+        HTTPException 404: If no architecture exists with the given ID.
+        HTTPException 422: If the request contains no changes.
+        HTTPException 503: If the AI service (OpenAI) is unavailable or errors out.
+        HTTPException 504: If the request deadline (X-Request-Timeout) expires first.
+        HTTPException 500: If the AI patch cannot be parsed or another error occurs.
+    """
+    if not (request.add_constraints or request.remove_constraints or (request.instruction or "").strip()):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="A refinement needs added or removed constraints, or an instruction."
+        )
+    try:
+        parent = await store.get(architecture_id)
+        constraints = merge_constraints(parent.constraints, request.add_constraints, request.remove_constraints)
+        refined = await service.refine(
+            architecture=parent.architecture,
+            project_type=parent.project_type,
+            constraints=constraints,
+            added=request.add_constraints,
+            removed=request.remove_constraints,
+            instruction=request.instruction,
+        )
+        prompt = parent.prompt
+        if request.instruction:
+            prompt += f"\n\nRefinement: {request.instruction.strip()}"
+        record = await store.save(
+            prompt=prompt,
+            project_type=parent.project_type,
+            constraints=constraints,
+            architecture=refined,
+            parent_id=parent.id,
+            version=parent.version + 1,
+        )
+        logger.info(f"Refined architecture {parent.id} into {record.id} (version {record.version}).")
+        return ArchitectureRefineResponse(
+            architecture=record.architecture,
+            parent_id=parent.id,
+            version=record.version,
+            constraints=constraints,
+            diff=diff_architectures(parent.architecture, refined),
+        )
+    except ArchitectureNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except DeadlineExceededError as e:
+        logger.warning(f"Architecture refinement exceeded its deadline: {e}")
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except OpenAIServiceError as e:
+        logger.error(f"OpenAI service error during refinement: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Error communicating with AI service: {e}"
+        )
+    except ParsingError as e:
+        logger.error(f"Parsing error during refinement: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to process AI response: {e}"
+        )
+    except ServiceError as e:
+        logger.error(f"Architecture refinement failed: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to refine architecture: {e}"
+        )
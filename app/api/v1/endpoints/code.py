@@ -1,16 +1,34 @@
+import json
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 
 # Import schemas
-from app.schemas.code import CodeGenerationRequest, CodeGenerationResponse
+from app.schemas.code import (
+    ArchitectureCodeGenerationRequest,
+    CodeGenerationRequest,
+    CodeGenerationResponse,
+)
 
 # Import services and exceptions (Define specific exceptions later if needed)
-from app.services.code_service import generate_code_service
+from app.core.config import settings
+from app.core.model_routes import calls_model
+from app.core.rate_limit import enforce_rate_limit
+from app.core.exceptions import ArchitectureNotFoundError, CodeGenerationError
+from app.services.architecture_store import ArchitectureStore, get_architecture_store
+from app.services.artifact_cache import ArtifactCache, get_artifact_cache
+from app.services.code_service import (
+    build_code_generation_plan,
+    generate_architecture_code,
+    generate_code_service,
+    generate_component_cached,
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 # Dependency for the service
+@calls_model
 def get_code_service():
     return generate_code_service
 
@@ -21,17 +39,25 @@ def get_code_service():
     summary="Generate Code Component",
     description="Generates code, documentation, and tests for a specific component based on a generated architecture.",
     tags=["Code"],
+    dependencies=[Depends(enforce_rate_limit)],
 )
 async def generate_code(
     request: CodeGenerationRequest,
     service: callable = Depends(get_code_service),
+    store: ArchitectureStore = Depends(get_architecture_store),
+    cache: ArtifactCache | None = Depends(get_artifact_cache),
 ):
     """
     Generate code for a specific component based on architecture.
 
+    Results for stored architectures go through the artifact cache, so regenerating
+    an unchanged component does not cost another model call.
+
     Args:
         request (CodeGenerationRequest): Request details including architecture ID and component name.
         service (callable): Injected code generation service.
+        store (ArchitectureStore): Injected architecture persistence.
+        cache (ArtifactCache | None): Injected artifact cache, None when disabled.
 
     Returns:
         CodeGenerationResponse: Generated code, documentation, and tests.
@@ -42,12 +68,23 @@ async def generate_code(
     """
     try:
         logger.info(f"Received code generation request: {request.dict()}")
-        code_data = await service(
+        try:
+            record = await store.get(request.architecture_id)
+        except ArchitectureNotFoundError:
+            # IDs are not validated yet; generate without caching.
+            record, cache = None, None
+        code_data, cached = await generate_component_cached(
+            service,
+            cache,
+            architecture_hash=record.content_hash if record else "",
             architecture_id=request.architecture_id,
             component_name=request.component_name,
             programming_language=request.programming_language,
         )
-        logger.info(f"Successfully generated code for component '{request.component_name}'.")
+        logger.info(
+            f"Successfully generated code for component '{request.component_name}'"
+            f"{' (cached)' if cached else ''}."
+        )
         return code_data
     except Exception as e:
         logger.exception("An unexpected error occurred during code generation.")
@@ -55,3 +92,67 @@ async def generate_code(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An internal server error occurred during code generation.",
         )
+
+
+@router.post(
+    "/generate_architecture_code",
+    status_code=status.HTTP_200_OK,
+    summary="Generate Code For Whole Architecture",
+    description=(
+        "Generates code for every component of a stored architecture in dependency order, "
+        "streaming progress events as newline-delimited JSON."
+    ),
+    tags=["Code"],
+    response_class=StreamingResponse,
+    dependencies=[Depends(enforce_rate_limit)],
+)
+async def generate_architecture_code_endpoint(
+    request: ArchitectureCodeGenerationRequest,
+    service: callable = Depends(get_code_service),
+    store: ArchitectureStore = Depends(get_architecture_store),
+    cache: ArtifactCache | None = Depends(get_artifact_cache),
+):
+    """
+    Generate code for all components of an architecture, streamed as NDJSON.
+
+    Components are extracted from the stored Mermaid diagram and generated in
+    topological waves, so each component sees the interfaces of its dependencies.
+
+    Args:
+        request (ArchitectureCodeGenerationRequest): Architecture ID, language and parallelism.
+        service (callable): Injected per-component code generation service.
+        store (ArchitectureStore): Injected architecture persistence.
+        cache (ArtifactCache | None): Injected artifact cache, None when disabled.
+
+    Returns:
+        StreamingResponse: One JSON event per line (plan, component progress, completed).
+
+    Raises:
+        HTTPException (404): If the architecture ID does not exist.
+        HTTPException (422): If the architecture has no components to generate.
+    """
+    try:
+        record = await store.get(request.architecture_id)
+        plan = build_code_generation_plan(record)
+    except ArchitectureNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except CodeGenerationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    logger.info(
+        f"Generating code for {len(plan.components)} components of architecture "
+        f"'{request.architecture_id}' in {len(plan.waves)} waves."
+    )
+    events = generate_architecture_code(
+        plan,
+        programming_language=request.programming_language,
+        max_concurrency=request.max_concurrency or settings.CODE_GENERATION_MAX_CONCURRENCY,
+        generate_component=service,
+        cache=cache,
+    )
+
+    async def ndjson():
+        async for event in events:
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
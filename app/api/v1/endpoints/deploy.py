@@ -1,7 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
 import logging
-from app.schemas.deploy import DeploymentRequest, DeploymentResponse
-from app.services.deploy_service import deploy_service
+from app.core.broker import SubscriptionClosed
+from app.core.config import settings
+from app.schemas.deploy import (
+    DeploymentRequest,
+    DeploymentResponse,
+    DeploymentResumeRequest,
+    DeploymentStatusResponse,
+)
+from app.services.deploy_service import (
+    deploy_service,
+    get_deployment_status_service,
+    resume_deployment_service,
+    subscribe_deployment_events_service,
+)
+from app.core.exceptions import (
+    ArchitectureNotFoundError,
+    DeploymentError,
+    DeploymentNotFoundError,
+    DeploymentStateError,
+    UnsupportedDeploymentTargetError,
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -9,10 +31,23 @@ logger = logging.getLogger(__name__)
 def get_deploy_service():
     return deploy_service
 
+def get_deployment_status():
+    return get_deployment_status_service
+
+def get_resume_deployment_service():
+    return resume_deployment_service
+
+def get_deployment_events_service():
+    return subscribe_deployment_events_service
+
+def _sse(event: str, data: dict) -> str:
+    """Formats one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @router.post(
     "/deploy",
     response_model=DeploymentResponse,
-    status_code=status.HTTP_202_ACCEPTED,  
+    status_code=status.HTTP_202_ACCEPTED,
     summary="Deploy Architecture",
     description="Initiates the deployment of a generated architecture to a specified target.",
     tags=["Deployment"],
@@ -29,11 +64,13 @@ async def deploy_architecture(
         service (callable): Injected deployment service.
 
     Returns:
-        DeploymentResponse: Status of the deployment initiation.
+        DeploymentResponse: Status of the deployment initiation, including the deployment ID.
 
     Raises:
+        HTTPException (404): If the architecture ID does not exist.
+        HTTPException (501): If the deployment target is not supported yet.
+        HTTPException (422): If the architecture cannot be deployed.
         HTTPException (500): If an unexpected error occurs.
-        # Add specific exceptions later (e.g., 400 for bad config, 404 for arch ID)
     """
     try:
         logger.info(f"Received deployment request: {request.dict()}")
@@ -44,9 +81,139 @@ async def deploy_architecture(
         )
         logger.info(f"Deployment initiated for architecture '{request.architecture_id}' to {request.target.value}.")
         return deployment_status
+    except ArchitectureNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except UnsupportedDeploymentTargetError as e:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+    except DeploymentError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
     except Exception as e:
         logger.exception("An unexpected error occurred during deployment initiation.")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An internal server error occurred during deployment.",
         )
+
+@router.get(
+    "/deploy/{deployment_id}",
+    response_model=DeploymentStatusResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get Deployment Status",
+    description="Returns the status of a deployment with a per-stage timing breakdown.",
+    tags=["Deployment"],
+)
+async def get_deployment(
+    deployment_id: str,
+    service: callable = Depends(get_deployment_status),
+):
+    """
+    Get the status of a deployment.
+
+    Args:
+        deployment_id (str): The ID returned when the deployment was initiated.
+        service (callable): Injected deployment status service.
+
+    Returns:
+        DeploymentStatusResponse: Overall, per-stage and per-resource status.
+
+    Raises:
+        HTTPException (404): If the deployment does not exist.
+    """
+    try:
+        return await service(deployment_id)
+    except DeploymentNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+@router.post(
+    "/deploy/{deployment_id}/resume",
+    response_model=DeploymentStatusResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Resume Deployment",
+    description="Resumes a failed deployment from the stage that failed, keeping completed work.",
+    tags=["Deployment"],
+)
+async def resume_deployment(
+    deployment_id: str,
+    request: DeploymentResumeRequest | None = None,
+    service: callable = Depends(get_resume_deployment_service),
+):
+    """
+    Resume a failed deployment.
+
+    Args:
+        deployment_id (str): The deployment to resume.
+        request (DeploymentResumeRequest | None): Optional configuration overrides.
+        service (callable): Injected resume service.
+
+    Returns:
+        DeploymentStatusResponse: The deployment status after restarting it.
+
+    Raises:
+        HTTPException (404): If the deployment does not exist.
+        HTTPException (409): If the deployment has not failed.
+    """
+    try:
+        return await service(deployment_id, request.configuration if request else {})
+    except DeploymentNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except DeploymentStateError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+@router.get(
+    "/deploy/{deployment_id}/events",
+    status_code=status.HTTP_200_OK,
+    summary="Stream Deployment Progress",
+    description=(
+        "Streams stage transitions, resource updates, log lines and timings of a deployment "
+        "as server-sent events. The first event is a full status snapshot."
+    ),
+    tags=["Deployment"],
+    response_class=StreamingResponse,
+)
+async def deployment_events(
+    deployment_id: str,
+    service: callable = Depends(get_deployment_events_service),
+):
+    """
+    Stream live progress of a deployment as server-sent events (text/event-stream).
+
+    Slow clients never hold up the deployment: their buffer drops the oldest events
+    and a `lagged` event reports how many were missed. The stream ends when the
+    deployment succeeds or fails.
+
+    Args:
+        deployment_id (str): The deployment to follow.
+        service (callable): Injected subscription service.
+
+    Returns:
+        StreamingResponse: `snapshot`, `deployment`, `stage`, `resource`, `log` and `lagged` events.
+
+    Raises:
+        HTTPException (404): If the deployment does not exist.
+    """
+    try:
+        snapshot, subscription = service(deployment_id)
+    except DeploymentNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    async def stream():
+        try:
+            yield _sse("snapshot", snapshot.model_dump(mode="json"))
+            while subscription is not None:
+                try:
+                    message = await subscription.get(timeout=settings.SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                except SubscriptionClosed:
+                    break
+                yield _sse(message["type"], message)
+        finally:
+            if subscription is not None:
+                subscription.unsubscribe()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
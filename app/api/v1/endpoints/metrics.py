@@ -0,0 +1,51 @@
+import logging
+from fastapi import APIRouter, Depends, status
+
+from app.core.admin import require_admin
+from app.core.metrics import metrics
+from app.services.semantic_cache import get_semantic_cache
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get(
+    "/metrics",
+    status_code=status.HTTP_200_OK,
+    summary="Get Metrics",
+    description="Returns a snapshot of the in-process counters, gauges and histograms of this worker.",
+    tags=["Metrics"],
+)
+async def get_metrics():
+    """
+    Return the current metrics snapshot of this worker process.
+
+    Returns:
+        dict: `counters`, `gauges` and `histograms` keyed by metric name and labels.
+    """
+    return metrics.snapshot()
+
+
+@router.get(
+    "/metrics/semantic_cache/samples",
+    status_code=status.HTTP_200_OK,
+    summary="Get Semantic Cache Samples",
+    description="Returns a sample of recent semantic cache hits (prompt, matched prompt, similarity) for false-positive review. Requires the admin token.",
+    tags=["Metrics"],
+    # Samples contain other users' prompts.
+    dependencies=[Depends(require_admin)],
+)
+async def get_semantic_cache_samples():
+    """
+    Return the sampled semantic cache hits of this worker process.
+
+    Returns:
+        dict: `enabled`, the similarity `threshold` and the sampled hits, newest last.
+
+    Raises:
+        HTTPException 404: If no admin token is configured.
+        HTTPException 403: If the X-Admin-Token header is missing or wrong.
+    """
+    cache = get_semantic_cache()
+    if cache is None:
+        return {"enabled": False, "threshold": None, "samples": []}
+    return {"enabled": True, "threshold": cache.threshold, "samples": list(cache.samples)}
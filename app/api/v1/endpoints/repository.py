@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import os
+import tempfile
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+
+from app.core.config import settings
+from app.core.exceptions import (
+    DeadlineExceededError,
+    OpenAIServiceError,
+    ParsingError,
+    RepositoryAnalysisError,
+    RepositoryTooLargeError,
+    ServiceError,
+)
+from app.core.model_routes import model_call_timeout
+from app.core.rate_limit import enforce_rate_limit
+from app.schemas.architecture import ArchitectureResponse
+from app.services.architecture_service import ArchitectureService
+from app.services.architecture_store import ArchitectureStore, get_architecture_store
+from app.services.artifact_cache import ArtifactCache, get_artifact_cache
+from app.services.repository_service import extract_archive, get_repository_analyzer, resolve_local_path
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+UPLOAD_READ_BYTES = 1024 * 1024
+
+
+async def _save_upload(upload: UploadFile, path: str) -> None:
+    """Copies an upload to disk in blocks, enforcing REPOSITORY_MAX_UPLOAD_BYTES."""
+    written = 0
+    with open(path, "wb") as f:
+        while block := await upload.read(UPLOAD_READ_BYTES):
+            written += len(block)
+            if written > settings.REPOSITORY_MAX_UPLOAD_BYTES:
+                raise RepositoryTooLargeError(
+                    f"Upload exceeds the {settings.REPOSITORY_MAX_UPLOAD_BYTES} byte limit."
+                )
+            f.write(block)
+
+
+@router.post(
+    "/analyze_repository",
+    response_model=ArchitectureResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Analyze Existing Repository",
+    description=(
+        "Reverse-engineers the architecture of an existing codebase, uploaded as a .zip or "
+        ".tar(.gz) archive or given as a local path under REPOSITORY_ALLOWED_ROOTS."
+    ),
+    tags=["Architecture"],
+    dependencies=[
+        Depends(enforce_rate_limit),
+        # Analysis makes many model calls, so it gets a longer default deadline.
+        Depends(model_call_timeout(lambda: settings.REPOSITORY_ANALYSIS_TIMEOUT_SECONDS)),
+    ],
+)
+async def analyze_repository(
+    file: UploadFile | None = File(default=None, description="Archive of the repository (.zip, .tar, .tar.gz)."),
+    path: str | None = Form(default=None, description="Local repository path (instead of an upload)."),
+    project_type: str = Form(default="Existing codebase", description="The type of project, if known."),
+    constraints: list[str] = Form(default=[], description="Constraints to evaluate the architecture against."),
+    service: ArchitectureService = Depends(ArchitectureService),
+    store: ArchitectureStore = Depends(get_architecture_store),
+    cache: ArtifactCache | None = Depends(get_artifact_cache),
+):
+    """
+    Reconstruct an architecture from an existing codebase and store it.
+
+    The code is split into token-bounded chunks that are summarized concurrently
+    (summaries are cached by content hash) and then reduced into one architecture,
+    which can be refined, rendered and deployed like a generated one.
+
+    Args:
+        file: An uploaded archive of the repository.
+        path: A local repository path, used when no archive is uploaded.
+        project_type: The type of project, if known.
+        constraints: Constraints to evaluate the architecture against.
+        service: The injected ArchitectureService used for the model calls.
+        store: The injected ArchitectureStore used to persist the result.
+        cache: Injected artifact cache for chunk summaries, None when disabled.
+
+    Returns:
+        The reconstructed ArchitectureResponse, including the ID it was stored under.
+
+    Raises:
+        HTTPException 400: If neither or both of file and path are given, the archive is
+            invalid, the path is not allowed, or there are no source files.
+        HTTPException 413: If the upload or repository exceeds the size limits.
+        HTTPException 503: If the AI service is unavailable or errors out.
+        HTTPException 504: If the request deadline expires first.
+        HTTPException 500: If the AI response cannot be parsed, or on unexpected errors.
+    """
+    if (file is None) == (path is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either an archive upload ('file') or a local 'path'.",
+        )
+    analyzer = get_repository_analyzer(service, cache)
+    try:
+        if path is not None:
+            root_dir = resolve_local_path(path)
+            source = path
+            analysis = await analyzer.analyze(root_dir, project_type, constraints)
+        else:
+            source = file.filename or "upload"
+            with tempfile.TemporaryDirectory(prefix="repository-") as work_dir:
+                archive_path = os.path.join(work_dir, "archive")
+                root_dir = os.path.join(work_dir, "src")
+                await _save_upload(file, archive_path)
+                await asyncio.to_thread(
+                    extract_archive, archive_path, root_dir, settings.REPOSITORY_MAX_EXTRACTED_BYTES
+                )
+                analysis = await analyzer.analyze(root_dir, project_type, constraints)
+
+        record = await store.save(
+            prompt=f"Reverse-engineered from repository '{source}'",
+            project_type=project_type,
+            constraints=constraints,
+            architecture=analysis.architecture,
+        )
+        logger.info(f"Stored architecture {record.id} analyzed from {source}.")
+        return record.architecture
+    except RepositoryTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except RepositoryAnalysisError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except DeadlineExceededError as e:
+        logger.warning(f"Repository analysis exceeded its deadline: {e}")
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+    except OpenAIServiceError as e:
+        logger.error(f"AI service error during repository analysis: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Error communicating with AI service: {e}"
+        )
+    except ParsingError as e:
+        logger.error(f"Parsing error during repository analysis: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to process AI response: {e}"
+        )
+    except ServiceError as e:
+        logger.error(f"Repository analysis failed: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to analyze repository: {e}"
+        )
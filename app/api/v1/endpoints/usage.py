@@ -0,0 +1,75 @@
+import logging
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.core.exceptions import StorageError
+from app.schemas.usage import UsageBucketSize, UsageGroupBy, UsageResponse
+from app.services.usage_service import get_usage_report_service
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+def get_usage_report():
+    return get_usage_report_service
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    """Interprets naive query datetimes as UTC."""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+@router.get(
+    "/usage",
+    response_model=UsageResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Get Token Usage",
+    description="Returns time-bucketed token usage, latency and estimated cost of generations, optionally grouped and filtered.",
+    tags=["Usage"],
+)
+async def get_usage(
+    bucket: UsageBucketSize = UsageBucketSize.HOUR,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    group_by: UsageGroupBy | None = None,
+    endpoint: str | None = None,
+    project_type: str | None = None,
+    service: callable = Depends(get_usage_report),
+):
+    """
+    Report recorded generation usage.
+
+    Args:
+        bucket (UsageBucketSize): Bucket size, `hour` (default) or `day`.
+        start (datetime | None): Start of the range (naive values are UTC); defaults to the last 24 hours (hour) or 30 days (day).
+        end (datetime | None): End of the range (exclusive); defaults to now.
+        group_by (UsageGroupBy | None): Optional breakdown dimension.
+        endpoint (str | None): Only include generations from this endpoint.
+        project_type (str | None): Only include generations for this project type.
+        service (callable): Injected usage report service.
+
+    Returns:
+        UsageResponse: Per-bucket aggregates and totals.
+
+    Raises:
+        HTTPException (422): If the range is empty.
+        HTTPException (500): If the usage store cannot be read.
+    """
+    start, end = _as_utc(start), _as_utc(end)
+    if start and end and start >= end:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="start must be before end.")
+    try:
+        return await service(
+            bucket=bucket,
+            start=start,
+            end=end,
+            group_by=group_by,
+            endpoint=endpoint,
+            project_type=project_type,
+        )
+    except StorageError as e:
+        logger.error(f"Failed to read usage: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to read usage: {e}"
+        )
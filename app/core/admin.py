@@ -0,0 +1,27 @@
+"""Access control for operational (admin) endpoints."""
+
+import hmac
+import logging
+
+from fastapi import Header, HTTPException, Request, status
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def require_admin(request: Request, x_admin_token: str | None = Header(default=None)) -> None:
+    """FastAPI dependency admitting only requests carrying `ADMIN_TOKEN` in `X-Admin-Token`.
+
+    Admin endpoints are unavailable while `ADMIN_TOKEN` is unset.
+
+    Raises:
+        HTTPException 404: If no admin token is configured.
+        HTTPException 403: If the token is missing or wrong.
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), settings.ADMIN_TOKEN.encode()):
+        client = request.client.host if request.client else "anonymous"
+        logger.warning(f"Rejected admin request from {client} to {request.url.path}")
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required.")
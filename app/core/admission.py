@@ -0,0 +1,215 @@
+"""Admission control and load shedding for the model-calling endpoints.
+
+Every route that calls the model (see `app.core.model_routes`) goes through the
+controller. At most `limit` such requests run at once per worker; further requests
+wait in a bounded FIFO queue. A request is rejected up front with 429 and a Retry-After
+estimate when the queue is full or when its expected wait exceeds the time it is
+willing to wait, so an overloaded worker sheds excess load quickly instead of
+letting every request time out.
+
+With `ADMISSION_ADAPTIVE` enabled the limit follows AIMD on observed latency:
+it grows by roughly one per window of fast responses and shrinks multiplicatively
+when responses exceed `ADMISSION_TARGET_LATENCY_SECONDS` or fail with a 5xx.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from functools import lru_cache
+
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.deadlines import remaining
+from app.core.metrics import metrics
+from app.core.model_routes import model_route
+
+logger = logging.getLogger(__name__)
+
+# AIMD multiplicative-decrease factor and latency smoothing factor.
+DECREASE_FACTOR = 0.75
+LATENCY_EWMA_ALPHA = 0.2
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of queued."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Request rejected by admission control ({reason})")
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class AdmissionController:
+    """Concurrency limiter with a bounded, deadline-aware wait queue."""
+
+    def __init__(
+        self,
+        limit: int,
+        max_queue: int,
+        max_wait_seconds: float,
+        adaptive: bool = False,
+        min_limit: int = 1,
+        max_limit: int | None = None,
+        target_latency_seconds: float = 30.0,
+    ):
+        self.limit = float(limit)
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.adaptive = adaptive
+        self.min_limit = min_limit
+        self.max_limit = max_limit or limit
+        self.target_latency_seconds = target_latency_seconds
+        self.in_flight = 0
+        # Seed the latency estimate so the first Retry-After values are sensible.
+        self.avg_latency = target_latency_seconds / 2
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def estimated_wait(self, position: int) -> float:
+        """Seconds until the request at queue `position` (0-based) is likely admitted."""
+        return (position // max(1, int(self.limit)) + 1) * self.avg_latency
+
+    def _publish(self) -> None:
+        metrics.set_gauge("admission.in_flight", self.in_flight)
+        metrics.set_gauge("admission.queued", self.queued)
+        metrics.set_gauge("admission.limit", int(self.limit))
+
+    def _reject(self, reason: str, retry_after: float) -> AdmissionRejected:
+        metrics.inc("admission.rejected", reason=reason)
+        logger.warning(
+            f"Shedding request ({reason}): {self.in_flight} in flight, {self.queued} queued, limit {int(self.limit)}"
+        )
+        return AdmissionRejected(reason, retry_after)
+
+    async def acquire(self, max_wait: float | None = None) -> None:
+        """Waits for a slot, or raises AdmissionRejected.
+
+        Args:
+            max_wait: Longest the caller is willing to queue; defaults to `max_wait_seconds`.
+        """
+        max_wait = self.max_wait_seconds if max_wait is None else min(max_wait, self.max_wait_seconds)
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            self._publish()
+            return
+        position = self.queued
+        if position >= self.max_queue:
+            raise self._reject("queue_full", self.estimated_wait(position))
+        if self.estimated_wait(position) > max_wait:
+            raise self._reject("deadline", self.estimated_wait(position))
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._publish()
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on.
+                self.release_slot()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self._publish()
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject("timeout", self.estimated_wait(self.queued)) from None
+            raise
+        metrics.observe("admission.queue_wait_seconds", time.perf_counter() - started)
+
+    def release_slot(self) -> None:
+        """Frees a slot and hands it to the oldest live waiter."""
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+        self._publish()
+
+    def release(self, latency: float, ok: bool = True) -> None:
+        """Frees a slot after a request finished, feeding its outcome to the limiter."""
+        self.avg_latency += LATENCY_EWMA_ALPHA * (latency - self.avg_latency)
+        if self.adaptive:
+            if not ok or latency > self.target_latency_seconds:
+                self.limit = max(float(self.min_limit), self.limit * DECREASE_FACTOR)
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+        self.release_slot()
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware applying an AdmissionController to the model-calling routes.
+
+    Args:
+        paths: Exact paths to admit instead of the routes found by `model_route`.
+    """
+
+    def __init__(self, app, paths: tuple[str, ...] | None = None):
+        self.app = app
+        self.paths = paths
+
+    def applies_to(self, scope) -> bool:
+        if scope["type"] != "http":
+            return False
+        if self.paths is not None:
+            return scope["path"] in self.paths
+        return model_route(scope) is not None
+
+    async def __call__(self, scope, receive, send):
+        controller = get_admission_controller()
+        if controller is None or not self.applies_to(scope):
+            await self.app(scope, receive, send)
+            return
+        try:
+            # Never queue longer than the request's own deadline allows.
+            await controller.acquire(max_wait=remaining())
+        except AdmissionRejected as e:
+            response = JSONResponse(
+                {"detail": "Server is busy. Please retry later."},
+                status_code=429,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except asyncio.CancelledError:
+            # Abandoned by the client; its truncated latency says nothing about load.
+            controller.release_slot()
+            raise
+        except BaseException:
+            controller.release(time.perf_counter() - started, ok=False)
+            raise
+        controller.release(time.perf_counter() - started, ok=status_code < 500)
+
+
+@lru_cache
+def get_admission_controller() -> AdmissionController | None:
+    """Returns the process-wide AdmissionController, or None when disabled."""
+    if settings.ADMISSION_MAX_CONCURRENCY <= 0:
+        return None
+    return AdmissionController(
+        limit=settings.ADMISSION_MAX_CONCURRENCY,
+        max_queue=settings.ADMISSION_MAX_QUEUE,
+        max_wait_seconds=settings.ADMISSION_MAX_WAIT_SECONDS,
+        adaptive=settings.ADMISSION_ADAPTIVE,
+        min_limit=settings.ADMISSION_MIN_CONCURRENCY,
+        target_latency_seconds=settings.ADMISSION_TARGET_LATENCY_SECONDS,
+    )
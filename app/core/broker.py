@@ -0,0 +1,117 @@
+"""In-process publish/subscribe broker used to push live progress to clients.
+
+Publishing never blocks: every subscriber has a bounded buffer, and when a slow
+subscriber's buffer is full its oldest message is dropped. A slow viewer therefore
+loses intermediate messages instead of stalling the publisher (e.g. a deployment).
+"""
+
+import asyncio
+import logging
+from collections import defaultdict, deque
+from functools import lru_cache
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionClosed(Exception):
+    """Raised by `Subscription.get` once the topic has been closed and drained."""
+
+
+class Subscription:
+    """A subscriber's bounded view of one topic. Use as an async iterator or call `get`."""
+
+    def __init__(self, broker: "EventBroker", topic: str, maxsize: int):
+        self.broker = broker
+        self.topic = topic
+        self.dropped = 0
+        self._buffer: deque = deque(maxlen=maxsize)
+        self._ready = asyncio.Event()
+        self._closed = False
+        self._unreported_drops = 0
+
+    def _push(self, message: dict) -> None:
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+            self._unreported_drops += 1
+        self._buffer.append(message)  # deque(maxlen) discards the oldest entry
+        self._ready.set()
+
+    def _close(self) -> None:
+        self._closed = True
+        self._ready.set()
+
+    async def get(self, timeout: float | None = None) -> dict:
+        """Returns the next message, waiting up to `timeout` seconds.
+
+        If messages were dropped since the last call, a `{"type": "lagged", "dropped": n}`
+        message is returned first so the consumer knows it missed updates.
+
+        Raises:
+            asyncio.TimeoutError: If no message arrives within `timeout`.
+            SubscriptionClosed: If the topic was closed and every message was consumed.
+        """
+        while not self._buffer:
+            if self._closed:
+                raise SubscriptionClosed(self.topic)
+            self._ready.clear()
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        if self._unreported_drops:
+            dropped, self._unreported_drops = self._unreported_drops, 0
+            return {"type": "lagged", "dropped": dropped}
+        return self._buffer.popleft()
+
+    def unsubscribe(self) -> None:
+        self.broker.unsubscribe(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        try:
+            return await self.get()
+        except SubscriptionClosed:
+            raise StopAsyncIteration from None
+
+
+class EventBroker:
+    """Topic-based fan-out of messages to bounded subscriber buffers."""
+
+    def __init__(self, buffer_size: int = 256):
+        self.buffer_size = buffer_size
+        self._subscribers: dict[str, set[Subscription]] = defaultdict(set)
+
+    def subscribe(self, topic: str, maxsize: int | None = None) -> Subscription:
+        subscription = Subscription(self, topic, maxsize or self.buffer_size)
+        self._subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.topic)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.topic]
+
+    def publish(self, topic: str, message: dict) -> int:
+        """Delivers a message to every current subscriber of `topic` without blocking.
+
+        Returns:
+            The number of subscribers the message was delivered to.
+        """
+        subscribers = self._subscribers.get(topic, ())
+        for subscription in subscribers:
+            subscription._push(message)
+        return len(subscribers)
+
+    def close_topic(self, topic: str) -> None:
+        """Ends the stream for current subscribers once they drain their buffers."""
+        for subscription in self._subscribers.pop(topic, ()):
+            subscription._close()
+
+
+@lru_cache
+def get_event_broker() -> EventBroker:
+    """Returns the process-wide EventBroker."""
+    return EventBroker(settings.EVENT_SUBSCRIBER_BUFFER_SIZE)
@@ -1,6 +1,9 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 import os
 
+from app.core.lazy import LAZY_STARTUP
+
 class Settings(BaseSettings):
     PROJECT_NAME: str = "AI Software Architect"
     VERSION: str = "0.1.0"
@@ -14,6 +17,121 @@ class Settings(BaseSettings):
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
     OPENAI_MAX_TOKENS: int = os.getenv("OPENAI_MAX_TOKENS", 1500)
     OPENAI_TEMPERATURE: float = os.getenv("OPENAI_TEMPERATURE", 0.7)
+    # "legacy": variables in the system message; "static_prefix": a byte-stable system prefix
+    # with few-shot examples that providers can serve from their prompt-prefix cache
+    PROMPT_LAYOUT: str = os.getenv("PROMPT_LAYOUT", "legacy")
+
+    # LLM provider: openai, openai_compatible (e.g. a local vLLM/Ollama server) or offline
+    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "openai")
+    LLM_BASE_URL: str = os.getenv("LLM_BASE_URL", "http://localhost:11434/v1")
+    LLM_API_KEY: str = os.getenv("LLM_API_KEY", "")
+    LLM_MODEL: str = os.getenv("LLM_MODEL", "")  # defaults to OPENAI_MODEL (or "offline")
+    LLM_JSON_MODE: bool = os.getenv("LLM_JSON_MODE", True)
+    LLM_OFFLINE_RECORDINGS_PATH: str = os.getenv("LLM_OFFLINE_RECORDINGS_PATH", "")
+    LLM_OFFLINE_LATENCY_SECONDS: float = os.getenv("LLM_OFFLINE_LATENCY_SECONDS", 0.0)
+    LLM_OFFLINE_SECONDS_PER_TOKEN: float = os.getenv("LLM_OFFLINE_SECONDS_PER_TOKEN", 0.0)
+
+    # Server settings (used by `python -m app.server`)
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT: int = os.getenv("SERVER_PORT", 8000)
+    SERVER_WORKERS: int = os.getenv("SERVER_WORKERS", 1)  # 0 = one per available CPU core
+
+    # Shared state settings ("memory" is per worker, "sqlite" is shared by all workers on the host)
+    STATE_BACKEND: str = os.getenv("STATE_BACKEND", "memory")
+    STATE_DB_PATH: str = os.getenv("STATE_DB_PATH", "data/shared_state.db")
+    RESPONSE_CACHE_TTL_SECONDS: float = os.getenv("RESPONSE_CACHE_TTL_SECONDS", 0)  # 0 disables (opt-in)
+    RATE_LIMIT_PER_MINUTE: float = os.getenv("RATE_LIMIT_PER_MINUTE", 0)  # 0 disables
+    RATE_LIMIT_BURST: int = os.getenv("RATE_LIMIT_BURST", 10)
+
+    # Response compression (gzip, plus brotli when the optional package is installed)
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", True)
+    COMPRESSION_MIN_BYTES: int = os.getenv("COMPRESSION_MIN_BYTES", 1024)
+
+    # Request deadlines for the generation endpoints (overridable per request with X-Request-Timeout)
+    REQUEST_TIMEOUT_SECONDS: float = os.getenv("REQUEST_TIMEOUT_SECONDS", 120)
+    REQUEST_TIMEOUT_MAX_SECONDS: float = os.getenv("REQUEST_TIMEOUT_MAX_SECONDS", 600)
+
+    # Admission control for the generation endpoints (per worker)
+    ADMISSION_MAX_CONCURRENCY: int = os.getenv("ADMISSION_MAX_CONCURRENCY", 16)  # 0 disables
+    ADMISSION_MAX_QUEUE: int = os.getenv("ADMISSION_MAX_QUEUE", 64)
+    ADMISSION_MAX_WAIT_SECONDS: float = os.getenv("ADMISSION_MAX_WAIT_SECONDS", 30)
+    ADMISSION_ADAPTIVE: bool = os.getenv("ADMISSION_ADAPTIVE", False)
+    ADMISSION_MIN_CONCURRENCY: int = os.getenv("ADMISSION_MIN_CONCURRENCY", 2)
+    ADMISSION_TARGET_LATENCY_SECONDS: float = os.getenv("ADMISSION_TARGET_LATENCY_SECONDS", 30)
+
+    # Semantic (near-duplicate) cache settings
+    SEMANTIC_CACHE_ENABLED: bool = os.getenv("SEMANTIC_CACHE_ENABLED", False)
+    SEMANTIC_CACHE_THRESHOLD: float = os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.9)
+    SEMANTIC_CACHE_DIM: int = os.getenv("SEMANTIC_CACHE_DIM", 2048)
+    SEMANTIC_CACHE_MAX_ENTRIES: int = os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 512)  # per project_type
+    SEMANTIC_CACHE_SAMPLE_RATE: float = os.getenv("SEMANTIC_CACHE_SAMPLE_RATE", 0.05)
+
+    # Precomputed project_type presets (costs one generation per preset and refresh)
+    PRESETS_ENABLED: bool = os.getenv("PRESETS_ENABLED", False)
+    PRESET_REFRESH_SECONDS: float = os.getenv("PRESET_REFRESH_SECONDS", 86400)
+    PRESET_WARMUP_CONCURRENCY: int = os.getenv("PRESET_WARMUP_CONCURRENCY", 2)
+    PRESET_SERVE_MIN_SIMILARITY: float = os.getenv("PRESET_SERVE_MIN_SIMILARITY", 0.9)
+    PRESET_SEED_MIN_SIMILARITY: float = os.getenv("PRESET_SEED_MIN_SIMILARITY", 0.2)
+
+    # Refinement settings
+    REFINEMENT_MAX_TOKENS: int = os.getenv("REFINEMENT_MAX_TOKENS", 800)  # patches are much smaller than full rewrites
+
+    # Repository analysis (map-reduce over code_dump chunks)
+    REPOSITORY_ANALYSIS_CONCURRENCY: int = os.getenv("REPOSITORY_ANALYSIS_CONCURRENCY", 4)
+    REPOSITORY_ANALYSIS_TIMEOUT_SECONDS: float = os.getenv("REPOSITORY_ANALYSIS_TIMEOUT_SECONDS", 600)  # default deadline
+    REPOSITORY_CHUNK_TOKENS: int = os.getenv("REPOSITORY_CHUNK_TOKENS", 8000)
+    REPOSITORY_REDUCE_TOKENS: int = os.getenv("REPOSITORY_REDUCE_TOKENS", 12000)  # summaries per reduce call
+    REPOSITORY_SUMMARY_MAX_TOKENS: int = os.getenv("REPOSITORY_SUMMARY_MAX_TOKENS", 500)
+    REPOSITORY_MAX_CHUNKS: int = os.getenv("REPOSITORY_MAX_CHUNKS", 400)
+    REPOSITORY_MAX_UPLOAD_BYTES: int = os.getenv("REPOSITORY_MAX_UPLOAD_BYTES", 50 * 1024 * 1024)
+    REPOSITORY_MAX_EXTRACTED_BYTES: int = os.getenv("REPOSITORY_MAX_EXTRACTED_BYTES", 500 * 1024 * 1024)
+    REPOSITORY_ALLOWED_ROOTS: str = os.getenv("REPOSITORY_ALLOWED_ROOTS", "")  # comma-separated; empty disables local paths
+
+    # Traffic capture for offline replay (scripts/replay_traffic.py)
+    TRAFFIC_CAPTURE_ENABLED: bool = os.getenv("TRAFFIC_CAPTURE_ENABLED", False)
+    TRAFFIC_CAPTURE_PATH: str = os.getenv("TRAFFIC_CAPTURE_PATH", "data/traffic.ndjson")
+    TRAFFIC_CAPTURE_MAX_BODY_BYTES: int = os.getenv("TRAFFIC_CAPTURE_MAX_BODY_BYTES", 1024 * 1024)
+
+    # Admin endpoints (disabled while ADMIN_TOKEN is empty) and the on-demand profiler
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+    PROFILER_ENABLED: bool = os.getenv("PROFILER_ENABLED", False)
+    PROFILER_MAX_SECONDS: float = os.getenv("PROFILER_MAX_SECONDS", 60)
+    PROFILER_SLOW_CALLBACK_MS: float = os.getenv("PROFILER_SLOW_CALLBACK_MS", 100)
+
+    # Persistence settings
+    ARCHITECTURE_DB_PATH: str = os.getenv("ARCHITECTURE_DB_PATH", "data/architectures.db")
+    EXPORT_BATCH_SIZE: int = os.getenv("EXPORT_BATCH_SIZE", 500)  # rows per query when streaming exports
+    EXPORT_MAX_BATCH_SIZE: int = os.getenv("EXPORT_MAX_BATCH_SIZE", 5000)
+
+    # Token usage accounting
+    USAGE_ACCOUNTING_ENABLED: bool = os.getenv("USAGE_ACCOUNTING_ENABLED", True)
+    USAGE_DB_PATH: str = os.getenv("USAGE_DB_PATH", "data/usage.db")
+    USAGE_ROLLUP_INTERVAL_SECONDS: float = os.getenv("USAGE_ROLLUP_INTERVAL_SECONDS", 300)
+    USAGE_PROMPT_COST_PER_1K_TOKENS: float = os.getenv("USAGE_PROMPT_COST_PER_1K_TOKENS", 0.0)
+    USAGE_COMPLETION_COST_PER_1K_TOKENS: float = os.getenv("USAGE_COMPLETION_COST_PER_1K_TOKENS", 0.0)
+
+    # Code generation settings
+    CODE_GENERATION_MAX_CONCURRENCY: int = os.getenv("CODE_GENERATION_MAX_CONCURRENCY", 4)
+
+    # Generated-code artifact cache settings
+    ARTIFACT_CACHE_ENABLED: bool = os.getenv("ARTIFACT_CACHE_ENABLED", True)
+    ARTIFACT_CACHE_DIR: str = os.getenv("ARTIFACT_CACHE_DIR", "data/artifacts")
+    ARTIFACT_CACHE_MAX_BYTES: int = os.getenv("ARTIFACT_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+
+    # Diagram rendering settings
+    DIAGRAM_CACHE_MAX_ENTRIES: int = os.getenv("DIAGRAM_CACHE_MAX_ENTRIES", 256)  # in-process renders
+
+    # Deployment settings
+    DEPLOY_MAX_PARALLEL: int = os.getenv("DEPLOY_MAX_PARALLEL", 8)
+    DEPLOY_RETENTION_SECONDS: float = os.getenv("DEPLOY_RETENTION_SECONDS", 3600)  # succeeded deployments
+    DEPLOY_RESUME_WINDOW_SECONDS: float = os.getenv("DEPLOY_RESUME_WINDOW_SECONDS", 86400)  # failed deployments
+    DEPLOY_MAX_RETAINED: int = os.getenv("DEPLOY_MAX_RETAINED", 1000)  # finished deployments kept in memory
+    LOCAL_DEPLOY_ROOT: str = os.getenv("LOCAL_DEPLOY_ROOT", "data/deployments")
+    LOCAL_DEPLOY_LATENCY_SECONDS: float = os.getenv("LOCAL_DEPLOY_LATENCY_SECONDS", 0.0)
+
+    # Live progress streaming settings
+    EVENT_SUBSCRIBER_BUFFER_SIZE: int = os.getenv("EVENT_SUBSCRIBER_BUFFER_SIZE", 256)
+    SSE_HEARTBEAT_SECONDS: float = os.getenv("SSE_HEARTBEAT_SECONDS", 15.0)
 
     class Config:
         # BaseSettings from pydantic_settings can automatically load environment
@@ -22,4 +140,18 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
         case_sensitive = False
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """Returns the process-wide Settings, reading the environment and .env on first call."""
+    return Settings()
+
+class _LazySettings:
+    """Proxy that defers reading the environment and .env until a setting is first used."""
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name, value):
+        setattr(get_settings(), name, value)
+
+settings = _LazySettings() if LAZY_STARTUP else get_settings()
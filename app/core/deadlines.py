@@ -0,0 +1,190 @@
+"""End-to-end request deadlines and cancellation on client disconnect.
+
+`RequestDeadlineMiddleware` gives every request to a model-calling route (see
+`app.core.model_routes`) a deadline, taken from the `X-Request-Timeout` header
+(seconds) or the route's default, normally `REQUEST_TIMEOUT_SECONDS`, and stores it
+in a context variable so the admission queue and the upstream model call can bound
+their waits with `remaining()`. If the client disconnects before the response has
+been sent, the handler task is cancelled, which aborts any in-flight upstream call.
+
+`upstream_costs` estimates what each cancellation saved from the average duration
+and token usage of upstream calls that did complete.
+"""
+
+import asyncio
+import logging
+import time
+from contextvars import ContextVar
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.model_routes import ModelRoute, model_route
+
+logger = logging.getLogger(__name__)
+
+DEADLINE_HEADER = b"x-request-timeout"
+
+# Smoothing factor for the upstream duration/token averages.
+COST_EWMA_ALPHA = 0.2
+
+_deadline: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+def remaining() -> float | None:
+    """Seconds left before the current request's deadline, or None if it has none."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def set_deadline(timeout_seconds: float | None):
+    """Sets the deadline for the current context; returns a token for `reset_deadline`."""
+    return _deadline.set(None if timeout_seconds is None else time.monotonic() + timeout_seconds)
+
+
+def reset_deadline(token) -> None:
+    _deadline.reset(token)
+
+
+def request_timeout(headers: list[tuple[bytes, bytes]], default: float | None = None) -> float:
+    """Returns the timeout requested via `X-Request-Timeout`, clamped to the configured maximum.
+
+    Falls back to `default`, or `REQUEST_TIMEOUT_SECONDS` if that is None.
+    """
+    for name, value in headers:
+        if name.lower() == DEADLINE_HEADER:
+            try:
+                timeout = float(value)
+            except ValueError:
+                logger.warning(f"Ignoring invalid X-Request-Timeout header: {value!r}")
+                break
+            if timeout > 0:
+                return min(timeout, settings.REQUEST_TIMEOUT_MAX_SECONDS)
+            break
+    return settings.REQUEST_TIMEOUT_SECONDS if default is None else default
+
+
+class UpstreamCostTracker:
+    """Tracks average upstream latency and token usage to estimate cancellation savings."""
+
+    def __init__(self):
+        self.avg_seconds: float | None = None
+        self.avg_tokens: float | None = None
+
+    def observe(self, seconds: float, tokens: int | None) -> None:
+        """Records a completed upstream call."""
+        if self.avg_seconds is None:
+            self.avg_seconds = seconds
+        else:
+            self.avg_seconds += COST_EWMA_ALPHA * (seconds - self.avg_seconds)
+        if tokens is not None:
+            if self.avg_tokens is None:
+                self.avg_tokens = float(tokens)
+            else:
+                self.avg_tokens += COST_EWMA_ALPHA * (tokens - self.avg_tokens)
+
+    def record_cancellation(self, elapsed: float, reason: str) -> tuple[float, float]:
+        """Records an upstream call abandoned after `elapsed` seconds.
+
+        Returns:
+            The estimated (seconds, completion tokens) the cancellation saved.
+        """
+        saved_seconds = saved_tokens = 0.0
+        if self.avg_seconds:
+            saved_seconds = max(0.0, self.avg_seconds - elapsed)
+            if self.avg_tokens is not None:
+                saved_tokens = self.avg_tokens * saved_seconds / self.avg_seconds
+        metrics.inc("upstream.cancelled", reason=reason)
+        metrics.inc("upstream.cancelled.saved_seconds", saved_seconds, reason=reason)
+        metrics.inc("upstream.cancelled.saved_tokens", saved_tokens, reason=reason)
+        logger.info(
+            f"Upstream call cancelled ({reason}) after {elapsed:.2f}s; "
+            f"estimated savings {saved_seconds:.2f}s, {saved_tokens:.0f} tokens"
+        )
+        return saved_seconds, saved_tokens
+
+
+upstream_costs = UpstreamCostTracker()
+
+
+class RequestDeadlineMiddleware:
+    """ASGI middleware setting request deadlines and cancelling work for departed clients.
+
+    The original `receive` channel is read by a watcher task that hands the request
+    body to the handler one message at a time (so uploads are not buffered) and then
+    keeps listening for `http.disconnect` while the handler runs.
+
+    Args:
+        paths: Exact paths to apply deadlines to instead of the routes found by `model_route`.
+    """
+
+    def __init__(self, app, paths: tuple[str, ...] | None = None):
+        self.app = app
+        self.paths = paths
+
+    def route(self, scope) -> ModelRoute | None:
+        if scope["type"] != "http":
+            return None
+        if self.paths is not None:
+            return ModelRoute() if scope["path"] in self.paths else None
+        return model_route(scope)
+
+    async def __call__(self, scope, receive, send):
+        route = self.route(scope)
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        body_messages: asyncio.Queue = asyncio.Queue(maxsize=1)
+        body_complete = False
+        disconnected = asyncio.Event()
+
+        async def watch_receive():
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    return message
+                await body_messages.put(message)
+
+        async def handler_receive():
+            nonlocal body_complete
+            if body_complete:
+                await disconnected.wait()
+                return {"type": "http.disconnect"}
+            message = await body_messages.get()
+            body_complete = not message.get("more_body")
+            return message
+
+        response_complete = False
+
+        async def send_wrapper(message):
+            nonlocal response_complete
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                response_complete = True
+            await send(message)
+
+        default_timeout = route.default_timeout() if route.default_timeout else None
+        token = set_deadline(request_timeout(scope.get("headers", []), default_timeout))
+        try:
+            # The handler task copies the current context, deadline included.
+            handler = asyncio.create_task(self.app(scope, handler_receive, send_wrapper))
+        finally:
+            reset_deadline(token)
+        watcher = asyncio.create_task(watch_receive())
+        try:
+            await asyncio.wait({handler, watcher}, return_when=asyncio.FIRST_COMPLETED)
+            if not handler.done() and not response_complete and watcher.result()["type"] == "http.disconnect":
+                logger.info(f"Client disconnected from {scope['path']}; cancelling the request.")
+                metrics.inc("requests.cancelled", reason="disconnect")
+                disconnected.set()
+                handler.cancel()
+            try:
+                await handler
+            except asyncio.CancelledError:
+                if not disconnected.is_set():
+                    raise
+        finally:
+            watcher.cancel()
+            if not handler.done():
+                handler.cancel()
@@ -23,14 +23,15 @@ class ArchitectureGenerationError(ServiceError):
 class CodeGenerationError(ServiceError):
     """Exception raised specifically for errors during code generation.
 
-    (Currently defined but may not be used by ArchitectureService).
+    Raised, for example, when a stored architecture has no components that code
+    can be generated for.
     """
     pass
 
 class DeploymentError(ServiceError):
     """Exception raised specifically for errors during deployment operations.
 
-    (Currently defined but may not be used by ArchitectureService).
+    Raised by the DeploymentEngine and deployment target backends when a stage fails.
     """
     pass
 
@@ -50,13 +51,49 @@ class ParsingError(ArchitectureGenerationError):
     """
     pass
 
+class DeadlineExceededError(ServiceError):
+    """Exception raised when a request's deadline expires before the work completes.
+
+    The deadline comes from the `X-Request-Timeout` header or `REQUEST_TIMEOUT_SECONDS`.
+    """
+    pass
+
+class UnsupportedDeploymentTargetError(DeploymentError):
+    """Exception raised when a deployment target has no backend implementation yet."""
+    pass
+
+class DeploymentNotFoundError(DeploymentError):
+    """Exception raised when a requested deployment ID is unknown."""
+    pass
+
+class DeploymentStateError(DeploymentError):
+    """Exception raised when an operation is not valid in the deployment's current state
+    (e.g. resuming a deployment that has not failed).
+    """
+    pass
+
+class RepositoryAnalysisError(ServiceError):
+    """Exception raised when a codebase cannot be analyzed, e.g. an invalid archive,
+    a path outside REPOSITORY_ALLOWED_ROOTS, or a repository with no source files.
+    """
+    pass
+
+class RepositoryTooLargeError(RepositoryAnalysisError):
+    """Exception raised when an upload or repository exceeds the configured size limits."""
+    pass
+
 # Add specific exceptions for code generation and deployment services as needed
 # Example:
 # class CodeParsingError(CodeGenerationError): ...
-# class DeploymentConfigurationError(DeploymentError): ...
 
 # --- API Layer Exceptions ---
 # (Could add specific API-level exceptions if needed, e.g., for authentication)
 
 # --- Data Layer Exceptions ---
-# (Could add specific data access exceptions if needed, e.g., DatabaseConnectionError)
+class StorageError(ServiceError):
+    """Exception raised when reading from or writing to the local persistence layer fails."""
+    pass
+
+class ArchitectureNotFoundError(StorageError):
+    """Exception raised when a requested architecture ID does not exist in the store."""
+    pass
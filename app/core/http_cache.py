@@ -0,0 +1,148 @@
+"""Response compression and conditional-request helpers.
+
+`CompressionMiddleware` compresses complete (non-streaming) responses with brotli
+or gzip, whichever the client prefers via `Accept-Encoding`. Brotli is only offered
+when the optional `brotli` package is installed. Streaming responses (NDJSON, SSE)
+are passed through untouched so every chunk still reaches the client immediately.
+
+A compressed body is a different representation, so its strong ETag gets an
+encoding suffix (`"<hash>-gzip"`); `etag_matches` strips it again when comparing.
+"""
+
+import gzip
+import logging
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+GZIP_LEVEL = 6
+# Brotli's mid qualities compress better than gzip at similar speed.
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = ("application/json", "text/", "image/svg+xml", "application/javascript")
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Content codings this server can produce, in preference order."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Picks the best supported coding from an Accept-Encoding header, or None for identity."""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[coding] = quality
+    candidates = [
+        (weights.get(coding, weights.get("*", 0.0)), -rank, coding)
+        for rank, coding in enumerate(supported_encodings())
+    ]
+    quality, _, coding = max(candidates)
+    return coding if quality > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def strong_etag(content_hash: str) -> str:
+    """Returns a strong ETag for content identified by its hash."""
+    return f'"{content_hash}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Evaluates If-None-Match against an ETag (weak comparison, as RFC 9110 requires).
+
+    Encoding suffixes added by CompressionMiddleware are ignored, so a client that
+    cached the gzip representation still revalidates successfully.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/").strip('"')
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/").strip('"')
+        for encoding in ("br", "gzip"):
+            candidate = candidate.removesuffix(f"-{encoding}")
+        if candidate == opaque:
+            return True
+    return False
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing complete responses of at least `minimum_size` bytes."""
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    def _compressible(self, start: dict, headers: Headers, body: bytes) -> bool:
+        if start["status"] < 200 or start["status"] in (204, 304):
+            return False
+        if "content-encoding" in headers or len(body) < self.minimum_size:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        pending_start = None
+
+        async def send_wrapper(message):
+            nonlocal pending_start
+            if message["type"] == "http.response.start":
+                # Hold the headers until the first body chunk shows whether this is a stream.
+                pending_start = message
+                return
+            if message["type"] != "http.response.body" or pending_start is None:
+                await send(message)
+                return
+
+            start, pending_start = pending_start, None
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            if message.get("more_body") or not self._compressible(start, headers, body):
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            metrics.inc("http.compression.bytes_in", len(body), encoding=encoding)
+            metrics.inc("http.compression.bytes_out", len(compressed), encoding=encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f'{etag[:-1]}-{encoding}"'
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,48 @@
+"""Opt-in lazy loading of heavy dependencies to speed up cold starts.
+
+Set the `LAZY_STARTUP` environment variable to a truthy value to enable it. It is read
+from the environment directly (not from `Settings`) because it must be known before
+the settings themselves are loaded.
+"""
+
+import importlib
+import logging
+import os
+import types
+
+logger = logging.getLogger(__name__)
+
+LAZY_STARTUP = os.getenv("LAZY_STARTUP", "false").strip().lower() in ("1", "true", "yes", "on")
+
+
+class LazyModule(types.ModuleType):
+    """A stand-in for a module that is imported on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_module"]
+        if module is None:
+            logger.debug(f"Lazily importing {self.__name__}")
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Imports a module now, or on first use when lazy startup is enabled."""
+    if LAZY_STARTUP:
+        return LazyModule(name)
+    return importlib.import_module(name)
+
+
+def ensure_loaded(module: types.ModuleType) -> types.ModuleType:
+    """Forces a lazily imported module to load (used by startup warm-up)."""
+    if isinstance(module, LazyModule):
+        return module._load()
+    return module
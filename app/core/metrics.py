@@ -0,0 +1,98 @@
+"""Minimal in-process metrics registry (counters, gauges and histograms).
+
+Metrics are identified by a name plus optional labels, e.g.
+`metrics.inc("cache.requests", outcome="hit")`. A JSON snapshot is served by the
+`/api/v1/metrics` endpoint.
+"""
+
+import threading
+from collections import deque
+
+# Number of recent samples kept per histogram for percentile estimates.
+HISTOGRAM_SAMPLE_SIZE = 1024
+
+
+def _metric_key(name: str, labels: dict) -> str:
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={labels[k]}" for k in sorted(labels)) + "}"
+
+
+class Histogram:
+    """Tracks count, sum, min and max, plus percentiles over the most recent samples."""
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+        self._samples: deque = deque(maxlen=HISTOGRAM_SAMPLE_SIZE)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self._samples.append(value)
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self._samples)
+
+        def percentile(p: float) -> float | None:
+            if not ordered:
+                return None
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "min": self.min,
+            "max": self.max,
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe registry of named metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, float] = {}
+        self._histograms: dict[str, Histogram] = {}
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self._gauges[_metric_key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _metric_key(name, labels)
+        with self._lock:
+            self._histograms.setdefault(key, Histogram()).observe(value)
+
+    def counter_value(self, name: str, **labels) -> float:
+        return self._counters.get(_metric_key(name, labels), 0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "histograms": {key: h.snapshot() for key, h in self._histograms.items()},
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,94 @@
+"""Identifies the routes that call the language model.
+
+Admission control and request deadlines apply to every route that depends on a
+model-calling service, instead of to a hand-maintained list of paths. Services are
+marked with `calls_model`; a route qualifies when its endpoint or any dependency in
+its tree carries the mark, so a new endpoint that injects `ArchitectureService` (or
+the code generation service) is covered without further changes.
+
+A route can declare its own default deadline by adding a `model_call_timeout`
+dependency, e.g. for repository analysis, which makes many model calls per request.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+from fastapi import routing
+from fastapi.routing import APIRoute
+from starlette.routing import Match
+
+MODEL_CALL_ATTR = "__calls_model__"
+TIMEOUT_ATTR = "__model_call_timeout__"
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """How a model-calling route is handled.
+
+    Attributes:
+        default_timeout: Returns the route's deadline in seconds when the request does
+            not set one, or None to use `REQUEST_TIMEOUT_SECONDS`.
+    """
+
+    default_timeout: Callable[[], float] | None = None
+
+
+def calls_model(target):
+    """Marks a dependency (class or function) or endpoint as calling the model."""
+    setattr(target, MODEL_CALL_ATTR, True)
+    return target
+
+
+def model_call_timeout(seconds: Callable[[], float]):
+    """Returns a route dependency giving a model-calling route its own default deadline.
+
+    Args:
+        seconds: Returns the default timeout; called per request, so it can read settings.
+    """
+
+    def dependency() -> None:
+        return None
+
+    setattr(dependency, TIMEOUT_ATTR, seconds)
+    return dependency
+
+
+def _calls(dependant) -> list:
+    calls = [dependant.call]
+    for sub_dependant in dependant.dependencies:
+        calls.extend(_calls(sub_dependant))
+    return calls
+
+
+def route_policy(route: APIRoute) -> ModelRoute | None:
+    """The ModelRoute of an API route, or None if it does not call the model."""
+    calls = _calls(route.dependant)
+    if not any(getattr(call, MODEL_CALL_ATTR, False) for call in calls):
+        return None
+    timeouts = [getattr(call, TIMEOUT_ATTR) for call in calls if hasattr(call, TIMEOUT_ATTR)]
+    return ModelRoute(default_timeout=timeouts[0] if timeouts else None)
+
+
+def _routes(app) -> Iterator[tuple[object, object]]:
+    """Yields (matchable route, original route) pairs of an app, in dispatch order."""
+    iter_route_contexts = getattr(routing, "iter_route_contexts", None)
+    if iter_route_contexts is None:
+        # Older FastAPI versions copy included routes into `app.routes`.
+        for route in app.routes:
+            yield route, route
+    else:
+        # Newer versions include routers lazily; resolve them to the effective routes.
+        for context in iter_route_contexts(app.routes):
+            yield context, context.original_route
+
+
+def model_route(scope) -> ModelRoute | None:
+    """The ModelRoute of the route an ASGI request will be dispatched to, if any."""
+    app = scope.get("app")
+    if app is None or scope["type"] != "http":
+        return None
+    for route, original in _routes(app):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route_policy(original) if isinstance(original, APIRoute) else None
+    return None
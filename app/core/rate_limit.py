@@ -0,0 +1,42 @@
+"""Per-client token-bucket rate limiting for the generation endpoints."""
+
+import logging
+import math
+
+from fastapi import Depends, HTTPException, Request, status
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.shared_state import StateBackend, get_state_backend
+
+logger = logging.getLogger(__name__)
+
+
+async def enforce_rate_limit(
+    request: Request,
+    state: StateBackend = Depends(get_state_backend),
+) -> None:
+    """FastAPI dependency rejecting clients that exceed `RATE_LIMIT_PER_MINUTE`.
+
+    Buckets live in the shared state backend, so with `STATE_BACKEND=sqlite` the
+    budget is enforced across all workers instead of once per worker.
+
+    Raises:
+        HTTPException 429: With a Retry-After header when the client's bucket is empty.
+    """
+    if settings.RATE_LIMIT_PER_MINUTE <= 0:
+        return
+    client = request.client.host if request.client else "anonymous"
+    wait = await state.take_token(
+        f"rate:{client}",
+        rate=settings.RATE_LIMIT_PER_MINUTE / 60,
+        capacity=settings.RATE_LIMIT_BURST,
+    )
+    if wait:
+        metrics.inc("rate_limit.rejected", path=request.url.path)
+        logger.warning(f"Rate limit exceeded for {client} on {request.url.path}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded. Please retry later.",
+            headers={"Retry-After": str(math.ceil(wait))},
+        )
@@ -0,0 +1,180 @@
+"""State shared by request handlers: a key/value response cache and rate-limit token buckets.
+
+Two backends are available, selected with the `STATE_BACKEND` setting:
+
+- `memory`: per-process dictionaries. Fast, but each uvicorn worker has its own copy.
+- `sqlite`: a local SQLite file in WAL mode, so every worker on the host shares one
+  cache and one set of token buckets without an external service.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from app.core.config import settings
+from app.core.exceptions import StorageError
+from app.utils.sqlite import open_sqlite
+
+logger = logging.getLogger(__name__)
+
+# Expired cache rows are purged once every this many writes.
+PURGE_EVERY_WRITES = 256
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS token_buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def refill(tokens: float, updated_at: float, now: float, rate: float, capacity: float) -> float:
+    """Returns the bucket level after refilling at `rate` tokens/second since `updated_at`."""
+    return min(capacity, tokens + max(0.0, now - updated_at) * rate)
+
+
+class StateBackend(ABC):
+    """Interface for the shared cache and token-bucket state."""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """Returns the cached value, or None if absent or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        """Caches a value for `ttl_seconds`."""
+
+    @abstractmethod
+    async def take_token(self, bucket: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        """Takes `cost` tokens from a bucket refilled at `rate` tokens/second.
+
+        Returns:
+            0.0 if the tokens were taken, otherwise the seconds until enough are available.
+        """
+
+
+class MemoryStateBackend(StateBackend):
+    """Per-process state; suitable for a single worker."""
+
+    def __init__(self):
+        self._cache: dict[str, tuple[bytes, float]] = {}
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._writes = 0
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        if entry[1] < time.time():
+            del self._cache[key]
+            return None
+        return entry[0]
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        now = time.time()
+        self._cache[key] = (value, now + ttl_seconds)
+        self._writes += 1
+        if self._writes % PURGE_EVERY_WRITES == 0:
+            for expired in [k for k, (_, expires_at) in self._cache.items() if expires_at < now]:
+                del self._cache[expired]
+
+    async def take_token(self, bucket: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        now = time.time()
+        tokens, updated_at = self._buckets.get(bucket, (capacity, now))
+        tokens = refill(tokens, updated_at, now, rate, capacity)
+        if tokens >= cost:
+            self._buckets[bucket] = (tokens - cost, now)
+            return 0.0
+        self._buckets[bucket] = (tokens, now)
+        return (cost - tokens) / rate
+
+
+class SQLiteStateBackend(StateBackend):
+    """State shared by every process on the host through a WAL-mode SQLite file.
+
+    Token-bucket updates run in `BEGIN IMMEDIATE` transactions so concurrent workers
+    never both spend the same token.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._writes = 0
+        try:
+            self._conn = open_sqlite(db_path)
+            self._conn.isolation_level = None  # explicit transactions below
+            self._conn.executescript(SQLITE_SCHEMA)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open shared state at {db_path}: {e}", exc_info=True)
+            raise StorageError(f"Failed to open shared state: {e}") from e
+
+    def _get(self, key: str) -> bytes | None:
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM kv WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0]
+
+    def _set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, now + ttl_seconds),
+            )
+            self._writes += 1
+            if self._writes % PURGE_EVERY_WRITES == 0:
+                self._conn.execute("DELETE FROM kv WHERE expires_at < ?", (now,))
+
+    def _take_token(self, bucket: str, rate: float, capacity: float, cost: float) -> float:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT tokens, updated_at FROM token_buckets WHERE name = ?", (bucket,)
+                ).fetchone()
+                tokens = refill(row[0], row[1], now, rate, capacity) if row else capacity
+                wait = 0.0 if tokens >= cost else (cost - tokens) / rate
+                if not wait:
+                    tokens -= cost
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO token_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                    (bucket, tokens, now),
+                )
+                self._conn.execute("COMMIT")
+                return wait
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    async def get(self, key: str) -> bytes | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        await asyncio.to_thread(self._set, key, value, ttl_seconds)
+
+    async def take_token(self, bucket: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        return await asyncio.to_thread(self._take_token, bucket, rate, capacity, cost)
+
+
+@lru_cache
+def get_state_backend() -> StateBackend:
+    """Returns the process-wide state backend selected by `STATE_BACKEND`."""
+    backend = settings.STATE_BACKEND.lower()
+    if backend == "sqlite":
+        logger.info(f"Using shared SQLite state at {settings.STATE_DB_PATH}")
+        return SQLiteStateBackend(settings.STATE_DB_PATH)
+    if backend != "memory":
+        logger.warning(f"Unknown STATE_BACKEND '{settings.STATE_BACKEND}', falling back to memory.")
+    return MemoryStateBackend()
@@ -0,0 +1,362 @@
+"""Opt-in capture of API traffic for offline replay.
+
+With `TRAFFIC_CAPTURE_ENABLED`, `TrafficCaptureMiddleware` appends every
+`/api/v1/*` request to the NDJSON log at `TRAFFIC_CAPTURE_PATH`, and the LLM
+provider is wrapped in `RecordingProvider` (see `llm_providers`) so the upstream
+model responses to those requests land in the same log:
+
+    {"type": "request", "id", "ts", "method", "path", "query", "headers", "body", "status", "latency_ms"}
+    {"type": "upstream", "request_id", "ts", "key", "content", "latency_ms"}
+
+Upstream lines have the `key`/`content` shape of offline provider recordings, so a
+capture log can be used as `LLM_OFFLINE_RECORDINGS_PATH` directly: a local instance
+then answers every captured prompt with the recorded response after the recorded
+latency. `scripts/replay_traffic.py` re-drives the captured requests against it with
+`replay()`, and `summarize()` / `compare()` report latency distributions per path.
+
+Requests are sanitized before they are written: only `CAPTURED_HEADERS` are kept,
+values of query parameters and JSON body keys that look like credentials are
+redacted, and non-JSON or oversized bodies (e.g. repository uploads) are replaced
+by their size.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import re
+import statistics
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CAPTURE_PREFIX = "/api/v1/"
+# Admin requests carry credentials and are not worth replaying.
+EXCLUDED_PREFIXES = ("/api/v1/admin/",)
+CAPTURED_HEADERS = {"accept", "accept-encoding", "content-type", "if-none-match", "x-request-timeout"}
+SENSITIVE_KEY_RE = re.compile(r"key|token|secret|password|passwd|credential|authorization", re.IGNORECASE)
+REDACTED = "[REDACTED]"
+# Records queued for the writer thread before new ones are dropped.
+MAX_PENDING_RECORDS = 10000
+
+_STOP = object()
+
+_request_id: ContextVar[str | None] = ContextVar("capture_request_id", default=None)
+
+
+def current_request_id() -> str | None:
+    """The capture ID of the request being handled, if it is being captured."""
+    return _request_id.get()
+
+
+def redact(value):
+    """Returns a copy of a JSON value with the values of credential-like keys redacted."""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if SENSITIVE_KEY_RE.search(key) else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def redact_query(query: str) -> str:
+    """Returns a query string with the values of credential-like parameters redacted."""
+    if not query:
+        return ""
+    return urlencode([
+        (name, REDACTED if SENSITIVE_KEY_RE.search(name) else value)
+        for name, value in parse_qsl(query, keep_blank_values=True)
+    ])
+
+
+class TrafficRecorder:
+    """Appends capture records to an NDJSON file.
+
+    `write` only queues a record; a background thread serializes queued records and
+    appends them in batches, so request handling never waits for the disk. If the
+    disk cannot keep up and `max_pending` records are queued, further records are
+    dropped and counted as `traffic_capture.dropped`. The file is opened lazily in
+    append mode.
+    """
+
+    def __init__(self, path: str, max_body_bytes: int = 1024 * 1024, max_pending: int = MAX_PENDING_RECORDS):
+        self.path = path
+        self.max_body_bytes = max_body_bytes
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def write(self, record: dict) -> None:
+        """Queues a record for writing."""
+        if self._thread is None:
+            self._start_writer()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            metrics.inc("traffic_capture.dropped", type=record.get("type", "unknown"))
+            return
+        metrics.inc("traffic_capture.records", type=record.get("type", "unknown"))
+
+    def _start_writer(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="traffic-capture-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        file = None
+        try:
+            while True:
+                records = [self._queue.get()]
+                # Drain the backlog so each batch is written and flushed once.
+                while True:
+                    try:
+                        records.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                lines = []
+                for record in records:
+                    if record is _STOP:
+                        continue
+                    try:
+                        lines.append(json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n")
+                    except (TypeError, ValueError) as e:
+                        logger.warning(f"Skipping unserializable traffic capture record: {e}")
+                if lines:
+                    try:
+                        if file is None:
+                            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                            file = open(self.path, "a", encoding="utf-8")
+                        file.writelines(lines)
+                        file.flush()
+                    except OSError as e:
+                        logger.warning(f"Failed to write {len(lines)} traffic capture records: {e}")
+                if any(record is _STOP for record in records):
+                    return
+        finally:
+            if file is not None:
+                file.close()
+
+    def record_upstream(self, key: str, content: str, latency_seconds: float) -> None:
+        """Records an upstream model response to a prompt identified by `key`."""
+        self.write({
+            "type": "upstream",
+            "request_id": current_request_id(),
+            "ts": time.time(),
+            "key": key,
+            "content": content,
+            "latency_ms": round(latency_seconds * 1000, 3),
+        })
+
+    def sanitize_body(self, body: bytes, content_type: str) -> dict:
+        """Returns the body fields of a request record."""
+        if not body:
+            return {"body": None}
+        if len(body) > self.max_body_bytes or "json" not in content_type:
+            return {"body": None, "body_omitted": len(body)}
+        try:
+            return {"body": redact(json.loads(body))}
+        except ValueError:
+            return {"body": None, "body_omitted": len(body)}
+
+    def close(self) -> None:
+        """Writes out all queued records and stops the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+
+class TrafficCaptureMiddleware:
+    """ASGI middleware recording sanitized `/api/v1/*` requests and their outcome."""
+
+    def __init__(self, app, recorder: TrafficRecorder):
+        self.app = app
+        self.recorder = recorder
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith(CAPTURE_PREFIX) or path.startswith(EXCLUDED_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        body = bytearray()
+        status_code = 500
+
+        async def receive_wrapper():
+            message = await receive()
+            # Stop buffering once the body is known to be too large to record.
+            if message["type"] == "http.request" and len(body) <= self.recorder.max_body_bytes:
+                body.extend(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        request_id = uuid.uuid4().hex
+        headers = {
+            name.decode("latin-1").lower(): value.decode("latin-1")
+            for name, value in scope.get("headers", [])
+        }
+        started_at = time.time()
+        start = time.perf_counter()
+        token = _request_id.set(request_id)
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            _request_id.reset(token)
+            latency = time.perf_counter() - start
+            self.recorder.write({
+                "type": "request",
+                "id": request_id,
+                "ts": started_at,
+                "method": scope["method"],
+                "path": path,
+                "query": redact_query(scope.get("query_string", b"").decode("latin-1")),
+                "headers": {name: value for name, value in headers.items() if name in CAPTURED_HEADERS},
+                **self.recorder.sanitize_body(bytes(body), headers.get("content-type", "")),
+                "status": status_code,
+                "latency_ms": round(latency * 1000, 3),
+            })
+
+
+@lru_cache
+def get_traffic_recorder() -> TrafficRecorder | None:
+    """Returns the process-wide recorder, or None when traffic capture is disabled."""
+    if not settings.TRAFFIC_CAPTURE_ENABLED:
+        return None
+    return TrafficRecorder(settings.TRAFFIC_CAPTURE_PATH, settings.TRAFFIC_CAPTURE_MAX_BODY_BYTES)
+
+
+def load_requests(path: str) -> list[dict]:
+    """Returns the replayable request records of a capture log, oldest first.
+
+    Requests whose body was omitted (uploads, oversized bodies) cannot be replayed
+    and are skipped.
+    """
+    requests = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("type") == "request" and "body_omitted" not in record:
+                requests.append(record)
+    requests.sort(key=lambda record: record["ts"])
+    return requests
+
+
+async def replay(client, requests: list[dict], speed: float = 1.0, concurrency: int = 64) -> list[dict]:
+    """Re-sends captured requests with `client` (an `httpx.AsyncClient`).
+
+    Args:
+        client: The client, with its base URL set to the instance under test.
+        requests: Request records from `load_requests`.
+        speed: Timing multiplier; 1.0 keeps the captured inter-arrival times, 2.0
+            sends twice as fast, and 0 sends each request as soon as the previous
+            one has completed.
+        concurrency: Maximum requests in flight.
+
+    Returns:
+        One result per request with `path`, `status`, `latency_ms`,
+        `recorded_latency_ms` and `error`.
+    """
+    if not requests:
+        return []
+    slots = asyncio.Semaphore(1 if speed <= 0 else concurrency)
+    first_ts = requests[0]["ts"]
+    start = time.perf_counter()
+
+    async def send(record: dict) -> dict:
+        if speed > 0:
+            await asyncio.sleep(max(0.0, start + (record["ts"] - first_ts) / speed - time.perf_counter()))
+        async with slots:
+            result = {
+                "path": record["path"],
+                "status": None,
+                "latency_ms": None,
+                "recorded_latency_ms": record.get("latency_ms"),
+                "error": None,
+            }
+            sent = time.perf_counter()
+            try:
+                response = await client.request(
+                    record["method"],
+                    record["path"] + (f"?{record['query']}" if record.get("query") else ""),
+                    headers=record.get("headers") or {},
+                    content=None if record.get("body") is None else json.dumps(record["body"]).encode("utf-8"),
+                )
+                await response.aread()
+                result["status"] = response.status_code
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {e}"
+            result["latency_ms"] = round((time.perf_counter() - sent) * 1000, 3)
+            return result
+
+    return list(await asyncio.gather(*(send(record) for record in requests)))
+
+
+def _distribution(latencies: list[float]) -> dict:
+    if not latencies:
+        return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p90_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(latencies)
+
+    def percentile(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": percentile(0.5),
+        "p90_ms": percentile(0.9),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def summarize(results: list[dict], field: str = "latency_ms") -> dict:
+    """Latency distribution of replay results, overall and per path.
+
+    Pass `field="recorded_latency_ms"` for the distribution at capture time.
+    """
+    by_path: dict[str, list[dict]] = {}
+    for result in results:
+        by_path.setdefault(result["path"], []).append(result)
+
+    def describe(group: list[dict]) -> dict:
+        summary = _distribution([r[field] for r in group if r.get(field) is not None])
+        summary["errors"] = sum(1 for r in group if r.get("error") or (r.get("status") or 0) >= 500)
+        return summary
+
+    return {"overall": describe(results), "paths": {path: describe(group) for path, group in sorted(by_path.items())}}
+
+
+def compare(baseline: dict, current: dict) -> list[dict]:
+    """Per-path latency changes between two `summarize` outputs (e.g. two builds)."""
+    rows = []
+    for path in ["overall"] + sorted(set(baseline["paths"]) | set(current["paths"])):
+        before = baseline["overall"] if path == "overall" else baseline["paths"].get(path)
+        after = current["overall"] if path == "overall" else current["paths"].get(path)
+        if before is None or after is None:
+            continue
+        row = {"path": path, "count": after["count"]}
+        for stat in ("p50_ms", "p90_ms", "p99_ms"):
+            row[stat] = after[stat]
+            row[f"{stat}_change"] = round((after[stat] - before[stat]) / before[stat], 4) if before[stat] else None
+        rows.append(row)
+    return rows
@@ -1,15 +1,106 @@
+import time
+
+# Taken before any other import so cold-start metrics include dependency imports.
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.v1.endpoints import architecture, code, deploy
+from app.api.v1.endpoints import admin, architecture, code, deploy, metrics as metrics_endpoint, repository, usage
+from app.core.admission import AdmissionControlMiddleware
+from app.core.deadlines import RequestDeadlineMiddleware
+from app.core.http_cache import CompressionMiddleware
 from app.core.config import settings
+from app.core.lazy import LAZY_STARTUP
+from app.core.metrics import metrics
+from app.core.traffic_capture import TrafficCaptureMiddleware, get_traffic_recorder
+
+logger = logging.getLogger(__name__)
+
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+def warm_up() -> None:
+    """Imports deferred SDKs and builds shared clients ahead of the first request."""
+    from app.core.lazy import ensure_loaded
+    from app.services import llm_providers
+
+    start = time.perf_counter()
+    if settings.LLM_PROVIDER != "offline":
+        ensure_loaded(llm_providers.openai)
+    try:
+        llm_providers.get_llm_provider()
+    except Exception as e:
+        logger.warning(f"Warm-up could not construct the LLM provider: {e}")
+    metrics.set_gauge("startup.warmup_seconds", time.perf_counter() - start)
+
+async def roll_up_usage_periodically() -> None:
+    """Folds completed hours of usage events into rollups every USAGE_ROLLUP_INTERVAL_SECONDS."""
+    from app.services.usage_store import get_usage_store
+
+    while True:
+        try:
+            await get_usage_store().rollup()
+        except Exception as e:
+            logger.warning(f"Usage rollup failed: {e}")
+        await asyncio.sleep(settings.USAGE_ROLLUP_INTERVAL_SECONDS)
+
+async def refresh_presets_periodically() -> None:
+    """Precomputes preset architectures at startup and every PRESET_REFRESH_SECONDS."""
+    from app.core.shared_state import get_state_backend
+    from app.services.architecture_service import ArchitectureService
+    from app.services.presets import get_preset_library, warm_presets
+
+    while True:
+        try:
+            await warm_presets(get_preset_library(), ArchitectureService(), get_state_backend())
+        except Exception as e:
+            logger.warning(f"Preset warm-up failed: {e}")
+        await asyncio.sleep(settings.PRESET_REFRESH_SECONDS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    metrics.set_gauge("startup.import_seconds", _IMPORT_SECONDS)
+    metrics.set_gauge("startup.ready_seconds", time.perf_counter() - _IMPORT_STARTED)
+    metrics.set_gauge("startup.lazy", int(LAZY_STARTUP))
+    warmup_task = None
+    if LAZY_STARTUP:
+        # Serve immediately; heavy imports finish in the background.
+        warmup_task = asyncio.create_task(asyncio.to_thread(warm_up))
+    rollup_task = None
+    if settings.USAGE_ACCOUNTING_ENABLED and settings.USAGE_ROLLUP_INTERVAL_SECONDS > 0:
+        rollup_task = asyncio.create_task(roll_up_usage_periodically())
+    preset_task = None
+    if settings.PRESETS_ENABLED:
+        # In the background: the first requests may simply miss the presets.
+        preset_task = asyncio.create_task(refresh_presets_periodically())
+    yield
+    if preset_task is not None:
+        preset_task.cancel()
+    if rollup_task is not None:
+        rollup_task.cancel()
+    if warmup_task is not None:
+        await warmup_task
+    recorder = get_traffic_recorder()
+    if recorder is not None:
+        # Write out captured records still queued for the writer thread.
+        await asyncio.to_thread(recorder.close)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    description="AI Software Architect"
+    description="AI Software Architect",
+    lifespan=lifespan,
 )
 
+# Shed excess generation requests; added first so CORS headers wrap its 429s.
+app.add_middleware(AdmissionControlMiddleware)
+# Outside admission control so queueing is bounded by the request deadline.
+app.add_middleware(RequestDeadlineMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -19,10 +110,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outside admission control and deadlines, so recorded latencies include queueing.
+if settings.TRAFFIC_CAPTURE_ENABLED:
+    app.add_middleware(TrafficCaptureMiddleware, recorder=get_traffic_recorder())
+
+# Outermost, so every response (including CORS-decorated errors) can be compressed.
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_BYTES)
+
 # Include routers
 app.include_router(architecture.router, prefix="/api/v1", tags=["architecture"])
+app.include_router(repository.router, prefix="/api/v1", tags=["architecture"])
 app.include_router(code.router, prefix="/api/v1", tags=["code"])
 app.include_router(deploy.router, prefix="/api/v1", tags=["deploy"])
+app.include_router(metrics_endpoint.router, prefix="/api/v1", tags=["metrics"])
+app.include_router(usage.router, prefix="/api/v1", tags=["usage"])
+app.include_router(admin.router, prefix="/api/v1", tags=["admin"])
 
 @app.get("/")
 async def root():
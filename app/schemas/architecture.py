@@ -1,3 +1,7 @@
+from datetime import datetime
+from enum import Enum
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
 # Define request schema
@@ -13,3 +17,70 @@ class ArchitectureResponse(BaseModel):
     architecture_diagram: str = Field(..., description="A textual or structured representation of the architecture (e.g., PlantUML, Mermaid, JSON).")
     description: str = Field(..., description="A natural language description of the proposed architecture.")
     recommendations: list[str] = Field(..., description="A list of recommendations, trade-offs, or next steps.")
+    architecture_id: str | None = Field(default=None, description="The identifier under which the architecture was stored, if persisted.")
+
+# Refinement schemas
+class ArchitectureRefineRequest(BaseModel):
+    """Schema for refining a stored architecture instead of regenerating it."""
+    add_constraints: list[str] = Field(default=[], description="Constraints to add to the architecture's current constraints.")
+    remove_constraints: list[str] = Field(default=[], description="Constraints to drop from the architecture's current constraints.")
+    instruction: str | None = Field(default=None, description="A free-form follow-up instruction (e.g., 'add a cache in front of the database').")
+
+class DiagramEdit(BaseModel):
+    """One edit to a flowchart, as returned by the model in a refinement patch."""
+    op: Literal["add_node", "remove_node", "relabel_node", "add_edge", "remove_edge"] = Field(..., description="The edit operation.")
+    id: str | None = Field(default=None, description="Node ID (node operations).")
+    label: str | None = Field(default=None, description="Node or edge label.")
+    shape: str | None = Field(default=None, description="Mermaid shape delimiters for new nodes, e.g. '[]', '[()]', '{}'.")
+    source: str | None = Field(default=None, description="Edge source node ID (edge operations).")
+    target: str | None = Field(default=None, description="Edge target node ID (edge operations).")
+
+class DescriptionEdit(BaseModel):
+    """One edit to the numbered sentences of a description."""
+    op: Literal["replace", "delete", "insert"] = Field(..., description="The edit operation.")
+    sentence: int = Field(..., description="1-based sentence number; for 'insert', the new text goes after it (0 = at the start).")
+    text: str | None = Field(default=None, description="Replacement or inserted text.")
+
+class ArchitecturePatch(BaseModel):
+    """A compact set of changes to an architecture, requested from the model instead of a full rewrite."""
+    diagram_edits: list[DiagramEdit] = Field(default=[], description="Edits to the flowchart.")
+    description_edits: list[DescriptionEdit] = Field(default=[], description="Edits to the description's sentences.")
+    recommendations_add: list[str] = Field(default=[], description="Recommendations to append.")
+    recommendations_remove: list[int] = Field(default=[], description="1-based numbers of recommendations to drop.")
+
+class ArchitectureDiff(BaseModel):
+    """Schema for the structural difference between two architecture versions."""
+    added_nodes: list[str] = Field(default=[], description="IDs of nodes that were added.")
+    removed_nodes: list[str] = Field(default=[], description="IDs of nodes that were removed.")
+    relabeled_nodes: list[str] = Field(default=[], description="IDs of nodes whose label or shape changed.")
+    added_edges: list[str] = Field(default=[], description="Edges that were added, as 'source -> target'.")
+    removed_edges: list[str] = Field(default=[], description="Edges that were removed, as 'source -> target'.")
+    description_changed: bool = Field(default=False, description="Whether the description changed.")
+    recommendations_added: list[str] = Field(default=[], description="Recommendations that were added.")
+    recommendations_removed: list[str] = Field(default=[], description="Recommendations that were removed.")
+
+class ArchitectureRefineResponse(BaseModel):
+    """Schema for the result of a refinement: the new version and what changed."""
+    architecture: ArchitectureResponse = Field(..., description="The refined architecture, stored under a new ID.")
+    parent_id: str = Field(..., description="The ID of the architecture that was refined.")
+    version: int = Field(..., description="The version number of the refined architecture (the original is version 1).")
+    constraints: list[str] = Field(..., description="The constraints the refined architecture was designed for.")
+    diff: ArchitectureDiff = Field(..., description="Structural differences from the parent version.")
+
+# Export schemas
+class ArchitectureExportFormat(str, Enum):
+    """Output formats of the architecture export endpoint."""
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+class ArchitectureExportRecord(BaseModel):
+    """Schema for one stored architecture in an export, with the request that produced it."""
+    id: str = Field(..., description="The ID the architecture is stored under.")
+    created_at: datetime = Field(..., description="When the architecture was stored (UTC).")
+    project_type: str = Field(..., description="The project type of the request.")
+    prompt: str = Field(..., description="The prompt of the request.")
+    constraints: list[str] = Field(..., description="The constraints the architecture was designed for.")
+    parent_id: str | None = Field(default=None, description="The architecture this one was refined from, if any.")
+    version: int = Field(..., description="The version number (the original is version 1).")
+    content_hash: str = Field(..., description="SHA-256 of the architecture content.")
+    architecture: ArchitectureResponse = Field(..., description="The stored architecture.")
@@ -11,3 +11,9 @@ class CodeGenerationResponse(BaseModel):
     code: str = Field(..., description="The generated source code for the component.")
     documentation: str = Field(..., description="Generated documentation for the code (e.g., docstrings, comments).")
     tests: str = Field(..., description="Generated unit or integration tests for the code.")
+
+class ArchitectureCodeGenerationRequest(BaseModel):
+    """Schema for requesting code generation for every component of a stored architecture."""
+    architecture_id: str = Field(..., description="The unique identifier of the previously generated architecture.")
+    programming_language: str = Field(default="python", description="The target programming language for the code.")
+    max_concurrency: int | None = Field(default=None, ge=1, le=32, description="Maximum number of components generated in parallel (defaults to the server setting).")
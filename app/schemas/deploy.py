@@ -17,5 +17,29 @@ class DeploymentRequest(BaseModel):
 class DeploymentResponse(BaseModel):
     """Schema for the response indicating the status of the deployment initiation."""
     status: str = Field(..., description="The current status of the deployment process (e.g., Initiated, InProgress, Failed, Completed).")
+    deployment_id: str | None = Field(default=None, description="The identifier used to follow or resume the deployment.")
     deployment_url: str | None = Field(default=None, description="The URL where the deployed application can be accessed, if applicable.")
     message: str = Field(..., description="A message providing details about the deployment status or any errors.")
+
+class DeploymentResumeRequest(BaseModel):
+    """Schema for resuming a failed deployment."""
+    configuration: dict = Field(default={}, description="Optional configuration overrides merged into the original configuration.")
+
+class DeploymentStageStatus(BaseModel):
+    """Schema for the status and timing of one deployment pipeline stage."""
+    name: str = Field(..., description="The stage name (render, package, provision or verify).")
+    status: str = Field(..., description="The stage status (pending, running, succeeded or failed).")
+    duration_ms: float | None = Field(default=None, description="Wall-clock time spent in the stage, in milliseconds.")
+    error: str | None = Field(default=None, description="The error that failed the stage, if any.")
+
+class DeploymentStatusResponse(BaseModel):
+    """Schema for the detailed status of a deployment."""
+    deployment_id: str = Field(..., description="The unique identifier of the deployment.")
+    architecture_id: str = Field(..., description="The architecture being deployed.")
+    target: DeploymentTarget = Field(..., description="The deployment target.")
+    status: str = Field(..., description="The overall status (pending, running, succeeded or failed).")
+    deployment_url: str | None = Field(default=None, description="The URL of the deployed application, once verified.")
+    stages: list[DeploymentStageStatus] = Field(..., description="Per-stage status and timing breakdown.")
+    resources: dict[str, str] = Field(..., description="Status of each deployed resource, keyed by resource name.")
+    resource_durations_ms: dict[str, float] = Field(default={}, description="Time spent on the last operation for each resource, in milliseconds.")
+    error: str | None = Field(default=None, description="The error that failed the deployment, if any.")
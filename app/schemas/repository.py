@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+
+class CodeComponent(BaseModel):
+    """A component identified in part of a codebase."""
+    name: str = Field(..., description="Short name of the component (e.g., 'Billing API').")
+    responsibility: str = Field(default="", description="What the component does.")
+    technologies: list[str] = Field(default=[], description="Frameworks, datastores or protocols it uses.")
+    depends_on: list[str] = Field(default=[], description="Names of components it calls or reads from.")
+
+class CodeSummary(BaseModel):
+    """Schema for the model's summary of one chunk of a codebase (the map step of repository analysis)."""
+    summary: str = Field(..., description="What this part of the codebase does.")
+    components: list[CodeComponent] = Field(default=[], description="Components found in this part of the codebase.")
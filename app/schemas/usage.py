@@ -0,0 +1,38 @@
+from datetime import datetime
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+class UsageBucketSize(str, Enum):
+    """Time bucket sizes supported by the usage endpoint."""
+    HOUR = "hour"
+    DAY = "day"
+
+class UsageGroupBy(str, Enum):
+    """Dimensions usage buckets can be broken down by."""
+    ENDPOINT = "endpoint"
+    PROJECT_TYPE = "project_type"
+    MODEL = "model"
+    CACHE_OUTCOME = "cache_outcome"
+
+class UsageBucket(BaseModel):
+    """Schema for aggregated usage within one time bucket (and group, if grouped)."""
+    bucket_start: datetime | None = Field(default=None, description="Start of the time bucket (UTC); None for the totals row.")
+    group: str | None = Field(default=None, description="Value of the group_by dimension, if grouping was requested.")
+    requests: int = Field(..., description="Number of generations.")
+    prompt_tokens: int = Field(..., description="Prompt tokens sent to the model.")
+    completion_tokens: int = Field(..., description="Completion tokens returned by the model.")
+    total_tokens: int = Field(..., description="Prompt plus completion tokens.")
+    cached_prompt_tokens: int = Field(default=0, description="Prompt tokens served from the provider's prompt-prefix cache.")
+    prompt_cache_hit_rate: float = Field(default=0.0, description="Share of prompt tokens that were cached (0-1).")
+    avg_latency_ms: float = Field(..., description="Mean end-to-end generation latency in milliseconds.")
+    estimated_cost: float = Field(..., description="Token cost at the configured per-1K-token prices.")
+
+class UsageResponse(BaseModel):
+    """Schema for the time-bucketed usage report."""
+    bucket: UsageBucketSize = Field(..., description="The bucket size used.")
+    group_by: UsageGroupBy | None = Field(default=None, description="The dimension buckets are broken down by, if any.")
+    start: datetime = Field(..., description="Start of the reported range (UTC, aligned to the bucket size).")
+    end: datetime = Field(..., description="End of the reported range (UTC, exclusive).")
+    buckets: list[UsageBucket] = Field(..., description="Aggregates per bucket (and group), oldest first.")
+    totals: UsageBucket = Field(..., description="Aggregates over the whole range.")
@@ -0,0 +1,68 @@
+"""Production launcher for `app.main:app` with multiple uvicorn workers.
+
+Usage:
+  python -m app.server
+
+Each worker is a separate process with its own event loop. `SERVER_WORKERS`
+defaults to 1; set it to a count, or to 0 for one worker per available CPU core.
+With more than one worker, the shared SQLite state backend is selected (unless
+STATE_BACKEND is set explicitly) so the response cache and rate limits are shared
+across workers.
+
+Other state is still per worker process:
+
+- Deployments (status, live events, resume) live in the worker that started them,
+  so with several workers `/deploy/{id}`, `/deploy/{id}/events` and
+  `/deploy/{id}/resume` fail with 404 on any other worker. Only run several workers
+  if deployments are not used, or with sticky routing per deployment.
+- Admission control limits concurrent model calls per worker, so the effective
+  limit is `ADMISSION_MAX_CONCURRENCY` times the worker count.
+- `/metrics` reports the counters of whichever worker answers.
+"""
+
+import logging
+import os
+
+import uvicorn
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def available_cpus() -> int:
+    """Returns the CPU cores this process may run on (respecting affinity masks)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS / Windows
+        return os.cpu_count() or 1
+
+
+def worker_count() -> int:
+    """Returns the configured worker count, or one per available core."""
+    return settings.SERVER_WORKERS if settings.SERVER_WORKERS > 0 else available_cpus()
+
+
+def main():
+    workers = worker_count()
+    if workers > 1 and "STATE_BACKEND" not in os.environ:
+        # Workers inherit the environment, so they all pick the shared backend.
+        os.environ["STATE_BACKEND"] = "sqlite"
+    logging.basicConfig(level=logging.INFO)
+    logger.info(
+        f"Starting {workers} worker(s) on {settings.SERVER_HOST}:{settings.SERVER_PORT} "
+        f"with state backend '{os.environ.get('STATE_BACKEND', settings.STATE_BACKEND)}'"
+    )
+    uvicorn.run(
+        "app.main:app",
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=workers,
+        proxy_headers=True,
+        # Keep idle connections open a little longer than typical load balancers do.
+        timeout_keep_alive=75,
+    )
+
+
+if __name__ == "__main__":
+    main()
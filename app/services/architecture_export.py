@@ -0,0 +1,110 @@
+"""Streaming exports of the stored architectures for analytics.
+
+`export_architectures` turns the store's async cursor into text blocks, one per
+batch of records, so a response streams with memory bounded by the batch size
+regardless of how many records match.
+"""
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from app.core.metrics import metrics
+from app.schemas.architecture import ArchitectureExportFormat, ArchitectureExportRecord
+from app.services.architecture_store import ArchitectureRecord, ArchitectureStore
+
+CSV_COLUMNS = [
+    "id",
+    "created_at",
+    "project_type",
+    "prompt",
+    "constraints",
+    "parent_id",
+    "version",
+    "content_hash",
+    "architecture_diagram",
+    "description",
+    "recommendations",
+]
+
+MEDIA_TYPES = {
+    ArchitectureExportFormat.NDJSON: "application/x-ndjson",
+    ArchitectureExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+
+def to_export_record(record: ArchitectureRecord) -> ArchitectureExportRecord:
+    return ArchitectureExportRecord(
+        id=record.id,
+        created_at=record.created_at,
+        project_type=record.project_type,
+        prompt=record.prompt,
+        constraints=record.constraints,
+        parent_id=record.parent_id,
+        version=record.version,
+        content_hash=record.content_hash,
+        architecture=record.architecture,
+    )
+
+
+def _csv_row(record: ArchitectureExportRecord) -> list:
+    return [
+        record.id,
+        record.created_at.isoformat(),
+        record.project_type,
+        record.prompt,
+        json.dumps(record.constraints),
+        record.parent_id or "",
+        record.version,
+        record.content_hash,
+        record.architecture.architecture_diagram,
+        record.architecture.description,
+        json.dumps(record.architecture.recommendations),
+    ]
+
+
+async def export_architectures(
+    store: ArchitectureStore,
+    export_format: ArchitectureExportFormat,
+    project_type: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    batch_size: int = 500,
+) -> AsyncIterator[str]:
+    """Yields the matching architectures as NDJSON lines or CSV rows, one block per batch.
+
+    List fields (constraints, recommendations) are JSON-encoded in CSV cells.
+
+    Raises:
+        StorageError: If the store cannot be read. Once streaming has started the
+            response status is already sent, so the export simply ends early.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if export_format == ArchitectureExportFormat.CSV:
+        writer.writerow(CSV_COLUMNS)
+    pending = 0
+    exported = 0
+
+    def flush() -> str:
+        block = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return block
+
+    async for record in store.iter_records(project_type, start, end, batch_size):
+        export_record = to_export_record(record)
+        if export_format == ArchitectureExportFormat.CSV:
+            writer.writerow(_csv_row(export_record))
+        else:
+            buffer.write(export_record.model_dump_json() + "\n")
+        pending += 1
+        exported += 1
+        if pending >= batch_size:
+            yield flush()
+            pending = 0
+    if buffer.tell():
+        yield flush()
+    metrics.inc("architecture.exported_records", exported, format=export_format.value)
@@ -1,15 +1,27 @@
+import asyncio
+import hashlib
 import logging
 import json
+import time
 from json import JSONDecodeError
 
-# Import the Asynchronous client
-from openai import AsyncOpenAI, APIError, RateLimitError 
 from pydantic import ValidationError
 
 from app.core.config import settings
-from app.schemas.architecture import ArchitectureResponse
+from app.core.deadlines import remaining, upstream_costs
+from app.core.metrics import metrics
+from app.core.model_routes import calls_model
+from app.core.shared_state import get_state_backend
+from app.schemas.architecture import ArchitecturePatch, ArchitectureResponse
+from app.schemas.repository import CodeSummary
+from app.services.llm_providers import cached_prompt_tokens, get_llm_provider
+from app.services.presets import get_preset_library
+from app.services.refinement import apply_patch, compact_state
+from app.services.semantic_cache import get_semantic_cache
+from app.services.usage_store import UsageEvent, record_usage
 from app.core.exceptions import (
     ArchitectureGenerationError,
+    DeadlineExceededError,
     OpenAIServiceError,
     ParsingError,
     ServiceError, 
@@ -18,40 +30,192 @@ from app.core.exceptions import (
 # --- Constants ---
 SYSTEM_ROLE = "system"
 USER_ROLE = "user"
+USAGE_ENDPOINT = "generate_architecture"
+REFINE_USAGE_ENDPOINT = "refine_architecture"
+ANALYZE_USAGE_ENDPOINT = "analyze_repository"
+
+# --- Static prompt prefix (PROMPT_LAYOUT=static_prefix) ---
+# Providers cache the longest prompt prefix they have seen recently (OpenAI: prompts
+# of 1024+ tokens, in 128-token increments) and bill and serve those tokens cheaper
+# and faster. Everything in STATIC_PREFIX_MESSAGES must stay byte-identical across
+# requests: no request data, timestamps or unordered collections. Per-request values
+# go into the single trailing user message built by _build_request_message.
+STATIC_SYSTEM_PROMPT = (
+    "You are an AI assistant specializing in software architecture. You design software architectures "
+    "for the project described in the user's last message, which states the project type, the constraints "
+    "(non-functional requirements such as cost, availability, scalability or compliance) and the "
+    "requirements.\n\n"
+    "Guidelines:\n"
+    "- Choose components that the requirements and constraints actually call for; prefer managed services "
+    "and fewer moving parts when cost is a constraint, redundancy when availability is, and isolation, "
+    "encryption and auditing when security or compliance is.\n"
+    "- Name every significant component (clients, gateways, services, workers, queues, caches, datastores, "
+    "external providers) and show how data flows between them.\n"
+    "- Keep node IDs short and alphanumeric, and put human-readable names in labels.\n"
+    "- Use Mermaid shapes consistently: [Name] for services and clients, [(Name)] for databases and "
+    "storage, ((Name)) for queues and streams, {Name} for gateways and load balancers.\n"
+    "- The description explains the main request flow and why each component is there.\n"
+    "- Recommendations are concrete next steps, trade-offs or risks, one per item.\n\n"
+    "Output format: reply with a single JSON object matching this JSON Schema, and nothing else:\n"
+    + json.dumps(
+        {
+            "type": "object",
+            "properties": {
+                "architecture_diagram": {
+                    "type": "string",
+                    "description": "A Mermaid flowchart ('graph TD' or 'graph LR'); MUST be valid Mermaid syntax.",
+                },
+                "description": {"type": "string", "description": "Natural-language description of the architecture."},
+                "recommendations": {"type": "array", "items": {"type": "string"}},
+            },
+            "required": ["architecture_diagram", "description", "recommendations"],
+        },
+        sort_keys=True,
+    )
+    + "\n\nThe following exchanges are examples of the expected output."
+)
+FEW_SHOT_EXAMPLES = [
+    (
+        "Project type: Web Application\nConstraints: Low cost\n\nRequirements:\n"
+        "An online shop for a small bakery with a product catalog, a cart and card payments.",
+        {
+            "architecture_diagram": (
+                "graph TD\n  Browser[Browser] --> CDN{CDN}\n  CDN --> Web[Web App]\n"
+                "  Web --> DB[(PostgreSQL)]\n  Web --> Pay[Payment Provider]\n  Web --> Mail[Email Service]"
+            ),
+            "description": (
+                "A single web application serves the catalog, cart and checkout behind a CDN that caches static "
+                "assets and product images. Orders and products live in one managed PostgreSQL database. Card "
+                "payments are delegated to a hosted payment provider, so no card data touches the application, "
+                "and order confirmations are sent through a transactional email service."
+            ),
+            "recommendations": [
+                "Run the web app on a managed platform with autoscaling to zero outside opening hours.",
+                "Use the payment provider's hosted checkout to stay out of PCI scope.",
+                "Back up the database daily and test restores.",
+            ],
+        },
+    ),
+    (
+        "Project type: Microservices\nConstraints: High availability\n\nRequirements:\n"
+        "A ride-hailing backend that matches riders with nearby drivers and tracks trips in real time.",
+        {
+            "architecture_diagram": (
+                "graph LR\n  Apps[Mobile Apps] --> GW{API Gateway}\n  GW --> Rides[Ride Service]\n"
+                "  GW --> Loc[Location Service]\n  Loc --> Geo[(Redis Geo Index)]\n"
+                "  Rides --> Match[Matching Service]\n  Match --> Geo\n  Rides --> Bus((Event Stream))\n"
+                "  Bus --> Notify[Notification Service]\n  Rides --> RDB[(Trips DB)]"
+            ),
+            "description": (
+                "An API gateway routes requests from the rider and driver apps. The location service ingests "
+                "driver positions into a Redis geo index, which the matching service queries to pair riders "
+                "with nearby drivers. The ride service owns the trip lifecycle in a replicated database and "
+                "publishes trip events to a stream consumed by the notification service."
+            ),
+            "recommendations": [
+                "Deploy every service across at least three availability zones.",
+                "Use a multi-AZ database with automatic failover for trips.",
+                "Make event consumers idempotent so replays after failover are safe.",
+            ],
+        },
+    ),
+    (
+        "Project type: Mobile Application\nConstraints: Strong security and compliance\n\nRequirements:\n"
+        "A patient app for booking appointments, messaging clinicians and viewing lab results.",
+        {
+            "architecture_diagram": (
+                "graph TD\n  App[Mobile App] --> IdP[Identity Provider]\n  App --> GW{API Gateway}\n"
+                "  GW --> Api[Patient API]\n  Api --> Msg[Messaging Service]\n  Api --> EHR[EHR Integration]\n"
+                "  Api --> DB[(Encrypted Patient DB)]\n  Msg --> DB\n  Api --> Audit[(Audit Log)]"
+            ),
+            "description": (
+                "Patients sign in through an identity provider with multi-factor authentication, and the app "
+                "calls a single patient API through a gateway that enforces authentication and rate limits. "
+                "The API reads lab results from the hospital's EHR through an integration service, stores "
+                "appointments and messages in an encrypted database, and writes every access to protected "
+                "health information to an append-only audit log."
+            ),
+            "recommendations": [
+                "Encrypt patient data with keys held in a managed key service and rotate them regularly.",
+                "Keep no health data in the app beyond the session and block screenshots of sensitive views.",
+                "Sign a business associate agreement with every provider that processes patient data.",
+            ],
+        },
+    ),
+]
+STATIC_PREFIX_MESSAGES = [{"role": "system", "content": STATIC_SYSTEM_PROMPT}] + [
+    message
+    for user_message, response in FEW_SHOT_EXAMPLES
+    for message in (
+        {"role": "user", "content": user_message},
+        {"role": "assistant", "content": json.dumps(response)},
+    )
+]
 
 # --- Service Setup ---
 logger = logging.getLogger(__name__)
 
+def response_cache_key(prompt: str, project_type: str, constraints: list[str], model: str | None = None) -> str:
+    """Builds the exact-match response cache key for a generation request."""
+    canonical = json.dumps(
+        [prompt.strip(), project_type, constraints, model or settings.OPENAI_MODEL, settings.OPENAI_TEMPERATURE],
+        separators=(",", ":"),
+    )
+    return "architecture:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
 # --- Service Class ---
+@calls_model
 class ArchitectureService:
-    """Asynchronous service class for generating software architecture using OpenAI.
+    """Asynchronous service class for generating software architecture using a language model.
 
     This service encapsulates the logic for:
-    1. Building the appropriate prompt for the OpenAI API.
-    2. Calling the OpenAI API asynchronously.
+    1. Building the appropriate prompt for the model.
+    2. Calling the configured LLM provider (see `LLM_PROVIDER`) asynchronously.
     3. Parsing and validating the JSON response containing the architecture details.
     4. Handling potential errors during the process using custom exceptions.
     """
 
     def __init__(self):
-        """Initializes the ArchitectureService, setting up the AsyncOpenAI client.
+        """Initializes the ArchitectureService with the shared LLM provider.
 
         Raises:
-            ServiceError: If the AsyncOpenAI client cannot be initialized,
+            ServiceError: If the provider cannot be initialized,
                           typically due to missing API key or configuration issues.
         """
         try:
-            # Initialize AsyncOpenAI client
-            self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY) 
-            if not settings.OPENAI_API_KEY:
-                logger.warning("OPENAI_API_KEY not found in settings. OpenAI client methods will fail.")
-                # Setting client to None or similar handling if key might be absent
-                # self.client = None # Ensure subsequent calls fail clearly if key is missing
+            self.provider = get_llm_provider()
+        except Exception as e:
+            logger.error(f"Failed to initialize LLM provider: {e}", exc_info=True)
+            raise ServiceError(f"Failed to initialize LLM provider: {e}") from e
+        self.state = get_state_backend()
+        self.semantic_cache = get_semantic_cache()
+        self.presets = get_preset_library()
+
+    async def _get_cached_response(self, cache_key: str) -> ArchitectureResponse | None:
+        """Returns a previously generated response for an identical request, if cached."""
+        if settings.RESPONSE_CACHE_TTL_SECONDS <= 0:
+            return None
+        try:
+            cached = await self.state.get(cache_key)
+        except Exception as e:
+            logger.warning(f"Response cache lookup failed, treating as miss: {e}")
+            cached = None
+        metrics.inc("architecture.response_cache", outcome="hit" if cached else "miss")
+        if cached is None:
+            return None
+        logger.info("Serving architecture from the response cache.")
+        return ArchitectureResponse.model_validate_json(cached)
+
+    async def _cache_response(self, cache_key: str, response: ArchitectureResponse) -> None:
+        if settings.RESPONSE_CACHE_TTL_SECONDS <= 0:
+            return
+        try:
+            await self.state.set(
+                cache_key, response.model_dump_json().encode("utf-8"), settings.RESPONSE_CACHE_TTL_SECONDS
+            )
         except Exception as e:
-            logger.error(f"Failed to initialize AsyncOpenAI client: {e}", exc_info=True)
-            # Ensure client attribute exists but maybe is None or raises
-            self.client = None 
-            raise ServiceError(f"Failed to initialize AsyncOpenAI client: {e}") from e
+            # A cache write failure must never fail the generation itself.
+            logger.warning(f"Response cache write failed: {e}")
 
     # This method doesn't perform I/O, can remain synchronous
     def _build_openai_prompt(self, prompt: str, project_type: str, constraints: list[str]) -> list[dict]:
@@ -64,7 +228,18 @@ class ArchitectureService:
 
         Returns:
             A list of dictionaries representing the system and user messages for the API.
+
+        With `PROMPT_LAYOUT=static_prefix`, the messages start with the byte-stable
+        STATIC_PREFIX_MESSAGES (instructions, schema, few-shot examples) so the provider
+        can reuse its prompt-prefix cache, and every variable is in the last user message.
         """
+        if settings.PROMPT_LAYOUT == "static_prefix":
+            messages = STATIC_PREFIX_MESSAGES + [
+                {"role": USER_ROLE, "content": self._build_request_message(prompt, project_type, constraints)},
+            ]
+            logger.debug(f"Built OpenAI prompt messages with the static prefix: {messages[-1]}")
+            return messages
+
         # (Implementation remains the same)
         system_message = (
             f"You are an AI assistant specializing in software architecture. "
@@ -83,47 +258,157 @@ class ArchitectureService:
         logger.debug(f"Built OpenAI prompt messages: {messages}")
         return messages
 
+    @staticmethod
+    def _build_request_message(prompt: str, project_type: str, constraints: list[str]) -> str:
+        """Formats the per-request variables like the few-shot examples' user messages."""
+        return (
+            f"Project type: {project_type}\n"
+            f"Constraints: {', '.join(constraints) if constraints else 'None'}\n\n"
+            f"Requirements:\n{prompt}"
+        )
+
     # Make this method asynchronous as it performs network I/O
-    async def _call_openai_api(self, messages: list[dict]) -> str:
-        """Calls the OpenAI Chat Completions API asynchronously using the configured client.
+    async def _call_llm(self, messages: list[dict], max_tokens: int | None = None) -> tuple[str, object | None]:
+        """Calls the configured LLM provider asynchronously.
 
         Args:
             messages: The list of prompt messages (system and user roles).
+            max_tokens: Output token cap; defaults to `OPENAI_MAX_TOKENS`.
 
         Returns:
-            The raw JSON string content received from the OpenAI API.
+            The raw JSON string content received from the model, and the response's
+            token `usage` (None if the provider did not report it).
+
+        The call is bounded by the current request's remaining deadline, if any. If the
+        request is cancelled (client disconnect) or the deadline expires mid-call, the
+        estimated time and tokens saved by abandoning it are recorded.
 
         Raises:
-            OpenAIServiceError: If the client is not initialized, if the API returns an error
-                              (e.g., APIError, RateLimitError), if the response is empty,
-                              or if any other unexpected communication error occurs.
+            OpenAIServiceError: If the provider returns an error (e.g., APIError, RateLimitError),
+                              if the response is empty, or if any other unexpected
+                              communication error occurs.
+            DeadlineExceededError: If the request deadline expires before the model responds.
         """
-        if not self.client:
-            logger.error("AsyncOpenAI client is not initialized.")
-            raise OpenAIServiceError("AsyncOpenAI client is not initialized.")
+        timeout = remaining()
+        if timeout is not None and timeout <= 0:
+            raise DeadlineExceededError("Request deadline expired before calling the AI service.")
 
+        started = time.perf_counter()
         try:
-            logger.info(f"Sending request to OpenAI model: {settings.OPENAI_MODEL}")
-            # Use await with the async client's method
-            response = await self.client.chat.completions.create( 
-                model=settings.OPENAI_MODEL,
-                messages=messages,
-                max_tokens=settings.OPENAI_MAX_TOKENS,
-                temperature=settings.OPENAI_TEMPERATURE,
-                response_format={"type": "json_object"}, 
-            )
-            response_content = response.choices[0].message.content
-            logger.debug(f"Received raw response from OpenAI: {response_content}")
+            logger.info(f"Sending request to {self.provider.name} model: {self.provider.model}")
+            # The SDK timeout applies per attempt; asyncio.timeout bounds retries too.
+            async with asyncio.timeout(timeout):
+                completion = await self.provider.generate(
+                    messages,
+                    max_tokens=max_tokens or settings.OPENAI_MAX_TOKENS,
+                    temperature=settings.OPENAI_TEMPERATURE,
+                    timeout=timeout,
+                )
+            usage = completion.usage
+            prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+            metrics.inc("llm.prompt_tokens", prompt_tokens, layout=settings.PROMPT_LAYOUT)
+            metrics.inc("llm.cached_prompt_tokens", cached_prompt_tokens(usage), layout=settings.PROMPT_LAYOUT)
+            upstream_costs.observe(time.perf_counter() - started, getattr(usage, "completion_tokens", None))
+            response_content = completion.content
+            logger.debug(f"Received raw response from the model: {response_content}")
             if not response_content:
-                raise OpenAIServiceError("Received empty response content from OpenAI.")
-            return response_content
+                raise OpenAIServiceError("Received empty response content from the AI service.")
+            return response_content, usage
 
-        except (APIError, RateLimitError) as e:
-            logger.error(f"OpenAI API error encountered: {e}")
-            raise OpenAIServiceError(f"OpenAI API error: {e}") from e
+        except asyncio.CancelledError:
+            upstream_costs.record_cancellation(time.perf_counter() - started, reason="disconnect")
+            raise
+        except TimeoutError as e:
+            if timeout is None:
+                logger.error(f"Model request timed out: {e}")
+                raise OpenAIServiceError(f"Model request timed out: {e}") from e
+            upstream_costs.record_cancellation(time.perf_counter() - started, reason="deadline")
+            raise DeadlineExceededError(f"Request deadline of {timeout:.1f}s exceeded waiting for the AI service.") from e
+        except OpenAIServiceError:
+            raise
         except Exception as e:
-            logger.error(f"Unexpected error during OpenAI API call: {e}", exc_info=True)
-            raise OpenAIServiceError(f"Unexpected error communicating with OpenAI: {e}") from e
+            logger.error(f"Unexpected error during model call: {e}", exc_info=True)
+            raise OpenAIServiceError(f"Unexpected error communicating with the AI service: {e}") from e
+
+    async def _record_usage(
+        self, project_type: str, cache_outcome: str, started: float, usage=None, endpoint: str = USAGE_ENDPOINT
+    ) -> None:
+        await record_usage(UsageEvent(
+            endpoint=endpoint,
+            project_type=project_type,
+            model=self.provider.model,
+            cache_outcome=cache_outcome,
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+            cached_prompt_tokens=cached_prompt_tokens(usage),
+            latency_ms=(time.perf_counter() - started) * 1000,
+        ))
+
+    # This method doesn't perform I/O, can remain synchronous
+    def _build_refinement_prompt(
+        self, architecture: ArchitectureResponse, project_type: str, constraints: list[str],
+        added: list[str], removed: list[str], instruction: str | None,
+    ) -> list[dict]:
+        """Builds messages asking for a patch against the compact current state, not a rewrite."""
+        system_message = (
+            f"You are an AI assistant specializing in software architecture. "
+            f"You are refining an existing architecture for a '{project_type}' project. "
+            f"Do not rewrite it. Reply with a JSON object describing only the necessary changes, with keys: "
+            f"'diagram_edits' (list of objects with 'op' one of add_node, remove_node, relabel_node, add_edge, "
+            f"remove_edge, plus 'id', 'label' and 'shape' (Mermaid delimiters such as '[]', '[()]', '{{}}') for nodes, "
+            f"or 'source', 'target' and 'label' for edges; removing a node removes its edges), "
+            f"'description_edits' (list of objects with 'op' one of replace, delete, insert, the 'sentence' number "
+            f"as given, and 'text'; insert places text after that sentence, 0 for the start), "
+            f"'recommendations_add' (list of strings) and 'recommendations_remove' (list of recommendation numbers)."
+        )
+        changes = []
+        if added:
+            changes.append(f"Added constraints: {', '.join(added)}")
+        if removed:
+            changes.append(f"Removed constraints: {', '.join(removed)}")
+        if instruction:
+            changes.append(f"Instruction: {instruction}")
+        user_message = (
+            f"{compact_state(architecture)}\n\n"
+            f"CONSTRAINTS NOW: {', '.join(constraints) if constraints else 'None'}\n\n"
+            f"REQUESTED CHANGES:\n" + "\n".join(changes)
+        )
+        return [
+            {"role": SYSTEM_ROLE, "content": system_message},
+            {"role": USER_ROLE, "content": user_message},
+        ]
+
+    # This method doesn't perform I/O, can remain synchronous
+    def _build_summary_prompt(self, code: str) -> list[dict]:
+        """Builds messages asking for a structured summary of one chunk of a codebase."""
+        system_message = (
+            "You are an AI assistant specializing in software architecture, analyzing part of an existing codebase. "
+            "The input is source code, or summaries of other parts of the same codebase. "
+            "Reply with a JSON object with keys 'summary' (string, what this code does, at most a few sentences) and "
+            "'components' (list of objects with 'name', 'responsibility', 'technologies' (list of strings) and "
+            "'depends_on' (list of component names)). Only list deployable or clearly separated components."
+        )
+        return [
+            {"role": SYSTEM_ROLE, "content": system_message},
+            {"role": USER_ROLE, "content": code},
+        ]
+
+    # This method doesn't perform I/O, can remain synchronous
+    def _build_synthesis_prompt(self, summaries: list[str], project_type: str, constraints: list[str]) -> list[dict]:
+        """Builds messages reconstructing an architecture from chunk summaries (the reduce step)."""
+        system_message = (
+            f"You are an AI assistant specializing in software architecture. "
+            f"Reconstruct the architecture of an existing '{project_type}' codebase from summaries of its parts. "
+            f"Evaluate it against the following constraints: {', '.join(constraints) if constraints else 'None'}. "
+            f"Provide the output as a JSON object with the following keys: "
+            f"'architecture_diagram' (string, MUST be valid Mermaid diagram syntax), "
+            f"'description' (string), and 'recommendations' (list of strings)."
+        )
+        user_message = "\n\n".join(f"PART {i}:\n{summary}" for i, summary in enumerate(summaries, 1))
+        return [
+            {"role": SYSTEM_ROLE, "content": system_message},
+            {"role": USER_ROLE, "content": user_message},
+        ]
 
     # This method doesn't perform I/O, can remain synchronous
     def _parse_and_validate_response(self, response_content: str) -> ArchitectureResponse:
@@ -148,13 +433,20 @@ class ArchitectureService:
             raise ParsingError(f"Unexpected error processing AI response: {e}") from e
 
     # Make the main public method asynchronous
-    async def generate(self, prompt: str, project_type: str, constraints: list[str]) -> ArchitectureResponse:
+    async def generate(
+        self, prompt: str, project_type: str, constraints: list[str], use_presets: bool = True
+    ) -> ArchitectureResponse:
         """Generates software architecture asynchronously by calling the OpenAI API and parsing the response.
 
+        Exact and near-duplicate cached responses are served first. Otherwise, if the
+        request is close to a precomputed preset, the preset is served or used to seed
+        a cheaper refinement call.
+
         Args:
             prompt: The user's main requirement or description for the architecture.
             project_type: The type of project (e.g., 'Web Application', 'Data Pipeline').
             constraints: A list of specific constraints or requirements for the architecture.
+            use_presets: Whether precomputed presets may be used (False when computing them).
 
         Returns:
             An ArchitectureResponse object containing the generated architecture details,
@@ -167,16 +459,37 @@ class ArchitectureService:
             ArchitectureGenerationError: For any other unexpected errors occurring during the
                                        orchestration of the generation process.
             ServiceError: If the service itself fails to initialize (e.g., missing API key).
+            DeadlineExceededError: If the request deadline expires before the model responds.
         """
+        started = time.perf_counter()
         try:
-            messages = self._build_openai_prompt(prompt, project_type, constraints)
-            # Use await to call the async helper method
-            raw_response = await self._call_openai_api(messages) 
-            # Parsing is sync, no await needed here
-            validated_response = self._parse_and_validate_response(raw_response) 
+            cache_key = response_cache_key(prompt, project_type, constraints, self.provider.model)
+            cached_response = await self._get_cached_response(cache_key)
+            if cached_response is not None:
+                await self._record_usage(project_type, "exact_hit", started)
+                return cached_response
+            if self.semantic_cache is not None:
+                similar_response = self.semantic_cache.lookup(prompt, project_type, constraints)
+                if similar_response is not None:
+                    await self._record_usage(project_type, "semantic_hit", started)
+                    return similar_response
+
+            validated_response = None
+            if use_presets and self.presets is not None:
+                validated_response = await self._generate_from_preset(prompt, project_type, constraints, started)
+            if validated_response is None:
+                messages = self._build_openai_prompt(prompt, project_type, constraints)
+                # Use await to call the async helper method
+                raw_response, usage = await self._call_llm(messages)
+                await self._record_usage(project_type, "miss", started, usage)
+                # Parsing is sync, no await needed here
+                validated_response = self._parse_and_validate_response(raw_response)
+            await self._cache_response(cache_key, validated_response)
+            if self.semantic_cache is not None:
+                self.semantic_cache.add(prompt, project_type, constraints, validated_response)
             return validated_response
 
-        except (OpenAIServiceError, ParsingError) as e:
+        except (OpenAIServiceError, ParsingError, DeadlineExceededError) as e:
             logger.error(f"Generation failed due to service error: {e}") 
             raise e
         except Exception as e:
@@ -185,3 +498,120 @@ class ArchitectureService:
                 exc_info=True
             )
             raise ArchitectureGenerationError(f"An unexpected error occurred during generation: {e}") from e
+
+    async def _generate_from_preset(
+        self, prompt: str, project_type: str, constraints: list[str], started: float
+    ) -> ArchitectureResponse | None:
+        """Serves or seeds a request from the closest preset; None if no preset applies."""
+        match = self.presets.match(prompt, project_type, constraints)
+        if match is None:
+            return None
+        if match.serve:
+            logger.info(f"Serving preset baseline (similarity {match.similarity:.3f}).")
+            await self._record_usage(project_type, "preset_hit", started)
+            return match.architecture
+        try:
+            return await self.refine(
+                match.architecture,
+                project_type,
+                constraints,
+                added=[],
+                removed=[],
+                instruction=f"Adapt this baseline architecture to these requirements: {prompt}",
+                usage_endpoint=USAGE_ENDPOINT,
+                cache_outcome="preset_seeded",
+            )
+        except ParsingError as e:
+            logger.warning(f"Preset-seeded refinement failed, falling back to full generation: {e}")
+            return None
+
+    async def refine(
+        self,
+        architecture: ArchitectureResponse,
+        project_type: str,
+        constraints: list[str],
+        added: list[str],
+        removed: list[str],
+        instruction: str | None,
+        usage_endpoint: str = REFINE_USAGE_ENDPOINT,
+        cache_outcome: str = "miss",
+    ) -> ArchitectureResponse:
+        """Refines an existing architecture by requesting and applying a patch.
+
+        Args:
+            architecture: The current version.
+            project_type: The project type the architecture was generated for.
+            constraints: The constraints after applying `added` and `removed`.
+            added: Constraints added in this refinement.
+            removed: Constraints removed in this refinement.
+            instruction: Optional free-form follow-up instruction.
+            usage_endpoint: The endpoint the usage is accounted to.
+            cache_outcome: The cache outcome the usage is recorded with.
+
+        Returns:
+            The refined architecture (not yet persisted).
+
+        Raises:
+            OpenAIServiceError: If communication with the OpenAI API fails.
+            ParsingError: If the model's patch is not valid JSON or does not match ArchitecturePatch.
+            DeadlineExceededError: If the request deadline expires before the model responds.
+            ArchitectureGenerationError: For any other unexpected error.
+        """
+        started = time.perf_counter()
+        try:
+            messages = self._build_refinement_prompt(architecture, project_type, constraints, added, removed, instruction)
+            raw_response, usage = await self._call_llm(messages, max_tokens=settings.REFINEMENT_MAX_TOKENS)
+            await self._record_usage(project_type, cache_outcome, started, usage, endpoint=usage_endpoint)
+            try:
+                patch = ArchitecturePatch.model_validate_json(raw_response)
+            except ValidationError as e:
+                logger.error(f"Refinement patch validation failed: {e}")
+                raise ParsingError(f"AI patch did not match expected format: {e}") from e
+            return apply_patch(architecture, patch)
+        except (OpenAIServiceError, ParsingError, DeadlineExceededError) as e:
+            logger.error(f"Refinement failed due to service error: {e}")
+            raise e
+        except Exception as e:
+            logger.error(f"An unexpected error occurred in ArchitectureService.refine: {e}", exc_info=True)
+            raise ArchitectureGenerationError(f"An unexpected error occurred during refinement: {e}") from e
+
+    async def summarize_code(self, code: str, project_type: str) -> CodeSummary:
+        """Summarizes one chunk of a codebase (or a batch of summaries) for repository analysis.
+
+        Args:
+            code: Formatted source files, or summaries of other chunks.
+            project_type: The project type, used for usage accounting.
+
+        Returns:
+            The model's structured summary.
+
+        Raises:
+            OpenAIServiceError: If communication with the AI service fails.
+            ParsingError: If the summary does not match CodeSummary.
+            DeadlineExceededError: If the request deadline expires before the model responds.
+        """
+        started = time.perf_counter()
+        messages = self._build_summary_prompt(code)
+        raw_response, usage = await self._call_llm(messages, max_tokens=settings.REPOSITORY_SUMMARY_MAX_TOKENS)
+        await self._record_usage(project_type, "miss", started, usage, endpoint=ANALYZE_USAGE_ENDPOINT)
+        try:
+            return CodeSummary.model_validate_json(raw_response)
+        except ValidationError as e:
+            logger.error(f"Code summary validation failed: {e}")
+            raise ParsingError(f"AI summary did not match expected format: {e}") from e
+
+    async def synthesize_architecture(
+        self, summaries: list[str], project_type: str, constraints: list[str]
+    ) -> ArchitectureResponse:
+        """Reconstructs an architecture from the summaries of a codebase's chunks.
+
+        Raises:
+            OpenAIServiceError: If communication with the AI service fails.
+            ParsingError: If the response cannot be parsed as an ArchitectureResponse.
+            DeadlineExceededError: If the request deadline expires before the model responds.
+        """
+        started = time.perf_counter()
+        messages = self._build_synthesis_prompt(summaries, project_type, constraints)
+        raw_response, usage = await self._call_llm(messages)
+        await self._record_usage(project_type, "miss", started, usage, endpoint=ANALYZE_USAGE_ENDPOINT)
+        return self._parse_and_validate_response(raw_response)
@@ -0,0 +1,230 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from app.core.config import settings
+from app.core.exceptions import ArchitectureNotFoundError, StorageError
+from app.schemas.architecture import ArchitectureResponse
+from app.utils.sqlite import apply_migrations, open_sqlite
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS architectures (
+    id TEXT PRIMARY KEY,
+    prompt TEXT NOT NULL,
+    project_type TEXT NOT NULL,
+    constraints TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_architectures_created_at ON architectures (created_at);
+"""
+
+# Applied in order on top of SCHEMA by apply_migrations.
+MIGRATIONS = [
+    # 1: refinement history
+    """
+    ALTER TABLE architectures ADD COLUMN parent_id TEXT;
+    ALTER TABLE architectures ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
+    CREATE INDEX IF NOT EXISTS ix_architectures_parent_id ON architectures (parent_id);
+    """,
+    # 2: keyset pagination for exports
+    """
+    CREATE INDEX IF NOT EXISTS ix_architectures_created_at_id ON architectures (created_at, id);
+    """,
+]
+
+
+def content_hash(architecture: ArchitectureResponse) -> str:
+    """Returns a stable SHA-256 hash of the generated architecture content."""
+    canonical = json.dumps(
+        {
+            "architecture_diagram": architecture.architecture_diagram,
+            "description": architecture.description,
+            "recommendations": architecture.recommendations,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ArchitectureRecord:
+    """A persisted architecture together with the request that produced it."""
+    id: str
+    prompt: str
+    project_type: str
+    constraints: list[str]
+    architecture: ArchitectureResponse
+    content_hash: str
+    created_at: datetime
+    parent_id: str | None = None
+    version: int = 1
+
+
+class ArchitectureStore:
+    """SQLite-backed persistence for generated architectures.
+
+    The sqlite3 module is blocking, so every query runs in a worker thread via
+    `asyncio.to_thread`. A single connection is shared and serialized with a lock.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        try:
+            self._conn = open_sqlite(db_path)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.executescript(SCHEMA)
+            apply_migrations(self._conn, MIGRATIONS, "architecture store")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open architecture store at {db_path}: {e}", exc_info=True)
+            raise StorageError(f"Failed to open architecture store: {e}") from e
+        self._lock = threading.Lock()
+
+    def _execute(self, query: str, params: tuple = ()) -> list[sqlite3.Row]:
+        with self._lock:
+            try:
+                with self._conn:
+                    return self._conn.execute(query, params).fetchall()
+            except sqlite3.Error as e:
+                logger.error(f"Architecture store query failed: {e}", exc_info=True)
+                raise StorageError(f"Architecture store query failed: {e}") from e
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> ArchitectureRecord:
+        architecture = ArchitectureResponse.model_validate_json(row["payload"])
+        architecture.architecture_id = row["id"]
+        return ArchitectureRecord(
+            id=row["id"],
+            prompt=row["prompt"],
+            project_type=row["project_type"],
+            constraints=json.loads(row["constraints"]),
+            architecture=architecture,
+            content_hash=row["content_hash"],
+            created_at=datetime.fromisoformat(row["created_at"]),
+            parent_id=row["parent_id"],
+            version=row["version"],
+        )
+
+    async def save(
+        self,
+        prompt: str,
+        project_type: str,
+        constraints: list[str],
+        architecture: ArchitectureResponse,
+        parent_id: str | None = None,
+        version: int = 1,
+    ) -> ArchitectureRecord:
+        """Persists a generated architecture and returns the stored record.
+
+        Refinements pass the `parent_id` they were derived from and their `version`.
+        """
+        record = ArchitectureRecord(
+            id=uuid.uuid4().hex,
+            prompt=prompt,
+            project_type=project_type,
+            constraints=list(constraints),
+            architecture=architecture.model_copy(),
+            content_hash=content_hash(architecture),
+            created_at=datetime.now(timezone.utc),
+            parent_id=parent_id,
+            version=version,
+        )
+        record.architecture.architecture_id = record.id
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO architectures "
+            "(id, prompt, project_type, constraints, payload, content_hash, created_at, parent_id, version) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                record.id,
+                record.prompt,
+                record.project_type,
+                json.dumps(record.constraints),
+                architecture.model_dump_json(exclude={"architecture_id"}),
+                record.content_hash,
+                record.created_at.isoformat(),
+                record.parent_id,
+                record.version,
+            ),
+        )
+        logger.info(f"Stored architecture {record.id}")
+        return record
+
+    async def get(self, architecture_id: str) -> ArchitectureRecord:
+        """Fetches a stored architecture.
+
+        Raises:
+            ArchitectureNotFoundError: If no architecture exists with the given ID.
+        """
+        rows = await asyncio.to_thread(
+            self._execute, "SELECT * FROM architectures WHERE id = ?", (architecture_id,)
+        )
+        if not rows:
+            raise ArchitectureNotFoundError(f"Architecture '{architecture_id}' not found.")
+        return self._to_record(rows[0])
+
+    async def iter_records(
+        self,
+        project_type: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[ArchitectureRecord]:
+        """Yields stored architectures oldest first, reading `batch_size` rows per query.
+
+        Pages are fetched by keyset pagination on (created_at, id), so every query is
+        an index range scan no matter how deep the export is, only one batch is held
+        in memory, and the store lock is released between batches.
+
+        Args:
+            project_type: Only yield architectures of this project type.
+            start: Only yield architectures created at or after this (UTC) time.
+            end: Only yield architectures created before this (UTC) time.
+            batch_size: Rows fetched per query.
+
+        Raises:
+            StorageError: If a query fails.
+        """
+        conditions, params = [], []
+        if project_type is not None:
+            conditions.append("project_type = ?")
+            params.append(project_type)
+        # created_at is stored as UTC ISO 8601 text, which sorts chronologically.
+        if start is not None:
+            conditions.append("created_at >= ?")
+            params.append(start.astimezone(timezone.utc).isoformat())
+        if end is not None:
+            conditions.append("created_at < ?")
+            params.append(end.astimezone(timezone.utc).isoformat())
+        cursor: tuple[str, str] | None = None
+        while True:
+            page_conditions = conditions + (["(created_at, id) > (?, ?)"] if cursor else [])
+            where = f"WHERE {' AND '.join(page_conditions)} " if page_conditions else ""
+            rows = await asyncio.to_thread(
+                self._execute,
+                f"SELECT * FROM architectures {where}ORDER BY created_at, id LIMIT ?",
+                (*params, *(cursor or ()), batch_size),
+            )
+            for row in rows:
+                yield self._to_record(row)
+            if len(rows) < batch_size:
+                return
+            cursor = (rows[-1]["created_at"], rows[-1]["id"])
+
+
+@lru_cache
+def get_architecture_store() -> ArchitectureStore:
+    """Returns the process-wide ArchitectureStore (usable as a FastAPI dependency)."""
+    return ArchitectureStore(settings.ARCHITECTURE_DB_PATH)
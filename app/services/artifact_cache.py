@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from functools import lru_cache
+
+from app.core.config import settings
+from app.core.exceptions import StorageError
+from app.utils.sqlite import open_sqlite
+
+logger = logging.getLogger(__name__)
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    key TEXT PRIMARY KEY,
+    blob TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_artifacts_last_used ON artifacts (last_used);
+CREATE INDEX IF NOT EXISTS ix_artifacts_blob ON artifacts (blob);
+"""
+
+
+def artifact_key(*parts: str) -> str:
+    """Builds a cache key from its parts, e.g. (architecture hash, component, language, model)."""
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+def fingerprint(value: dict | list | str | None) -> str:
+    """Returns a stable digest of a JSON-serializable value, used to detect stale entries."""
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class BlobStore:
+    """Content-addressed file store: each blob lives at `<root>/<aa>/<sha256>`.
+
+    Identical artifacts are stored once no matter how many keys reference them.
+    """
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        os.makedirs(root_dir, exist_ok=True)
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root_dir, digest[:2], digest)
+
+    def put(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if os.path.exists(path):
+            return digest
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file first so readers never observe a partial blob.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return digest
+
+    def read(self, digest: str) -> bytes | None:
+        try:
+            with open(self.path(digest), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def delete(self, digest: str) -> None:
+        try:
+            os.remove(self.path(digest))
+        except FileNotFoundError:
+            pass
+
+
+class ArtifactCache:
+    """Size-bounded LRU cache of generated artifacts backed by a content-addressed blob store.
+
+    Each entry maps a key to a blob plus a `fingerprint` of the inputs that are not
+    part of the key (e.g. upstream interfaces). A lookup with a different fingerprint
+    is a miss, and the stale entry is replaced on the next `put`. When the total size
+    of referenced blobs exceeds `max_bytes`, least recently used entries are evicted.
+    """
+
+    def __init__(self, root_dir: str, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.blobs = BlobStore(os.path.join(root_dir, "blobs"))
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        try:
+            self._conn = open_sqlite(os.path.join(root_dir, "index.db"))
+            self._conn.executescript(INDEX_SCHEMA)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open artifact cache index in {root_dir}: {e}", exc_info=True)
+            raise StorageError(f"Failed to open artifact cache: {e}") from e
+
+    def _get(self, key: str, expected_fingerprint: str) -> bytes | None:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT blob, fingerprint FROM artifacts WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            if row[1] != expected_fingerprint:
+                self.stats["stale"] += 1
+                return None
+            data = self.blobs.read(row[0])
+            if data is None:
+                # Blob removed behind our back; drop the dangling entry.
+                self._conn.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+                self.stats["misses"] += 1
+                return None
+            self._conn.execute("UPDATE artifacts SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.stats["hits"] += 1
+            return data
+
+    def _put(self, key: str, data: bytes, entry_fingerprint: str) -> None:
+        digest = self.blobs.put(data)
+        with self._lock, self._conn:
+            previous = self._conn.execute("SELECT blob FROM artifacts WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts (key, blob, size, fingerprint, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, digest, len(data), entry_fingerprint, time.time()),
+            )
+            if previous and previous[0] != digest:
+                self._release_blob(previous[0])
+            self._evict()
+
+    def _release_blob(self, digest: str) -> None:
+        referenced = self._conn.execute("SELECT 1 FROM artifacts WHERE blob = ? LIMIT 1", (digest,)).fetchone()
+        if not referenced:
+            self.blobs.delete(digest)
+
+    def _total_bytes(self) -> int:
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT blob, size FROM artifacts)").fetchone()
+        return row[0]
+
+    def _evict(self) -> None:
+        total = self._total_bytes()
+        while total > self.max_bytes:
+            row = self._conn.execute("SELECT key, blob FROM artifacts ORDER BY last_used LIMIT 1").fetchone()
+            if row is None:
+                break
+            self._conn.execute("DELETE FROM artifacts WHERE key = ?", (row[0],))
+            self._release_blob(row[1])
+            self.stats["evictions"] += 1
+            total = self._total_bytes()
+
+    async def get(self, key: str, expected_fingerprint: str = "") -> bytes | None:
+        """Returns the cached artifact for `key`, or None on a miss or stale fingerprint."""
+        try:
+            return await asyncio.to_thread(self._get, key, expected_fingerprint)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Artifact cache lookup failed, treating as miss: {e}")
+            return None
+
+    async def put(self, key: str, data: bytes, entry_fingerprint: str = "") -> None:
+        """Stores an artifact, evicting least recently used entries if over budget."""
+        try:
+            await asyncio.to_thread(self._put, key, data, entry_fingerprint)
+        except (sqlite3.Error, OSError) as e:
+            # A cache write failure must never fail the generation itself.
+            logger.warning(f"Artifact cache write failed: {e}")
+
+
+@lru_cache
+def get_artifact_cache() -> ArtifactCache | None:
+    """Returns the process-wide ArtifactCache, or None when caching is disabled."""
+    if not settings.ARTIFACT_CACHE_ENABLED:
+        return None
+    return ArtifactCache(settings.ARTIFACT_CACHE_DIR, settings.ARTIFACT_CACHE_MAX_BYTES)
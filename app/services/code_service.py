@@ -1,21 +1,232 @@
+import asyncio
 import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable
+
+from app.core.exceptions import CodeGenerationError
 from app.schemas.code import CodeGenerationResponse
+from app.services.architecture_store import ArchitectureRecord
+from app.services.artifact_cache import ArtifactCache, artifact_key, fingerprint
+from app.services.llm_providers import configured_model
+from app.utils.graph import dependency_waves
+from app.utils.mermaid import parse_flowchart
 
 logger = logging.getLogger(__name__)
 
+# Lines that make up a component's public surface, across the languages we target.
+INTERFACE_LINE_RE = re.compile(
+    r"^\s*(?:async\s+def|def|class|interface|export|public|func|fn|pub\s+fn|type)\b"
+)
+
 async def generate_code_service(
     architecture_id: str,
     component_name: str,
     programming_language: str,
+    upstream_interfaces: dict[str, str] | None = None,
 ) -> CodeGenerationResponse:
-    """Placeholder service for generating code."""
+    """Placeholder service for generating code.
+
+    Args:
+        architecture_id: The architecture the component belongs to.
+        component_name: The component to generate code for.
+        programming_language: The target language.
+        upstream_interfaces: Interfaces of the components this one depends on, keyed by
+            component name. These are meant to be included in the generation prompt.
+    """
     logger.info(
         f"Generating code for component '{component_name}' (arch: {architecture_id}) "
         f"in {programming_language}..."
     )
     # TODO: Implement actual code generation logic using AI
+    dependencies = "".join(f"# depends on: {name}\n" for name in sorted(upstream_interfaces or {}))
     return CodeGenerationResponse(
-        code="# Generated code will appear here",
+        code=f"{dependencies}# Generated code will appear here",
         documentation="Generated documentation will appear here",
         tests="# Generated tests will appear here",
     )
+
+
+async def generate_component_cached(
+    generate_component: Callable[..., Awaitable[CodeGenerationResponse]],
+    cache: ArtifactCache | None,
+    architecture_hash: str,
+    architecture_id: str,
+    component_name: str,
+    programming_language: str,
+    upstream_interfaces: dict[str, str] | None = None,
+) -> tuple[CodeGenerationResponse, bool]:
+    """Generates a component through the artifact cache.
+
+    Artifacts are keyed by (architecture content hash, component, language, configured
+    model, upstream interfaces fingerprint), so a component generated standalone and the
+    same component generated with its dependencies' interfaces are cached side by side
+    instead of overwriting each other. A changed interface yields a new key, so the
+    cache's fingerprint check is not needed here.
+
+    Returns:
+        The generated (or cached) code and whether it came from the cache.
+    """
+    if cache is None:
+        result = await generate_component(
+            architecture_id=architecture_id,
+            component_name=component_name,
+            programming_language=programming_language,
+            upstream_interfaces=upstream_interfaces,
+        )
+        return result, False
+
+    upstream_fingerprint = fingerprint(upstream_interfaces or {})
+    key = artifact_key(
+        architecture_hash, component_name, programming_language, configured_model(), upstream_fingerprint
+    )
+    cached = await cache.get(key)
+    if cached is not None:
+        logger.info(f"Reusing cached artifact for component '{component_name}' (arch: {architecture_id}).")
+        return CodeGenerationResponse.model_validate_json(cached), True
+
+    result = await generate_component(
+        architecture_id=architecture_id,
+        component_name=component_name,
+        programming_language=programming_language,
+        upstream_interfaces=upstream_interfaces,
+    )
+    await cache.put(key, result.model_dump_json().encode("utf-8"))
+    return result, False
+
+
+def extract_interface(code: str) -> str:
+    """Extracts the declaration lines (classes, functions, exports) from generated code.
+
+    The result is what downstream components see of this one, which keeps their
+    prompts small compared to passing the full source.
+    """
+    return "\n".join(line.rstrip() for line in code.splitlines() if INTERFACE_LINE_RE.match(line))
+
+
+@dataclass
+class CodeGenerationPlan:
+    """The components of an architecture and the order they must be generated in."""
+    architecture_id: str
+    architecture_hash: str
+    components: dict[str, str]  # node id -> component name
+    dependencies: dict[str, set[str]]
+    waves: list[list[str]]
+
+
+def build_code_generation_plan(record: ArchitectureRecord) -> CodeGenerationPlan:
+    """Extracts components and their dependency waves from a stored architecture.
+
+    Raises:
+        CodeGenerationError: If the architecture diagram contains no components.
+    """
+    graph = parse_flowchart(record.architecture.architecture_diagram)
+    if not graph.nodes:
+        raise CodeGenerationError(
+            f"Architecture '{record.id}' has no components in its diagram to generate code for."
+        )
+    dependencies = graph.dependencies()
+    return CodeGenerationPlan(
+        architecture_id=record.id,
+        architecture_hash=record.content_hash,
+        components={node_id: node.label for node_id, node in graph.nodes.items()},
+        dependencies=dependencies,
+        waves=dependency_waves(dependencies),
+    )
+
+
+async def generate_architecture_code(
+    plan: CodeGenerationPlan,
+    programming_language: str,
+    max_concurrency: int,
+    generate_component: Callable[..., Awaitable[CodeGenerationResponse]] = generate_code_service,
+    cache: ArtifactCache | None = None,
+) -> AsyncIterator[dict]:
+    """Generates code for every component of a plan, wave by wave, yielding progress events.
+
+    Components within a wave run concurrently, bounded by `max_concurrency`. Each
+    component receives the interfaces of its already-generated dependencies. If a
+    dependency failed, the dependent component is skipped instead of generated against
+    a missing interface. When a cache is given, unchanged components are served from it.
+
+    Yields:
+        Progress events as JSON-serializable dicts, in completion order.
+    """
+    start = time.perf_counter()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    interfaces: dict[str, str] = {}
+    unavailable: set[str] = set()
+    counts = {"succeeded": 0, "failed": 0, "skipped": 0, "cached": 0}
+
+    yield {
+        "event": "plan",
+        "architecture_id": plan.architecture_id,
+        "waves": [[plan.components[node_id] for node_id in wave] for wave in plan.waves],
+    }
+
+    async def run(node_id: str, wave_index: int, queue: asyncio.Queue) -> None:
+        name = plan.components[node_id]
+        blocked = sorted(plan.components[dep] for dep in plan.dependencies[node_id] & unavailable)
+        if blocked:
+            unavailable.add(node_id)
+            counts["skipped"] += 1
+            await queue.put({"event": "component_skipped", "component": name, "wave": wave_index,
+                             "reason": f"Upstream components failed: {', '.join(blocked)}"})
+            return
+        upstream = {plan.components[dep]: interfaces[dep]
+                    for dep in plan.dependencies[node_id] if dep in interfaces}
+        async with semaphore:
+            await queue.put({"event": "component_started", "component": name, "wave": wave_index})
+            component_start = time.perf_counter()
+            try:
+                result, cached = await generate_component_cached(
+                    generate_component,
+                    cache,
+                    architecture_hash=plan.architecture_hash,
+                    architecture_id=plan.architecture_id,
+                    component_name=name,
+                    programming_language=programming_language,
+                    upstream_interfaces=upstream,
+                )
+            except Exception as e:
+                logger.error(f"Code generation failed for component '{name}': {e}", exc_info=True)
+                unavailable.add(node_id)
+                counts["failed"] += 1
+                await queue.put({"event": "component_failed", "component": name, "wave": wave_index,
+                                 "error": str(e)})
+                return
+        interfaces[node_id] = extract_interface(result.code)
+        counts["succeeded"] += 1
+        counts["cached"] += cached
+        await queue.put({
+            "event": "component_completed",
+            "component": name,
+            "wave": wave_index,
+            "cached": cached,
+            "duration_ms": round((time.perf_counter() - component_start) * 1000, 1),
+            "result": result.model_dump(),
+        })
+
+    for wave_index, wave in enumerate(plan.waves):
+        queue: asyncio.Queue = asyncio.Queue()
+        tasks = [asyncio.create_task(run(node_id, wave_index, queue)) for node_id in wave]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                event = await queue.get()
+                if event["event"] != "component_started":
+                    remaining -= 1
+                yield event
+        finally:
+            # The consumer may stop iterating (e.g. client disconnect); don't leak work.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    yield {
+        "event": "completed",
+        "architecture_id": plan.architecture_id,
+        **counts,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
@@ -1,18 +1,95 @@
 import logging
-from app.schemas.deploy import DeploymentRequest, DeploymentResponse, DeploymentTarget
+from dataclasses import asdict
+
+from app.core.broker import Subscription
+from app.schemas.deploy import (
+    DeploymentResponse,
+    DeploymentStageStatus,
+    DeploymentStatusResponse,
+    DeploymentTarget,
+)
+from app.services.deployment_engine import (
+    TERMINAL_STATUSES,
+    Deployment,
+    deployment_topic,
+    get_deployment_engine,
+)
 
 logger = logging.getLogger(__name__)
 
+def to_status_response(deployment: Deployment) -> DeploymentStatusResponse:
+    """Converts the engine's deployment state into its API schema."""
+    return DeploymentStatusResponse(
+        deployment_id=deployment.id,
+        architecture_id=deployment.architecture_id,
+        target=deployment.target,
+        status=deployment.status,
+        deployment_url=deployment.deployment_url,
+        stages=[DeploymentStageStatus(**asdict(stage)) for stage in deployment.stages.values()],
+        resources=dict(deployment.resource_status),
+        resource_durations_ms=dict(deployment.resource_durations_ms),
+        error=deployment.error,
+    )
+
 async def deploy_service(
     architecture_id: str, target: DeploymentTarget, configuration: dict
 ) -> DeploymentResponse:
-    """Placeholder service for deployment."""
+    """Starts a deployment of a stored architecture in the background.
+
+    Raises:
+        ArchitectureNotFoundError: If the architecture does not exist.
+        UnsupportedDeploymentTargetError: If the target has no backend yet.
+        DeploymentError: If the architecture cannot be deployed.
+    """
     logger.info(
         f"Deploying architecture {architecture_id} to {target.value} with config: {configuration}"
     )
-    # TODO: Implement actual deployment logic
+    deployment = await get_deployment_engine().start(architecture_id, target, configuration)
     return DeploymentResponse(
-        status="Deployment Initiated (Placeholder)",
-        deployment_url=f"http://placeholder.com/{architecture_id}",
-        message=f"Deployment to {target.value} started.",
+        status="Initiated",
+        deployment_id=deployment.id,
+        message=(
+            f"Deployment to {target.value} started with {len(deployment.resources)} resources. "
+            f"Follow progress at /api/v1/deploy/{deployment.id}."
+        ),
     )
+
+async def get_deployment_status_service(deployment_id: str) -> DeploymentStatusResponse:
+    """Returns the current status of a deployment.
+
+    Raises:
+        DeploymentNotFoundError: If the deployment does not exist.
+    """
+    return to_status_response(get_deployment_engine().get(deployment_id))
+
+async def resume_deployment_service(deployment_id: str, configuration: dict) -> DeploymentStatusResponse:
+    """Resumes a failed deployment from its failed stage.
+
+    Raises:
+        DeploymentNotFoundError: If the deployment does not exist.
+        DeploymentStateError: If the deployment has not failed.
+    """
+    logger.info(f"Resuming deployment {deployment_id} with config overrides: {configuration}")
+    deployment = await get_deployment_engine().resume(deployment_id, configuration)
+    return to_status_response(deployment)
+
+def subscribe_deployment_events_service(
+    deployment_id: str,
+) -> tuple[DeploymentStatusResponse, Subscription | None]:
+    """Subscribes to a deployment's live progress events.
+
+    The subscription is taken before the status snapshot, so no event can fall between
+    the two. Finished deployments return no subscription since nothing more will happen.
+
+    Returns:
+        The current status snapshot and the live subscription (None if finished).
+
+    Raises:
+        DeploymentNotFoundError: If the deployment does not exist.
+    """
+    engine = get_deployment_engine()
+    deployment = engine.get(deployment_id)
+    subscription = None
+    if deployment.status not in TERMINAL_STATUSES:
+        subscription = engine.broker.subscribe(deployment_topic(deployment_id))
+    return to_status_response(deployment), subscription
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import logging
+import os
+import tarfile
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.exceptions import DeploymentError, UnsupportedDeploymentTargetError
+from app.schemas.deploy import DeploymentTarget
+
+logger = logging.getLogger(__name__)
+
+# Mermaid node shapes mapped to the kind of resource they most likely describe.
+SHAPE_RESOURCE_KINDS = {
+    "[()]": "database",
+    "(())": "queue",
+    "{}": "gateway",
+    "{{}}": "gateway",
+}
+DEFAULT_RESOURCE_KIND = "service"
+
+
+@dataclass
+class Resource:
+    """A deployable unit derived from one component of the architecture diagram."""
+    name: str
+    kind: str
+    label: str = ""
+    depends_on: list[str] = field(default_factory=list)
+
+
+class DeploymentBackend(ABC):
+    """The operations a deployment target must provide to the DeploymentEngine.
+
+    Every method may be called concurrently for different resources, and must be
+    idempotent so that a failed deployment can be resumed.
+    """
+
+    @abstractmethod
+    async def render(self, deployment_id: str, resources: list[Resource], configuration: dict) -> dict:
+        """Renders the infrastructure-as-code template for the deployment."""
+
+    @abstractmethod
+    async def package(self, deployment_id: str, resource: Resource, configuration: dict) -> str:
+        """Builds the deployable artifact for a resource and returns its location."""
+
+    @abstractmethod
+    async def provision(self, deployment_id: str, resource: Resource, configuration: dict) -> None:
+        """Creates (or updates) the resource in the target environment."""
+
+    @abstractmethod
+    async def verify(self, deployment_id: str, resources: list[Resource], configuration: dict) -> str:
+        """Checks that every resource is healthy and returns the deployment URL."""
+
+
+class LocalDeploymentBackend(DeploymentBackend):
+    """A file-backed fake cloud so the whole pipeline can run (and be benchmarked) offline.
+
+    Each deployment gets a directory under `root_dir` holding the rendered template,
+    one package per resource and one state file per provisioned resource. Provider
+    latency is simulated with `latency_seconds` per operation.
+
+    The `fail_resources` configuration key (a list of resource names) makes
+    provisioning of those resources fail, which is useful for exercising resume.
+    """
+
+    def __init__(self, root_dir: str, latency_seconds: float = 0.0):
+        self.root_dir = Path(root_dir)
+        self.latency_seconds = latency_seconds
+
+    def _deployment_dir(self, deployment_id: str) -> Path:
+        return self.root_dir / deployment_id
+
+    async def _simulate_latency(self) -> None:
+        if self.latency_seconds > 0:
+            await asyncio.sleep(self.latency_seconds)
+
+    @staticmethod
+    def _write_json(path: Path, data: dict) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    async def render(self, deployment_id: str, resources: list[Resource], configuration: dict) -> dict:
+        template = {
+            "version": 1,
+            "region": configuration.get("region", "local"),
+            "resources": {resource.name: asdict(resource) for resource in resources},
+        }
+        await self._simulate_latency()
+        await asyncio.to_thread(self._write_json, self._deployment_dir(deployment_id) / "template.json", template)
+        return template
+
+    def _write_package(self, deployment_id: str, resource: Resource) -> str:
+        package_dir = self._deployment_dir(deployment_id) / "packages"
+        package_dir.mkdir(parents=True, exist_ok=True)
+        manifest = package_dir / f"{resource.name}.json"
+        self._write_json(manifest, asdict(resource))
+        archive = package_dir / f"{resource.name}.tar.gz"
+        with tarfile.open(archive, "w:gz") as tar:
+            tar.add(manifest, arcname="manifest.json")
+        return str(archive)
+
+    async def package(self, deployment_id: str, resource: Resource, configuration: dict) -> str:
+        await self._simulate_latency()
+        return await asyncio.to_thread(self._write_package, deployment_id, resource)
+
+    async def provision(self, deployment_id: str, resource: Resource, configuration: dict) -> None:
+        await self._simulate_latency()
+        if resource.name in configuration.get("fail_resources", []):
+            raise DeploymentError(f"Simulated provisioning failure for resource '{resource.name}'.")
+        state = {"name": resource.name, "kind": resource.kind, "state": "provisioned", "updated_at": time.time()}
+        await asyncio.to_thread(
+            self._write_json, self._deployment_dir(deployment_id) / "resources" / f"{resource.name}.json", state
+        )
+
+    async def verify(self, deployment_id: str, resources: list[Resource], configuration: dict) -> str:
+        await self._simulate_latency()
+        resource_dir = self._deployment_dir(deployment_id) / "resources"
+        missing = [r.name for r in resources if not (resource_dir / f"{r.name}.json").exists()]
+        if missing:
+            raise DeploymentError(f"Resources not provisioned: {', '.join(missing)}")
+        return self._deployment_dir(deployment_id).resolve().as_uri()
+
+
+def get_deployment_backend(target: DeploymentTarget) -> DeploymentBackend:
+    """Returns the backend implementing a deployment target.
+
+    Raises:
+        UnsupportedDeploymentTargetError: If the target has no backend yet.
+    """
+    if target == DeploymentTarget.LOCAL:
+        return LocalDeploymentBackend(settings.LOCAL_DEPLOY_ROOT, settings.LOCAL_DEPLOY_LATENCY_SECONDS)
+    raise UnsupportedDeploymentTargetError(f"Deployment target '{target.value}' is not supported yet.")
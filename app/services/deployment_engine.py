@@ -0,0 +1,354 @@
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from typing import Callable
+
+from app.core.broker import EventBroker, get_event_broker
+from app.core.config import settings
+from app.core.exceptions import (
+    DeploymentError,
+    DeploymentNotFoundError,
+    DeploymentStateError,
+)
+from app.schemas.deploy import DeploymentTarget
+from app.services.architecture_store import ArchitectureStore, get_architecture_store
+from app.services.deploy_targets import (
+    DEFAULT_RESOURCE_KIND,
+    SHAPE_RESOURCE_KINDS,
+    DeploymentBackend,
+    Resource,
+    get_deployment_backend,
+)
+from app.utils.graph import dependency_waves
+from app.utils.mermaid import parse_flowchart
+
+logger = logging.getLogger(__name__)
+
+# --- Constants ---
+STAGES = ("render", "package", "provision", "verify")
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+TERMINAL_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED)
+
+RESOURCE_PACKAGED = "packaged"
+RESOURCE_PROVISIONED = "provisioned"
+
+
+@dataclass
+class StageResult:
+    """Status and timing of one pipeline stage."""
+    name: str
+    status: str = STATUS_PENDING
+    duration_ms: float | None = None
+    error: str | None = None
+
+
+@dataclass
+class Deployment:
+    """The state of one deployment, kept so it can be inspected and resumed."""
+    id: str
+    architecture_id: str
+    target: DeploymentTarget
+    configuration: dict
+    resources: list[Resource]
+    status: str = STATUS_PENDING
+    stages: dict[str, StageResult] = field(default_factory=lambda: {name: StageResult(name) for name in STAGES})
+    resource_status: dict[str, str] = field(default_factory=dict)
+    resource_durations_ms: dict[str, float] = field(default_factory=dict)
+    deployment_url: str | None = None
+    error: str | None = None
+    finished_at: float | None = None  # time.monotonic() of the last terminal status
+
+
+def deployment_topic(deployment_id: str) -> str:
+    """Returns the event broker topic a deployment publishes its progress to."""
+    return f"deployment:{deployment_id}"
+
+
+def resources_from_diagram(diagram: str) -> list[Resource]:
+    """Derives deployable resources, and their provisioning dependencies, from a Mermaid diagram."""
+    graph = parse_flowchart(diagram)
+    dependencies = graph.dependencies()
+    return [
+        Resource(
+            name=node.id,
+            kind=SHAPE_RESOURCE_KINDS.get(node.shape, DEFAULT_RESOURCE_KIND),
+            label=node.label,
+            depends_on=sorted(dependencies[node.id]),
+        )
+        for node in graph.nodes.values()
+    ]
+
+
+class DeploymentEngine:
+    """Runs deployments through the render -> package -> provision -> verify pipeline.
+
+    Deployments run as background tasks. Independent resources are packaged and
+    provisioned concurrently (bounded by `max_parallel`), with provisioning following
+    the dependency waves of the architecture diagram. Completed stages and resources
+    are remembered, so `resume` continues a failed deployment from where it stopped.
+
+    Stage transitions, resource updates and log lines are published to the event
+    broker under `deployment_topic(deployment_id)` for live progress streaming.
+
+    Finished deployments are kept in memory for inspection only for a while:
+    succeeded ones for `retention_seconds`, failed ones for `resume_window_seconds`
+    (after which they can no longer be resumed). At most `max_retained` finished
+    deployments are kept; beyond that the oldest succeeded ones are dropped first,
+    and failed ones only once their resume window has also ended.
+    """
+
+    def __init__(
+        self,
+        store: ArchitectureStore,
+        backend_factory: Callable[[DeploymentTarget], DeploymentBackend] = get_deployment_backend,
+        max_parallel: int = 8,
+        broker: EventBroker | None = None,
+        retention_seconds: float = 3600.0,
+        resume_window_seconds: float = 86400.0,
+        max_retained: int = 1000,
+    ):
+        self.store = store
+        self.backend_factory = backend_factory
+        self.max_parallel = max_parallel
+        self.broker = broker or EventBroker()
+        self.retention_seconds = retention_seconds
+        self.resume_window_seconds = resume_window_seconds
+        self.max_retained = max_retained
+        self._deployments: dict[str, Deployment] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    async def start(self, architecture_id: str, target: DeploymentTarget, configuration: dict) -> Deployment:
+        """Creates a deployment and starts running it in the background.
+
+        Raises:
+            ArchitectureNotFoundError: If the architecture does not exist.
+            UnsupportedDeploymentTargetError: If the target has no backend.
+            DeploymentError: If the architecture has no deployable components.
+        """
+        backend = self.backend_factory(target)
+        record = await self.store.get(architecture_id)
+        resources = resources_from_diagram(record.architecture.architecture_diagram)
+        if not resources:
+            raise DeploymentError(f"Architecture '{architecture_id}' has no components to deploy.")
+
+        deployment = Deployment(
+            id=uuid.uuid4().hex,
+            architecture_id=architecture_id,
+            target=target,
+            configuration=dict(configuration),
+            resources=resources,
+            resource_status={resource.name: STATUS_PENDING for resource in resources},
+        )
+        self._evict()
+        self._deployments[deployment.id] = deployment
+        self._launch(deployment, backend)
+        return deployment
+
+    async def resume(self, deployment_id: str, configuration: dict | None = None) -> Deployment:
+        """Restarts a failed deployment from its failed stage.
+
+        Args:
+            deployment_id: The deployment to resume.
+            configuration: Optional overrides merged into the original configuration.
+
+        Raises:
+            DeploymentNotFoundError: If the deployment does not exist.
+            DeploymentStateError: If the deployment has not failed.
+        """
+        deployment = self.get(deployment_id)
+        if deployment.status != STATUS_FAILED:
+            raise DeploymentStateError(
+                f"Deployment '{deployment_id}' is {deployment.status}; only failed deployments can be resumed."
+            )
+        deployment.configuration.update(configuration or {})
+        deployment.error = None
+        self._launch(deployment, self.backend_factory(deployment.target))
+        return deployment
+
+    def get(self, deployment_id: str) -> Deployment:
+        """Returns a deployment by ID.
+
+        Raises:
+            DeploymentNotFoundError: If the deployment does not exist.
+        """
+        try:
+            return self._deployments[deployment_id]
+        except KeyError:
+            raise DeploymentNotFoundError(f"Deployment '{deployment_id}' not found.") from None
+
+    async def wait(self, deployment_id: str) -> Deployment:
+        """Waits for the current run of a deployment to finish and returns it."""
+        task = self._tasks.get(deployment_id)
+        if task:
+            await asyncio.shield(task)
+        return self.get(deployment_id)
+
+    def _launch(self, deployment: Deployment, backend: DeploymentBackend) -> None:
+        deployment.finished_at = None
+        self._set_status(deployment, STATUS_RUNNING)
+        task = asyncio.create_task(self._run(deployment, backend))
+        self._tasks[deployment.id] = task
+
+        def forget(task: asyncio.Task) -> None:
+            if self._tasks.get(deployment.id) is task:
+                del self._tasks[deployment.id]
+
+        task.add_done_callback(forget)
+
+    def _evict(self) -> None:
+        """Drops finished deployments past their retention, then enforces `max_retained`.
+
+        Called when a deployment starts, as that is the only way the map grows.
+        """
+        now = time.monotonic()
+        finished = []
+        for deployment in list(self._deployments.values()):
+            if deployment.finished_at is None:
+                continue
+            age = now - deployment.finished_at
+            keep_for = self.resume_window_seconds if deployment.status == STATUS_FAILED else self.retention_seconds
+            if age >= keep_for:
+                del self._deployments[deployment.id]
+            else:
+                finished.append(deployment)
+        excess = len(finished) - self.max_retained
+        if excess <= 0:
+            return
+        # Succeeded deployments go first; failed ones stay resumable until their window ends.
+        succeeded = sorted((d for d in finished if d.status == STATUS_SUCCEEDED), key=lambda d: d.finished_at)
+        for deployment in succeeded[:excess]:
+            del self._deployments[deployment.id]
+
+    def _publish(self, deployment: Deployment, event: dict) -> None:
+        self.broker.publish(deployment_topic(deployment.id), {"timestamp": time.time(), **event})
+
+    def _log(self, deployment: Deployment, message: str, level: int = logging.INFO) -> None:
+        logger.log(level, f"[deployment {deployment.id}] {message}")
+        self._publish(deployment, {"type": "log", "level": logging.getLevelName(level), "message": message})
+
+    def _set_status(self, deployment: Deployment, status: str) -> None:
+        deployment.status = status
+        self._publish(deployment, {
+            "type": "deployment",
+            "status": status,
+            "deployment_url": deployment.deployment_url,
+            "error": deployment.error,
+        })
+        if status in TERMINAL_STATUSES:
+            self.broker.close_topic(deployment_topic(deployment.id))
+            deployment.finished_at = time.monotonic()
+
+    def _set_stage(self, deployment: Deployment, stage: StageResult, status: str) -> None:
+        stage.status = status
+        self._publish(deployment, {"type": "stage", **asdict(stage)})
+
+    def _set_resource(self, deployment: Deployment, resource: Resource, status: str) -> None:
+        deployment.resource_status[resource.name] = status
+        self._publish(deployment, {
+            "type": "resource",
+            "resource": resource.name,
+            "status": status,
+            "duration_ms": deployment.resource_durations_ms.get(resource.name),
+        })
+
+    async def _run(self, deployment: Deployment, backend: DeploymentBackend) -> None:
+        self._log(deployment, f"Running deployment of architecture {deployment.architecture_id}")
+        for name in STAGES:
+            stage = deployment.stages[name]
+            if stage.status == STATUS_SUCCEEDED:
+                continue
+            stage.error, stage.duration_ms = None, None
+            self._set_stage(deployment, stage, STATUS_RUNNING)
+            start = time.perf_counter()
+            try:
+                await getattr(self, f"_{name}")(deployment, backend)
+            except Exception as e:
+                logger.error(f"Deployment {deployment.id} failed in stage '{name}': {e}", exc_info=True)
+                stage.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+                stage.error = str(e)
+                self._set_stage(deployment, stage, STATUS_FAILED)
+                deployment.error = f"Stage '{name}' failed: {e}"
+                self._log(deployment, deployment.error, logging.ERROR)
+                self._set_status(deployment, STATUS_FAILED)
+                return
+            stage.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+            self._set_stage(deployment, stage, STATUS_SUCCEEDED)
+        self._log(deployment, f"Deployment succeeded: {deployment.deployment_url}")
+        self._set_status(deployment, STATUS_SUCCEEDED)
+
+    async def _for_each_resource(self, deployment: Deployment, resources: list[Resource], action, done_status: str) -> None:
+        """Applies `action` to resources concurrently; raises after all finish if any failed."""
+        semaphore = asyncio.Semaphore(self.max_parallel)
+
+        async def run(resource: Resource) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    await action(resource)
+                except Exception:
+                    deployment.resource_durations_ms[resource.name] = round((time.perf_counter() - start) * 1000, 1)
+                    self._set_resource(deployment, resource, STATUS_FAILED)
+                    raise
+                deployment.resource_durations_ms[resource.name] = round((time.perf_counter() - start) * 1000, 1)
+                self._set_resource(deployment, resource, done_status)
+
+        results = await asyncio.gather(*(run(resource) for resource in resources), return_exceptions=True)
+        errors = [f"{resource.name}: {result}" for resource, result in zip(resources, results)
+                  if isinstance(result, BaseException)]
+        if errors:
+            raise DeploymentError("; ".join(errors))
+
+    async def _render(self, deployment: Deployment, backend: DeploymentBackend) -> None:
+        await backend.render(deployment.id, deployment.resources, deployment.configuration)
+
+    async def _package(self, deployment: Deployment, backend: DeploymentBackend) -> None:
+        pending = [r for r in deployment.resources
+                   if deployment.resource_status[r.name] not in (RESOURCE_PACKAGED, RESOURCE_PROVISIONED)]
+        await self._for_each_resource(
+            deployment, pending,
+            lambda resource: backend.package(deployment.id, resource, deployment.configuration),
+            RESOURCE_PACKAGED,
+        )
+
+    async def _provision(self, deployment: Deployment, backend: DeploymentBackend) -> None:
+        by_name = {resource.name: resource for resource in deployment.resources}
+        waves = dependency_waves({r.name: set(r.depends_on) for r in deployment.resources})
+        for index, wave in enumerate(waves):
+            pending = [by_name[name] for name in wave
+                       if deployment.resource_status[name] != RESOURCE_PROVISIONED]
+            if pending:
+                self._log(deployment, f"Provisioning wave {index + 1}/{len(waves)}: "
+                                      f"{', '.join(r.name for r in pending)}")
+            await self._for_each_resource(
+                deployment, pending,
+                lambda resource: backend.provision(deployment.id, resource, deployment.configuration),
+                RESOURCE_PROVISIONED,
+            )
+
+    async def _verify(self, deployment: Deployment, backend: DeploymentBackend) -> None:
+        deployment.deployment_url = await backend.verify(
+            deployment.id, deployment.resources, deployment.configuration
+        )
+
+
+@lru_cache
+def get_deployment_engine() -> DeploymentEngine:
+    """Returns the process-wide DeploymentEngine.
+
+    Deployment state is in memory and not shared between workers (see `app.server`).
+    """
+    return DeploymentEngine(
+        get_architecture_store(),
+        max_parallel=settings.DEPLOY_MAX_PARALLEL,
+        broker=get_event_broker(),
+        retention_seconds=settings.DEPLOY_RETENTION_SECONDS,
+        resume_window_seconds=settings.DEPLOY_RESUME_WINDOW_SECONDS,
+        max_retained=settings.DEPLOY_MAX_RETAINED,
+    )
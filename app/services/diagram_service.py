@@ -0,0 +1,76 @@
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.services.artifact_cache import ArtifactCache, artifact_key, get_artifact_cache
+from app.utils.mermaid import parse_flowchart
+from app.utils.svg import render_svg
+
+logger = logging.getLogger(__name__)
+
+# Bump when the renderer's output changes so cached SVGs are not reused.
+RENDERER_VERSION = "1"
+
+
+def diagram_hash(diagram: str) -> str:
+    """Identifies a rendered diagram: the Mermaid source plus the renderer version."""
+    return hashlib.sha256(f"{RENDERER_VERSION}\n{diagram}".encode("utf-8")).hexdigest()
+
+
+def render_diagram(diagram: str) -> str:
+    """Parses and renders a Mermaid flowchart to SVG (CPU-bound; call off the event loop)."""
+    return render_svg(parse_flowchart(diagram))
+
+
+class DiagramRenderer:
+    """Renders diagrams to SVG through a two-level cache keyed by diagram hash.
+
+    A small in-process LRU serves repeat views without I/O; the artifact cache (when
+    enabled) keeps renders across restarts and shares them between workers.
+    """
+
+    def __init__(self, max_entries: int, artifact_cache: ArtifactCache | None = None):
+        self.max_entries = max_entries
+        self.artifact_cache = artifact_cache
+        self._memory: OrderedDict[str, str] = OrderedDict()
+
+    def _remember(self, key: str, svg: str) -> None:
+        self._memory[key] = svg
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def render(self, diagram: str) -> tuple[str, str]:
+        """Returns the SVG for a diagram and its hash (usable as an ETag)."""
+        key = diagram_hash(diagram)
+        svg = self._memory.get(key)
+        if svg is not None:
+            self._memory.move_to_end(key)
+            metrics.inc("diagram.render_cache", outcome="memory_hit")
+            return svg, key
+
+        cache_key = artifact_key("diagram-svg", key)
+        if self.artifact_cache is not None:
+            cached = await self.artifact_cache.get(cache_key)
+            if cached is not None:
+                svg = cached.decode("utf-8")
+                self._remember(key, svg)
+                metrics.inc("diagram.render_cache", outcome="disk_hit")
+                return svg, key
+
+        metrics.inc("diagram.render_cache", outcome="miss")
+        svg = await asyncio.to_thread(render_diagram, diagram)
+        self._remember(key, svg)
+        if self.artifact_cache is not None:
+            await self.artifact_cache.put(cache_key, svg.encode("utf-8"))
+        return svg, key
+
+
+@lru_cache
+def get_diagram_renderer() -> DiagramRenderer:
+    """Returns the process-wide DiagramRenderer (usable as a FastAPI dependency)."""
+    return DiagramRenderer(settings.DIAGRAM_CACHE_MAX_ENTRIES, get_artifact_cache())
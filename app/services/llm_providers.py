@@ -0,0 +1,428 @@
+"""Pluggable chat-completion providers behind ArchitectureService.
+
+`LLM_PROVIDER` selects the implementation:
+
+- `openai`: the OpenAI API (`OPENAI_API_KEY`, `OPENAI_MODEL`).
+- `openai_compatible`: any server speaking the OpenAI Chat Completions protocol,
+  such as vLLM, llama.cpp or Ollama (`LLM_BASE_URL`, `LLM_API_KEY`, `LLM_MODEL`).
+- `offline`: a deterministic provider needing no network. It replays responses
+  recorded in `LLM_OFFLINE_RECORDINGS_PATH` and otherwise synthesizes valid JSON of
+  the shape the prompt asks for, after a configurable simulated latency. Load tests
+  and latency experiments get reproducible results from every layer above the model.
+
+With `TRAFFIC_CAPTURE_ENABLED`, the selected provider is wrapped in a
+`RecordingProvider` that appends its responses to the traffic capture log, which
+the offline provider can replay.
+
+Providers raise `OpenAIServiceError` for upstream failures and `TimeoutError` when a
+call times out, so callers handle every provider the same way.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.exceptions import OpenAIServiceError, ServiceError
+from app.core.lazy import lazy_import
+from app.core.traffic_capture import TrafficRecorder, get_traffic_recorder
+
+try:
+    import tiktoken
+except ImportError:  # optional dependency
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# The openai package is the single most expensive import of the app; with
+# LAZY_STARTUP enabled it is only imported on first use (or by the startup warm-up).
+openai = lazy_import("openai")
+
+# Rough characters-per-token ratio of English text, used when tiktoken is unavailable.
+CHARS_PER_TOKEN = 4
+# Per-message framing overhead of the chat format, in tokens.
+TOKENS_PER_MESSAGE = 4
+
+
+@dataclass
+class LLMUsage:
+    """Token usage of a completion, for providers that do not report their own."""
+    prompt_tokens: int
+    completion_tokens: int
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+@dataclass
+class LLMCompletion:
+    """The text of a completion and its token usage (None if not reported)."""
+    content: str
+    usage: object | None = None
+
+
+def cached_prompt_tokens(usage) -> int:
+    """Returns the prompt tokens a provider served from its prompt-prefix cache (0 if unreported)."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    return getattr(details, "cached_tokens", 0) or 0
+
+
+def recording_key(messages: list[dict]) -> str:
+    """Identifies a prompt in a recordings file."""
+    canonical = json.dumps(messages, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMProvider(ABC):
+    """The operations ArchitectureService needs from a language model."""
+
+    name: str = ""
+    model: str = ""
+
+    @abstractmethod
+    async def generate(
+        self, messages: list[dict], max_tokens: int, temperature: float, timeout: float | None = None
+    ) -> LLMCompletion:
+        """Returns a complete JSON-object response to the messages."""
+
+    @abstractmethod
+    def stream(
+        self, messages: list[dict], max_tokens: int, temperature: float, timeout: float | None = None
+    ) -> AsyncIterator[str]:
+        """Yields the text of a JSON-object response to the messages as it is produced."""
+
+    def count_tokens(self, messages: list[dict]) -> int:
+        """Estimates the prompt tokens of the messages."""
+        return sum(TOKENS_PER_MESSAGE + self.count_text_tokens(m.get("content") or "") for m in messages)
+
+    def count_text_tokens(self, text: str) -> int:
+        return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+class OpenAIProvider(LLMProvider):
+    """Chat Completions through the official SDK, with one shared connection pool."""
+
+    name = "openai"
+
+    def __init__(self, model: str, api_key: str, base_url: str | None = None, json_mode: bool = True):
+        self.model = model
+        self.json_mode = json_mode
+        if not api_key:
+            logger.warning(f"No API key configured for the {self.name} provider. Model calls will fail.")
+        self.client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url)
+        self._encoding = None
+
+    def _request(self, messages: list[dict], max_tokens: int, temperature: float, timeout: float | None) -> dict:
+        request = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "timeout": timeout,
+        }
+        if self.json_mode:
+            request["response_format"] = {"type": "json_object"}
+        return request
+
+    async def generate(
+        self, messages: list[dict], max_tokens: int, temperature: float, timeout: float | None = None
+    ) -> LLMCompletion:
+        try:
+            response = await self.client.chat.completions.create(
+                **self._request(messages, max_tokens, temperature, timeout)
+            )
+        except openai.APITimeoutError as e:
+            raise TimeoutError(str(e)) from e
+        except openai.APIError as e:
+            logger.error(f"{self.name} API error encountered: {e}")
+            raise OpenAIServiceError(f"{self.name} API error: {e}") from e
+        return LLMCompletion(content=response.choices[0].message.content or "", usage=response.usage)
+
+    async def stream(
+        self, messages: list[dict], max_tokens: int, temperature: float, timeout: float | None = None
+    ) -> AsyncIterator[str]:
+        try:
+            response = await self.client.chat.completions.create(
+                **self._request(messages, max_tokens, temperature, timeout), stream=True
+            )
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except openai.APITimeoutError as e:
+            raise TimeoutError(str(e)) from e
+        except openai.APIError as e:
+            logger.error(f"{self.name} API error encountered: {e}")
+            raise OpenAIServiceError(f"{self.name} API error: {e}") from e
+
+    def count_text_tokens(self, text: str) -> int:
+        if tiktoken is None:
+            return super().count_text_tokens(text)
+        if self._encoding is None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(self.model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("o200k_base")
+        return len(self._encoding.encode(text))
+
+
+class OpenAICompatibleProvider(OpenAIProvider):
+    """A self-hosted or third-party endpoint implementing the OpenAI protocol.
+
+    Servers that do not support `response_format` can be used with `LLM_JSON_MODE=0`;
+    the prompts ask for JSON either way.
+    """
+
+    name = "openai_compatible"
+
+
+# Building blocks for synthesized architectures, chosen deterministically per prompt.
+_SYNTHETIC_COMPONENTS = [
+    ("Gateway", "API Gateway", "{}"),
+    ("Auth", "Auth Service", "[]"),
+    ("App", "Application Service", "[]"),
+    ("Worker", "Background Worker", "[]"),
+    ("Queue", "Message Queue", "(())"),
+    ("Cache", "Redis Cache", "[()]"),
+    ("DB", "PostgreSQL", "[()]"),
+    ("Search", "Search Index", "[()]"),
+    ("Storage", "Object Storage", "[()]"),
+    ("Monitor", "Monitoring", "[]"),
+]
+_SYNTHETIC_RECOMMENDATIONS = [
+    "Add health checks and alerting for every service.",
+    "Keep services stateless so they can scale horizontally.",
+    "Put a cache in front of read-heavy endpoints.",
+    "Process slow work asynchronously through the queue.",
+    "Encrypt data at rest and in transit.",
+    "Automate deployments with infrastructure as code.",
+]
+_PROJECT_TYPE_RE = re.compile(r"for a '([^']*)' project|^Project type: (.+)$", re.MULTILINE)
+
+
+class OfflineProvider(LLMProvider):
+    """Deterministic responses without network access, for tests and benchmarks.
+
+    Recorded responses are replayed when the exact prompt is found in the recordings
+    file (JSON lines with `key`, from `recording_key`, and `content`). Any other prompt
+    gets a synthesized response seeded by the prompt, so repeated runs are identical:
+    an ArchitecturePatch for refinement prompts (recognized by their 'diagram_edits'
+    key), a CodeSummary for repository analysis prompts (their 'components' key) and
+    an ArchitectureResponse otherwise.
+
+    Each call takes `latency_seconds` plus `seconds_per_token` per completion token,
+    or the recorded `latency_ms` of a replayed response when the recording has one
+    (traffic capture logs do).
+    """
+
+    name = "offline"
+
+    def __init__(
+        self,
+        recordings_path: str | None = None,
+        latency_seconds: float = 0.0,
+        seconds_per_token: float = 0.0,
+        model: str = "offline",
+    ):
+        self.model = model
+        self.latency_seconds = latency_seconds
+        self.seconds_per_token = seconds_per_token
+        self.recordings: dict[str, str] = {}
+        self.recorded_latency: dict[str, float] = {}
+        if recordings_path:
+            self._load_recordings(recordings_path)
+
+    def _load_recordings(self, path: str) -> None:
+        recordings = self.recordings
+        try:
+            with Path(path).open(encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    # Traffic capture logs also hold the captured API requests.
+                    if record.get("type", "upstream") != "upstream":
+                        continue
+                    recordings[record["key"]] = record["content"]
+                    if record.get("latency_ms") is not None:
+                        self.recorded_latency[record["key"]] = record["latency_ms"] / 1000
+        except FileNotFoundError:
+            logger.warning(f"Offline recordings file {path} not found; synthesizing all responses.")
+        except (json.JSONDecodeError, KeyError) as e:
+            raise ServiceError(f"Invalid offline recordings file {path}: {e}") from e
+        logger.info(f"Loaded {len(recordings)} recorded responses from {path}")
+
+    def respond(self, messages: list[dict]) -> str:
+        """Returns the (recorded or synthesized) response content for the messages."""
+        recorded = self.recordings.get(recording_key(messages))
+        if recorded is not None:
+            return recorded
+        rng = random.Random(recording_key(messages))
+        system = " ".join(m.get("content") or "" for m in messages if m.get("role") == "system")
+        if "'diagram_edits'" in system:
+            return json.dumps(self._synthesize_patch(rng))
+        if "'components'" in system:
+            return json.dumps(self._synthesize_summary(rng))
+        # The project type is in the system message, or in the last user message
+        # with PROMPT_LAYOUT=static_prefix.
+        return json.dumps(self._synthesize_architecture(rng, system + "\n" + (messages[-1].get("content") or "")))
+
+    @staticmethod
+    def _synthesize_architecture(rng: random.Random, prompt_text: str) -> dict:
+        match = _PROJECT_TYPE_RE.search(prompt_text)
+        project_type = (match.group(1) or match.group(2)).strip() if match else "software"
+        components = [("Client", "Client", "[]")] + rng.sample(_SYNTHETIC_COMPONENTS, rng.randint(3, 6))
+        lines = ["graph TD"]
+        for node_id, label, shape in components:
+            lines.append(f"  {node_id}{shape[:len(shape) // 2]}{label}{shape[len(shape) // 2:]}")
+        for i, (node_id, _, _) in enumerate(components[1:], 1):
+            source = components[rng.randrange(i)][0]
+            lines.append(f"  {source} --> {node_id}")
+        names = ", ".join(label for _, label, _ in components[1:])
+        return {
+            "architecture_diagram": "\n".join(lines),
+            "description": f"A {project_type} architecture built from {names}.",
+            "recommendations": rng.sample(_SYNTHETIC_RECOMMENDATIONS, 3),
+        }
+
+    @staticmethod
+    def _synthesize_patch(rng: random.Random) -> dict:
+        return {
+            "diagram_edits": [],
+            "description_edits": [],
+            "recommendations_add": [rng.choice(_SYNTHETIC_RECOMMENDATIONS)],
+            "recommendations_remove": [],
+        }
+
+    @staticmethod
+    def _synthesize_summary(rng: random.Random) -> dict:
+        components = rng.sample(_SYNTHETIC_COMPONENTS, rng.randint(1, 3))
+        return {
+            "summary": f"Code implementing {', '.join(label for _, label, _ in components)}.",
+            "components": [
+                {"name": label, "responsibility": "", "technologies": [], "depends_on": []}
+                for _, label, _ in components
+            ],
+        }
+
+    def _usage(self, messages: list[dict], content: str) -> LLMUsage:
+        return LLMUsage(prompt_tokens=self.count_tokens(messages), completion_tokens=self.count_text_tokens(content))
+
+    async def generate(
+        self, messages: list[dict], max_tokens: int, temperature: float, timeout: float | None = None
+    ) -> LLMCompletion:
+        content = self.respond(messages)
+        usage = self._usage(messages, content)
+        delay = self.recorded_latency.get(recording_key(messages))
+        if delay is None:
+            delay = self.latency_seconds + self.seconds_per_token * usage.completion_tokens
+        if timeout is not None and delay > timeout:
+            await asyncio.sleep(timeout)
+            raise TimeoutError(f"Simulated model latency of {delay:.1f}s exceeds the {timeout:.1f}s timeout.")
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return LLMCompletion(content=content, usage=usage)
+
+    async def stream(
+        self, messages: list[dict], max_tokens: int, temperature: float, timeout: float | None = None
+    ) -> AsyncIterator[str]:
+        content = self.respond(messages)
+        recorded_delay = self.recorded_latency.get(recording_key(messages))
+        if recorded_delay is not None:
+            await asyncio.sleep(recorded_delay)
+        elif self.latency_seconds > 0:
+            await asyncio.sleep(self.latency_seconds)
+        chunk_chars = 16 * CHARS_PER_TOKEN
+        for start in range(0, len(content), chunk_chars):
+            chunk = content[start:start + chunk_chars]
+            if recorded_delay is None and self.seconds_per_token > 0:
+                await asyncio.sleep(self.seconds_per_token * self.count_text_tokens(chunk))
+            yield chunk
+
+
+class RecordingProvider(LLMProvider):
+    """Passes calls through to another provider, recording each response for replay."""
+
+    def __init__(self, inner: LLMProvider, recorder: TrafficRecorder):
+        self.inner = inner
+        self.recorder = recorder
+        self.name = inner.name
+        self.model = inner.model
+
+    async def generate(
+        self, messages: list[dict], max_tokens: int, temperature: float, timeout: float | None = None
+    ) -> LLMCompletion:
+        start = time.perf_counter()
+        completion = await self.inner.generate(messages, max_tokens, temperature, timeout)
+        self.recorder.record_upstream(recording_key(messages), completion.content, time.perf_counter() - start)
+        return completion
+
+    async def stream(
+        self, messages: list[dict], max_tokens: int, temperature: float, timeout: float | None = None
+    ) -> AsyncIterator[str]:
+        start = time.perf_counter()
+        parts = []
+        async for chunk in self.inner.stream(messages, max_tokens, temperature, timeout):
+            parts.append(chunk)
+            yield chunk
+        # Only complete responses are recorded; an abandoned stream cannot be replayed.
+        self.recorder.record_upstream(recording_key(messages), "".join(parts), time.perf_counter() - start)
+
+    def count_tokens(self, messages: list[dict]) -> int:
+        return self.inner.count_tokens(messages)
+
+    def count_text_tokens(self, text: str) -> int:
+        return self.inner.count_text_tokens(text)
+
+
+def configured_model() -> str:
+    """Returns the model name the configured provider uses, without constructing it."""
+    if settings.LLM_PROVIDER.strip().lower() == "openai":
+        return settings.OPENAI_MODEL
+    if settings.LLM_PROVIDER.strip().lower() == "offline":
+        return settings.LLM_MODEL or "offline"
+    return settings.LLM_MODEL or settings.OPENAI_MODEL
+
+
+@lru_cache
+def get_llm_provider() -> LLMProvider:
+    """Returns the process-wide provider selected by `LLM_PROVIDER`.
+
+    The provider records its responses when traffic capture is enabled.
+
+    Raises:
+        ServiceError: If `LLM_PROVIDER` names an unknown provider.
+    """
+    provider = _build_llm_provider()
+    recorder = get_traffic_recorder()
+    return provider if recorder is None else RecordingProvider(provider, recorder)
+
+
+def _build_llm_provider() -> LLMProvider:
+    provider = settings.LLM_PROVIDER.strip().lower()
+    if provider == "openai":
+        return OpenAIProvider(configured_model(), settings.OPENAI_API_KEY)
+    if provider == "openai_compatible":
+        return OpenAICompatibleProvider(
+            configured_model(),
+            settings.LLM_API_KEY or "not-needed",
+            base_url=settings.LLM_BASE_URL,
+            json_mode=settings.LLM_JSON_MODE,
+        )
+    if provider == "offline":
+        return OfflineProvider(
+            settings.LLM_OFFLINE_RECORDINGS_PATH or None,
+            settings.LLM_OFFLINE_LATENCY_SECONDS,
+            settings.LLM_OFFLINE_SECONDS_PER_TOKEN,
+            model=configured_model(),
+        )
+    raise ServiceError(f"Unknown LLM_PROVIDER '{settings.LLM_PROVIDER}' (expected openai, openai_compatible or offline).")
@@ -0,0 +1,182 @@
+"""Precomputed baseline architectures for the common project types.
+
+Most requests use one of the project types offered by the frontend
+(`ProjectTypeSelect.tsx`) and one of a handful of constraint sets. A warm-up job
+generates a baseline architecture for every project_type x constraint-preset pair
+at startup and again every `PRESET_REFRESH_SECONDS`, sharing the results across
+workers through the state backend.
+
+A request whose constraints match a preset exactly is compared with the preset's
+prompt using the semantic cache embedder:
+
+- similarity >= `PRESET_SERVE_MIN_SIMILARITY`: the baseline is served directly;
+- similarity >= `PRESET_SEED_MIN_SIMILARITY`: the baseline seeds a refinement call,
+  which returns a small patch instead of a full architecture.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+
+from app.core.config import settings
+from app.core.exceptions import ServiceError
+from app.core.metrics import metrics
+from app.core.shared_state import StateBackend
+from app.schemas.architecture import ArchitectureResponse
+from app.services.llm_providers import configured_model
+from app.services.semantic_cache import SemanticCache
+
+logger = logging.getLogger(__name__)
+
+# Mirrors PROJECT_TYPE_OPTIONS in frontend/src/components/form/ProjectTypeSelect.tsx.
+PROJECT_TYPES = {
+    "web": "Web Application",
+    "mobile": "Mobile Application",
+    "desktop": "Desktop Application",
+    "microservices": "Microservices",
+    "backend": "Backend Service",
+}
+
+CONSTRAINT_PRESETS = {
+    "none": [],
+    "low_cost": ["Low cost"],
+    "high_availability": ["High availability"],
+    "scalability": ["High scalability"],
+    "security": ["Strong security and compliance"],
+}
+
+
+@dataclass
+class Preset:
+    """One project_type x constraint-preset combination."""
+    project_type: str
+    name: str
+    constraints: list[str]
+    prompt: str
+
+    @property
+    def state_key(self) -> str:
+        return f"preset:{configured_model()}:{self.project_type}:{self.name}"
+
+
+@dataclass
+class PresetMatch:
+    """The preset closest to a request, and whether it is close enough to serve as is."""
+    architecture: ArchitectureResponse
+    similarity: float
+    serve: bool
+
+
+def all_presets() -> list[Preset]:
+    return [
+        Preset(
+            project_type=project_type,
+            name=name,
+            constraints=constraints,
+            prompt=f"A typical {label.lower()} with the components most projects of this kind need.",
+        )
+        for project_type, label in PROJECT_TYPES.items()
+        for name, constraints in CONSTRAINT_PRESETS.items()
+    ]
+
+
+class PresetLibrary:
+    """Holds the precomputed baselines, indexed like the semantic cache."""
+
+    def __init__(self, serve_threshold: float, seed_threshold: float):
+        self.serve_threshold = serve_threshold
+        self.seed_threshold = seed_threshold
+        self._baselines: dict[str, tuple[Preset, ArchitectureResponse]] = {}
+        self._index = self._build_index([])
+
+    @property
+    def size(self) -> int:
+        return len(self._baselines)
+
+    def _build_index(self, baselines: list[tuple[Preset, ArchitectureResponse]]) -> SemanticCache:
+        index = SemanticCache(
+            threshold=self.serve_threshold,
+            dim=settings.SEMANTIC_CACHE_DIM,
+            capacity=len(CONSTRAINT_PRESETS),
+            sample_rate=0.0,
+        )
+        for preset, architecture in baselines:
+            index.add(preset.prompt, preset.project_type, preset.constraints, architecture)
+        return index
+
+    def load(self, baselines: list[tuple[Preset, ArchitectureResponse]]) -> None:
+        """Swaps in refreshed baselines at once, so lookups never see a half-built index.
+
+        Presets missing from `baselines` (e.g. failed refreshes) keep their previous version.
+        """
+        self._baselines.update({preset.state_key: (preset, architecture) for preset, architecture in baselines})
+        self._index = self._build_index(list(self._baselines.values()))
+
+    def match(self, prompt: str, project_type: str, constraints: list[str]) -> PresetMatch | None:
+        """Returns the preset a request can be served from or seeded with, if any."""
+        entry, similarity = self._index.nearest(prompt, project_type, constraints)
+        if entry is None or similarity < self.seed_threshold:
+            metrics.inc("architecture.presets", outcome="miss")
+            return None
+        serve = similarity >= self.serve_threshold
+        metrics.inc("architecture.presets", outcome="served" if serve else "seeded")
+        return PresetMatch(
+            architecture=ArchitectureResponse.model_validate_json(entry.response_json),
+            similarity=similarity,
+            serve=serve,
+        )
+
+
+async def warm_presets(library: PresetLibrary, service, state: StateBackend) -> dict[str, int]:
+    """Loads every preset from the shared state backend, generating the missing ones.
+
+    Args:
+        library: The library to fill.
+        service: An ArchitectureService used for missing presets.
+        state: The shared state backend, so workers generate each preset only once
+            per refresh interval.
+
+    Returns:
+        Counts of presets `loaded` from shared state, `generated` and `failed`.
+    """
+    counts = {"loaded": 0, "generated": 0, "failed": 0}
+    baselines: list[tuple[Preset, ArchitectureResponse]] = []
+    semaphore = asyncio.Semaphore(settings.PRESET_WARMUP_CONCURRENCY)
+
+    async def warm(preset: Preset) -> None:
+        cached = await state.get(preset.state_key)
+        if cached is not None:
+            baselines.append((preset, ArchitectureResponse.model_validate_json(cached)))
+            counts["loaded"] += 1
+            return
+        async with semaphore:
+            try:
+                architecture = await service.generate(
+                    preset.prompt, preset.project_type, preset.constraints, use_presets=False
+                )
+            except ServiceError as e:
+                logger.warning(f"Failed to precompute preset {preset.project_type}/{preset.name}: {e}")
+                counts["failed"] += 1
+                return
+        await state.set(
+            preset.state_key,
+            architecture.model_dump_json(exclude={"architecture_id"}).encode("utf-8"),
+            settings.PRESET_REFRESH_SECONDS,
+        )
+        baselines.append((preset, architecture))
+        counts["generated"] += 1
+
+    await asyncio.gather(*(warm(preset) for preset in all_presets()))
+    library.load(baselines)
+    metrics.set_gauge("architecture.presets.loaded", library.size)
+    logger.info(f"Preset warm-up finished: {counts}")
+    return counts
+
+
+@lru_cache
+def get_preset_library() -> PresetLibrary | None:
+    """Returns the process-wide PresetLibrary, or None when presets are disabled."""
+    if not settings.PRESETS_ENABLED:
+        return None
+    return PresetLibrary(settings.PRESET_SERVE_MIN_SIMILARITY, settings.PRESET_SEED_MIN_SIMILARITY)
@@ -0,0 +1,156 @@
+"""Incremental refinement of stored architectures.
+
+Instead of regenerating an architecture from scratch, the model receives a compact
+view of the current version (normalized Mermaid source, numbered description
+sentences and recommendations) and replies with an `ArchitecturePatch`, which is
+applied here. The patch is a small fraction of the output tokens of a full rewrite.
+"""
+
+import logging
+import re
+
+from app.schemas.architecture import (
+    ArchitectureDiff,
+    ArchitecturePatch,
+    ArchitectureResponse,
+)
+from app.utils.mermaid import SHAPE_DELIMITERS, MermaidEdge, MermaidGraph, MermaidNode, parse_flowchart, to_mermaid
+
+logger = logging.getLogger(__name__)
+
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+NODE_ID_RE = re.compile(r"^[A-Za-z0-9_]+$")
+KNOWN_SHAPES = {opener + closer for opener, closer in SHAPE_DELIMITERS}
+
+
+def split_sentences(text: str) -> list[str]:
+    """Splits a description into sentences, the unit description edits refer to."""
+    return [sentence for sentence in SENTENCE_END_RE.split(text.strip()) if sentence]
+
+
+def merge_constraints(current: list[str], add: list[str], remove: list[str]) -> list[str]:
+    """Applies constraint additions and removals (case-insensitive), keeping order."""
+    removed = {c.strip().lower() for c in remove}
+    merged = [c for c in current if c.strip().lower() not in removed]
+    present = {c.strip().lower() for c in merged}
+    for constraint in add:
+        key = constraint.strip().lower()
+        if key and key not in present:
+            merged.append(constraint.strip())
+            present.add(key)
+    return merged
+
+
+def compact_state(architecture: ArchitectureResponse) -> str:
+    """Renders the parts of an architecture the model needs in order to patch it."""
+    graph = parse_flowchart(architecture.architecture_diagram)
+    diagram = to_mermaid(graph) if graph.nodes else architecture.architecture_diagram.strip()
+    sentences = "\n".join(f"[{i}] {s}" for i, s in enumerate(split_sentences(architecture.description), 1))
+    recommendations = "\n".join(f"[{i}] {r}" for i, r in enumerate(architecture.recommendations, 1))
+    return (
+        f"DIAGRAM:\n{diagram}\n\n"
+        f"DESCRIPTION SENTENCES:\n{sentences or '(none)'}\n\n"
+        f"RECOMMENDATIONS:\n{recommendations or '(none)'}"
+    )
+
+
+def _apply_diagram_edits(graph: MermaidGraph, patch: ArchitecturePatch) -> None:
+    for edit in patch.diagram_edits:
+        if edit.op in ("add_node", "relabel_node", "remove_node"):
+            if not edit.id or not NODE_ID_RE.match(edit.id):
+                logger.warning(f"Skipping diagram edit without a valid node id: {edit}")
+                continue
+            if edit.op == "remove_node":
+                graph.nodes.pop(edit.id, None)
+                graph.edges = [e for e in graph.edges if edit.id not in (e.source, e.target)]
+                continue
+            node = graph.nodes.get(edit.id)
+            if node is None and edit.op == "relabel_node":
+                logger.warning(f"Skipping relabel of unknown node '{edit.id}'")
+                continue
+            if node is None:
+                node = graph.nodes[edit.id] = MermaidNode(id=edit.id, label=edit.id)
+            if edit.label:
+                node.label = edit.label
+            if edit.shape in KNOWN_SHAPES:
+                node.shape = edit.shape
+            continue
+
+        if not edit.source or not edit.target or not NODE_ID_RE.match(edit.source) or not NODE_ID_RE.match(edit.target):
+            logger.warning(f"Skipping edge edit without valid endpoints: {edit}")
+            continue
+        if edit.op == "remove_edge":
+            graph.edges = [e for e in graph.edges if (e.source, e.target) != (edit.source, edit.target)]
+            continue
+        for node_id in (edit.source, edit.target):
+            graph.nodes.setdefault(node_id, MermaidNode(id=node_id, label=node_id))
+        edge = MermaidEdge(source=edit.source, target=edit.target, label=edit.label or "")
+        if edge not in graph.edges:
+            graph.edges.append(edge)
+
+
+def _apply_description_edits(description: str, patch: ArchitecturePatch) -> str:
+    if not patch.description_edits:
+        return description
+    sentences: list[str | None] = list(split_sentences(description))
+    inserted: dict[int, list[str]] = {}
+    for edit in patch.description_edits:
+        if edit.op == "insert":
+            if 0 <= edit.sentence <= len(sentences) and edit.text:
+                inserted.setdefault(edit.sentence, []).append(edit.text.strip())
+                continue
+        elif 1 <= edit.sentence <= len(sentences):
+            sentences[edit.sentence - 1] = edit.text.strip() if edit.op == "replace" and edit.text else None
+            continue
+        logger.warning(f"Skipping out-of-range description edit: {edit}")
+
+    result = inserted.get(0, [])
+    for number, sentence in enumerate(sentences, 1):
+        if sentence:
+            result.append(sentence)
+        result.extend(inserted.get(number, []))
+    return " ".join(result)
+
+
+def apply_patch(architecture: ArchitectureResponse, patch: ArchitecturePatch) -> ArchitectureResponse:
+    """Applies a model-produced patch to an architecture.
+
+    Edits that reference unknown nodes, sentences or recommendations are skipped with
+    a warning rather than failing the refinement, since the patch comes from a model.
+
+    Returns:
+        A new ArchitectureResponse (without an architecture_id).
+    """
+    graph = parse_flowchart(architecture.architecture_diagram)
+    _apply_diagram_edits(graph, patch)
+
+    removed = {n for n in patch.recommendations_remove if 1 <= n <= len(architecture.recommendations)}
+    recommendations = [r for i, r in enumerate(architecture.recommendations, 1) if i not in removed]
+    recommendations += [r.strip() for r in patch.recommendations_add if r.strip() and r.strip() not in recommendations]
+
+    return ArchitectureResponse(
+        architecture_diagram=to_mermaid(graph) if patch.diagram_edits else architecture.architecture_diagram,
+        description=_apply_description_edits(architecture.description, patch),
+        recommendations=recommendations,
+    )
+
+
+def diff_architectures(old: ArchitectureResponse, new: ArchitectureResponse) -> ArchitectureDiff:
+    """Computes the structural difference between two architecture versions."""
+    old_graph = parse_flowchart(old.architecture_diagram)
+    new_graph = parse_flowchart(new.architecture_diagram)
+    old_edges = {f"{e.source} -> {e.target}" for e in old_graph.edges}
+    new_edges = {f"{e.source} -> {e.target}" for e in new_graph.edges}
+    return ArchitectureDiff(
+        added_nodes=sorted(new_graph.nodes.keys() - old_graph.nodes.keys()),
+        removed_nodes=sorted(old_graph.nodes.keys() - new_graph.nodes.keys()),
+        relabeled_nodes=sorted(
+            node_id for node_id in old_graph.nodes.keys() & new_graph.nodes.keys()
+            if old_graph.nodes[node_id] != new_graph.nodes[node_id]
+        ),
+        added_edges=sorted(new_edges - old_edges),
+        removed_edges=sorted(old_edges - new_edges),
+        description_changed=old.description != new.description,
+        recommendations_added=[r for r in new.recommendations if r not in old.recommendations],
+        recommendations_removed=[r for r in old.recommendations if r not in new.recommendations],
+    )
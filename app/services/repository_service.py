@@ -0,0 +1,261 @@
+"""Reverse-engineering an architecture from an existing codebase.
+
+The codebase is read with the `code_dump` library as token-bounded chunks, which
+are summarized concurrently (map) and then combined into an ArchitectureResponse
+(reduce). Chunks are pulled from the crawler only as summarization slots free up,
+so at most `REPOSITORY_ANALYSIS_CONCURRENCY` chunks are held in memory at once.
+
+Chunk summaries are cached in the artifact cache by content hash, so re-analyzing
+a repository after a small change only summarizes the chunks that changed. When
+the summaries exceed `REPOSITORY_REDUCE_TOKENS`, they are summarized again in
+batches until they fit into a single reduce call.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import tarfile
+import zipfile
+from dataclasses import dataclass, field
+
+import code_dump
+from app.core.config import settings
+from app.core.exceptions import RepositoryAnalysisError, RepositoryTooLargeError
+from app.core.metrics import metrics
+from app.schemas.architecture import ArchitectureResponse
+from app.schemas.repository import CodeSummary
+from app.services.artifact_cache import ArtifactCache, artifact_key
+
+logger = logging.getLogger(__name__)
+
+# Bump when the summary prompt changes so cached summaries are not reused.
+SUMMARY_VERSION = "1"
+
+
+@dataclass
+class RepositoryAnalysis:
+    """The reconstructed architecture and statistics about how it was obtained."""
+    architecture: ArchitectureResponse | None = None
+    chunks: int = 0
+    cached_chunks: int = 0
+    reduce_rounds: int = 0
+    stats: dict[str, int] = field(default_factory=dict)
+
+
+def resolve_local_path(path: str) -> str:
+    """Returns the real path of a local repository if it lies under REPOSITORY_ALLOWED_ROOTS.
+
+    Raises:
+        RepositoryAnalysisError: If local paths are disabled, the path is outside every
+            allowed root, or it is not a directory.
+    """
+    roots = [os.path.realpath(root.strip()) for root in settings.REPOSITORY_ALLOWED_ROOTS.split(",") if root.strip()]
+    if not roots:
+        raise RepositoryAnalysisError("Analyzing local paths is disabled (REPOSITORY_ALLOWED_ROOTS is empty).")
+    real_path = os.path.realpath(path)
+    if not any(os.path.commonpath([real_path, root]) == root for root in roots):
+        raise RepositoryAnalysisError(f"Path '{path}' is outside the allowed repository roots.")
+    if not os.path.isdir(real_path):
+        raise RepositoryAnalysisError(f"Path '{path}' is not a directory.")
+    return real_path
+
+
+def _safe_member_path(dest_dir: str, name: str) -> str | None:
+    """Returns where an archive member may be extracted, or None if it escapes dest_dir."""
+    target = os.path.realpath(os.path.join(dest_dir, name))
+    if os.path.commonpath([target, dest_dir]) != dest_dir or target == dest_dir:
+        return None
+    return target
+
+
+def extract_archive(archive_path: str, dest_dir: str, max_bytes: int) -> None:
+    """Extracts a .zip or .tar(.gz/.bz2/.xz) archive, refusing unsafe or oversized content.
+
+    Only regular files and directories are extracted; links, devices and members that
+    would land outside `dest_dir` are skipped.
+
+    Raises:
+        RepositoryAnalysisError: If the file is not a supported archive.
+        RepositoryTooLargeError: If the uncompressed content exceeds `max_bytes`.
+    """
+    dest_dir = os.path.realpath(dest_dir)
+    total = 0
+
+    def reserve(size: int) -> None:
+        nonlocal total
+        total += size
+        if total > max_bytes:
+            raise RepositoryTooLargeError(f"Archive expands to more than {max_bytes} bytes.")
+
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for member in archive.infolist():
+                target = _safe_member_path(dest_dir, member.filename)
+                if target is None or member.is_dir():
+                    continue
+                reserve(member.file_size)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with archive.open(member) as src, open(target, "wb") as dst:
+                    # file_size is attacker-controlled; bound what is actually written too.
+                    while block := src.read(1024 * 1024):
+                        dst.write(block)
+                        if dst.tell() > member.file_size:
+                            raise RepositoryTooLargeError("Archive member is larger than it declares.")
+        return
+
+    try:
+        archive = tarfile.open(archive_path)
+    except tarfile.TarError as e:
+        raise RepositoryAnalysisError(f"Unsupported archive (expected .zip or .tar[.gz]): {e}") from e
+    with archive:
+        for member in archive:
+            target = _safe_member_path(dest_dir, member.name)
+            if target is None or not member.isfile():
+                continue
+            reserve(member.size)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with archive.extractfile(member) as src, open(target, "wb") as dst:
+                while block := src.read(1024 * 1024):
+                    dst.write(block)
+
+
+class RepositoryAnalyzer:
+    """Runs the map-reduce analysis of a codebase with an ArchitectureService."""
+
+    def __init__(
+        self,
+        service,
+        cache: ArtifactCache | None = None,
+        concurrency: int = 4,
+        chunk_tokens: int = 8000,
+        reduce_tokens: int = 12000,
+        max_chunks: int = 400,
+    ):
+        self.service = service
+        self.cache = cache
+        self.concurrency = max(1, concurrency)
+        self.chunk_tokens = chunk_tokens
+        self.reduce_tokens = reduce_tokens
+        self.max_chunks = max_chunks
+
+    async def summarize(self, text: str, project_type: str) -> tuple[str, bool]:
+        """Summarizes a chunk, through the cache; returns the summary JSON and whether it was cached."""
+        key = artifact_key(
+            "repository-summary", SUMMARY_VERSION, self.service.provider.model,
+            hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        )
+        if self.cache is not None:
+            cached = await self.cache.get(key)
+            if cached is not None:
+                metrics.inc("repository.chunk_summaries", outcome="hit")
+                return cached.decode("utf-8"), True
+        metrics.inc("repository.chunk_summaries", outcome="miss")
+        summary: CodeSummary = await self.service.summarize_code(text, project_type)
+        summary_json = summary.model_dump_json()
+        if self.cache is not None:
+            await self.cache.put(key, summary_json.encode("utf-8"))
+        return summary_json, False
+
+    async def _map(self, root_dir: str, project_type: str, analysis: RepositoryAnalysis) -> list[str]:
+        chunks = code_dump.iter_chunks(
+            root_dir,
+            max_tokens=self.chunk_tokens,
+            stats=analysis.stats,
+            relative_paths=True,
+            split_large_files=True,
+        )
+        summaries: dict[int, str] = {}
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def summarize_chunk(chunk: code_dump.Chunk) -> None:
+            try:
+                summaries[chunk.index], cached = await self.summarize(chunk.content, project_type)
+                analysis.cached_chunks += cached
+            finally:
+                slots.release()
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                while True:
+                    # Only read the next chunk once a slot is free, which bounds memory.
+                    await slots.acquire()
+                    chunk = await asyncio.to_thread(next, chunks, None)
+                    if chunk is None:
+                        slots.release()
+                        break
+                    if chunk.index >= self.max_chunks:
+                        slots.release()
+                        raise RepositoryTooLargeError(
+                            f"Repository has more than {self.max_chunks} chunks of {self.chunk_tokens} tokens."
+                        )
+                    analysis.chunks += 1
+                    group.create_task(summarize_chunk(chunk))
+        except ExceptionGroup as group_error:
+            # Surface the first failure (e.g. OpenAIServiceError) as the service layer expects.
+            raise group_error.exceptions[0] from None
+        return [summaries[index] for index in sorted(summaries)]
+
+    def _batches(self, summaries: list[str]) -> list[list[str]]:
+        batches: list[list[str]] = [[]]
+        tokens = 0
+        for summary in summaries:
+            summary_tokens = self.service.provider.count_text_tokens(summary)
+            if batches[-1] and tokens + summary_tokens > self.reduce_tokens:
+                batches.append([])
+                tokens = 0
+            batches[-1].append(summary)
+            tokens += summary_tokens
+        return batches
+
+    async def _condense(self, summaries: list[str], project_type: str, analysis: RepositoryAnalysis) -> list[str]:
+        """Summarizes batches of summaries until they fit into one reduce call."""
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def condense(batch: list[str]) -> str:
+            async with slots:
+                text = "\n\n".join(f"PART SUMMARY:\n{summary}" for summary in batch)
+                return (await self.summarize(text, project_type))[0]
+
+        batches = self._batches(summaries)
+        while len(batches) > 1:
+            analysis.reduce_rounds += 1
+            summaries = list(await asyncio.gather(*(condense(batch) for batch in batches)))
+            batches = self._batches(summaries)
+            if len(batches) >= len(summaries) > 1:
+                # Every summary fills a batch on its own; pair them up to guarantee progress.
+                batches = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+        return summaries
+
+    async def analyze(self, root_dir: str, project_type: str, constraints: list[str]) -> RepositoryAnalysis:
+        """Reconstructs the architecture of the codebase under `root_dir`.
+
+        Raises:
+            RepositoryAnalysisError: If the directory contains no source files.
+            RepositoryTooLargeError: If it has more than `max_chunks` chunks.
+            OpenAIServiceError, ParsingError: If a model call fails.
+        """
+        analysis = RepositoryAnalysis(stats=code_dump.new_stats())
+        summaries = await self._map(root_dir, project_type, analysis)
+        if not summaries:
+            raise RepositoryAnalysisError("No source files found to analyze.")
+        summaries = await self._condense(summaries, project_type, analysis)
+        analysis.architecture = await self.service.synthesize_architecture(summaries, project_type, constraints)
+        metrics.observe("repository.analysis_chunks", analysis.chunks)
+        logger.info(
+            f"Analyzed repository: {analysis.chunks} chunks ({analysis.cached_chunks} cached), "
+            f"{analysis.reduce_rounds} extra reduce rounds, {analysis.stats.get('included_files', 0)} files."
+        )
+        return analysis
+
+
+def get_repository_analyzer(service, cache: ArtifactCache | None) -> RepositoryAnalyzer:
+    """Builds a RepositoryAnalyzer configured from settings."""
+    return RepositoryAnalyzer(
+        service,
+        cache,
+        concurrency=settings.REPOSITORY_ANALYSIS_CONCURRENCY,
+        chunk_tokens=settings.REPOSITORY_CHUNK_TOKENS,
+        reduce_tokens=settings.REPOSITORY_REDUCE_TOKENS,
+        max_chunks=settings.REPOSITORY_MAX_CHUNKS,
+    )
@@ -0,0 +1,185 @@
+import hashlib
+import logging
+import random
+import re
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+
+from app.core.config import settings
+from app.core.lazy import lazy_import
+from app.core.metrics import metrics
+from app.schemas.architecture import ArchitectureResponse
+
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+CHAR_NGRAM_SIZES = (3, 4)
+
+
+def normalize_constraints(constraints: list[str]) -> str:
+    """Returns an order- and case-insensitive signature of a constraint list."""
+    return "\n".join(sorted({c.strip().lower() for c in constraints if c.strip()}))
+
+
+def _features(text: str) -> list[str]:
+    """Word unigrams, word bigrams and character n-grams of every word."""
+    words = TOKEN_RE.findall(text.lower())
+    features = [f"w:{word}" for word in words]
+    features += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"<{word}>"
+        for n in CHAR_NGRAM_SIZES:
+            features += [f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1)]
+    return features
+
+
+class HashedNgramEmbedder:
+    """Embeds text as a hashed bag of n-grams with sublinear term frequency.
+
+    IDF weighting is applied at query time by `SemanticIndex`, using the document
+    frequencies of the prompts it holds, so stored vectors never need re-embedding.
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def _bucket(self, feature: str) -> int:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") % self.dim
+
+    def embed(self, text: str):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in _features(text):
+            vector[self._bucket(feature)] += 1.0
+        np.log1p(vector, out=vector)
+        return vector
+
+
+@dataclass
+class CacheEntry:
+    prompt: str
+    constraints_key: str
+    response_json: str
+    created_at: float
+
+
+class SemanticIndex:
+    """A fixed-capacity matrix of prompt vectors for one project_type.
+
+    When full, the oldest entry is overwritten (ring buffer), keeping memory bounded
+    at `capacity * dim * 4` bytes.
+    """
+
+    def __init__(self, dim: int, capacity: int):
+        self.capacity = capacity
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.doc_freq = np.zeros(dim, dtype=np.float32)
+        self.entries: list[CacheEntry | None] = [None] * capacity
+        self.size = 0
+        self._next = 0
+
+    def add(self, vector, entry: CacheEntry) -> None:
+        slot = self._next
+        if self.entries[slot] is not None:
+            self.doc_freq -= self.vectors[slot] > 0
+        self.vectors[slot] = vector
+        self.doc_freq += vector > 0
+        self.entries[slot] = entry
+        self._next = (slot + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def nearest(self, vector, constraints_key: str) -> tuple[CacheEntry | None, float]:
+        """Returns the most similar entry with the same constraints, and its cosine similarity."""
+        if self.size == 0:
+            return None, 0.0
+        idf = np.log((1.0 + self.size) / (1.0 + self.doc_freq)) + 1.0
+        matrix = self.vectors[:self.size] * idf
+        query = vector * idf
+        norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+        similarities = (matrix @ query) / np.where(norms == 0, 1.0, norms)
+        mismatched = [i for i, entry in enumerate(self.entries[:self.size]) if entry.constraints_key != constraints_key]
+        similarities[mismatched] = -1.0
+        best = int(np.argmax(similarities))
+        if similarities[best] < 0:
+            return None, 0.0
+        return self.entries[best], float(similarities[best])
+
+
+class SemanticCache:
+    """Serves cached architectures for prompts that are near-duplicates of earlier ones.
+
+    Prompts are embedded locally (no model call) and compared against a per-project_type
+    index. A cached result is only returned for identical constraints and a cosine
+    similarity of at least `threshold`. A `sample_rate` fraction of hits is recorded
+    in `samples` so false positives can be reviewed.
+    """
+
+    def __init__(self, threshold: float, dim: int = 2048, capacity: int = 512,
+                 sample_rate: float = 0.05, max_samples: int = 200):
+        self.threshold = threshold
+        self.dim = dim
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self.embedder = HashedNgramEmbedder(dim)
+        self.samples: deque = deque(maxlen=max_samples)
+        self._indexes: dict[str, SemanticIndex] = {}
+
+    def nearest(self, prompt: str, project_type: str, constraints: list[str]) -> tuple[CacheEntry | None, float]:
+        """Returns the most similar indexed entry with identical constraints, and its similarity."""
+        index = self._indexes.get(project_type)
+        if index is None:
+            return None, 0.0
+        return index.nearest(self.embedder.embed(prompt), normalize_constraints(constraints))
+
+    def lookup(self, prompt: str, project_type: str, constraints: list[str]) -> ArchitectureResponse | None:
+        """Returns a cached response for a near-duplicate prompt, or None."""
+        entry, similarity = self.nearest(prompt, project_type, constraints)
+        if entry is None or similarity < self.threshold:
+            metrics.inc("architecture.semantic_cache", outcome="miss")
+            return None
+
+        metrics.inc("architecture.semantic_cache", outcome="hit")
+        metrics.observe("architecture.semantic_cache.similarity", similarity)
+        if random.random() < self.sample_rate:
+            self.samples.append({
+                "timestamp": time.time(),
+                "project_type": project_type,
+                "prompt": prompt,
+                "matched_prompt": entry.prompt,
+                "similarity": round(similarity, 4),
+            })
+            metrics.inc("architecture.semantic_cache.sampled")
+        logger.info(f"Semantic cache hit (similarity {similarity:.3f}) for project_type '{project_type}'.")
+        return ArchitectureResponse.model_validate_json(entry.response_json)
+
+    def add(self, prompt: str, project_type: str, constraints: list[str], response: ArchitectureResponse) -> None:
+        """Indexes a freshly generated response under its prompt."""
+        index = self._indexes.get(project_type)
+        if index is None:
+            index = self._indexes[project_type] = SemanticIndex(self.dim, self.capacity)
+        index.add(
+            self.embedder.embed(prompt),
+            CacheEntry(
+                prompt=prompt,
+                constraints_key=normalize_constraints(constraints),
+                response_json=response.model_dump_json(exclude={"architecture_id"}),
+                created_at=time.time(),
+            ),
+        )
+
+
+@lru_cache
+def get_semantic_cache() -> SemanticCache | None:
+    """Returns the process-wide SemanticCache, or None when it is disabled."""
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return None
+    return SemanticCache(
+        threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+        dim=settings.SEMANTIC_CACHE_DIM,
+        capacity=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+        sample_rate=settings.SEMANTIC_CACHE_SAMPLE_RATE,
+    )
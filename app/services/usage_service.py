@@ -0,0 +1,82 @@
+import logging
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.schemas.usage import UsageBucket, UsageBucketSize, UsageGroupBy, UsageResponse
+from app.services.usage_store import BUCKET_SECONDS, get_usage_store
+
+logger = logging.getLogger(__name__)
+
+# Range reported when the caller gives no start, per bucket size.
+DEFAULT_LOOKBACK = {UsageBucketSize.HOUR: timedelta(hours=24), UsageBucketSize.DAY: timedelta(days=30)}
+
+
+def _estimated_cost(prompt_tokens: int, completion_tokens: int) -> float:
+    return round(
+        prompt_tokens / 1000 * settings.USAGE_PROMPT_COST_PER_1K_TOKENS
+        + completion_tokens / 1000 * settings.USAGE_COMPLETION_COST_PER_1K_TOKENS,
+        6,
+    )
+
+
+def _to_bucket(bucket_start: datetime | None, group: str | None, requests: int, prompt_tokens: int,
+               completion_tokens: int, latency_ms_sum: float, cached_prompt_tokens: int = 0) -> UsageBucket:
+    return UsageBucket(
+        bucket_start=bucket_start,
+        group=group,
+        requests=requests,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        total_tokens=prompt_tokens + completion_tokens,
+        cached_prompt_tokens=cached_prompt_tokens,
+        prompt_cache_hit_rate=round(cached_prompt_tokens / prompt_tokens, 4) if prompt_tokens else 0.0,
+        avg_latency_ms=round(latency_ms_sum / requests, 3) if requests else 0.0,
+        estimated_cost=_estimated_cost(prompt_tokens, completion_tokens),
+    )
+
+
+async def get_usage_report_service(
+    bucket: UsageBucketSize = UsageBucketSize.HOUR,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    group_by: UsageGroupBy | None = None,
+    endpoint: str | None = None,
+    project_type: str | None = None,
+) -> UsageResponse:
+    """Aggregates recorded generation usage into time buckets.
+
+    Args:
+        bucket: The bucket size.
+        start: Start of the range; defaults to a lookback window that depends on `bucket`.
+        end: End of the range (exclusive); defaults to now.
+        group_by: Optional dimension to break each bucket down by.
+        endpoint: Optional filter on the generating endpoint.
+        project_type: Optional filter on the project type.
+
+    Returns:
+        UsageResponse: Per-bucket aggregates plus totals for the range.
+    """
+    end = end or datetime.now(timezone.utc)
+    start = start or end - DEFAULT_LOOKBACK[bucket]
+    bucket_seconds = BUCKET_SECONDS[bucket.value]
+    start_ts = start.timestamp() // bucket_seconds * bucket_seconds
+    rows = await get_usage_store().query(
+        bucket.value,
+        start_ts,
+        end.timestamp(),
+        group_by=group_by.value if group_by else None,
+        filters={"endpoint": endpoint, "project_type": project_type},
+    )
+    buckets = [
+        _to_bucket(datetime.fromtimestamp(bucket_ts, timezone.utc), key if group_by else None, *sums)
+        for bucket_ts, key, *sums in rows
+    ]
+    totals = [sum(row[i] for row in rows) for i in range(2, 7)]
+    return UsageResponse(
+        bucket=bucket,
+        group_by=group_by,
+        start=datetime.fromtimestamp(start_ts, timezone.utc),
+        end=end,
+        buckets=buckets,
+        totals=_to_bucket(None, None, *totals),
+    )
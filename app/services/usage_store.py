@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+
+from app.core.config import settings
+from app.core.exceptions import StorageError
+from app.utils.sqlite import apply_migrations, open_sqlite
+
+logger = logging.getLogger(__name__)
+
+# Rollups are kept at hourly granularity; coarser buckets are summed from them.
+ROLLUP_SECONDS = 3600
+BUCKET_SECONDS = {"hour": 3600, "day": 86400}
+GROUP_COLUMNS = ("endpoint", "project_type", "model", "cache_outcome")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    endpoint TEXT NOT NULL,
+    project_type TEXT NOT NULL,
+    model TEXT NOT NULL,
+    cache_outcome TEXT NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    latency_ms REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_usage_events_ts ON usage_events (ts);
+CREATE TABLE IF NOT EXISTS usage_rollups (
+    bucket_start REAL NOT NULL,
+    endpoint TEXT NOT NULL,
+    project_type TEXT NOT NULL,
+    model TEXT NOT NULL,
+    cache_outcome TEXT NOT NULL,
+    requests INTEGER NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    latency_ms_sum REAL NOT NULL,
+    PRIMARY KEY (bucket_start, endpoint, project_type, model, cache_outcome)
+);
+CREATE TABLE IF NOT EXISTS usage_rollup_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    rolled_until REAL NOT NULL
+);
+"""
+
+# Applied in order on top of SCHEMA by apply_migrations.
+MIGRATIONS = [
+    # 1: prompt tokens served from the provider's prompt-prefix cache
+    """
+    ALTER TABLE usage_events ADD COLUMN cached_prompt_tokens INTEGER NOT NULL DEFAULT 0;
+    ALTER TABLE usage_rollups ADD COLUMN cached_prompt_tokens INTEGER NOT NULL DEFAULT 0;
+    """,
+]
+
+
+@dataclass
+class UsageEvent:
+    """One generation: what it cost in tokens and time, and whether a cache served it."""
+    endpoint: str
+    project_type: str
+    model: str
+    cache_outcome: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: float = 0.0
+    ts: float = 0.0
+    cached_prompt_tokens: int = 0
+
+
+class UsageStore:
+    """Append-only SQLite log of generation usage with hourly rollups.
+
+    Events are never updated. `rollup()` folds complete hours of events into
+    `usage_rollups`; queries read rollups for rolled-up hours and raw events for the
+    rest, so results are exact regardless of when the last rollup ran.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        try:
+            self._conn = open_sqlite(db_path)
+            self._conn.executescript(SCHEMA)
+            apply_migrations(self._conn, MIGRATIONS, "usage store")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open usage store at {db_path}: {e}", exc_info=True)
+            raise StorageError(f"Failed to open usage store: {e}") from e
+        self._lock = threading.Lock()
+
+    def _execute(self, query: str, params: tuple | dict = ()) -> list[tuple]:
+        with self._lock:
+            try:
+                with self._conn:
+                    return self._conn.execute(query, params).fetchall()
+            except sqlite3.Error as e:
+                logger.error(f"Usage store query failed: {e}", exc_info=True)
+                raise StorageError(f"Usage store query failed: {e}") from e
+
+    def _rolled_until(self) -> float:
+        row = self._execute("SELECT rolled_until FROM usage_rollup_state WHERE id = 1")
+        return row[0][0] if row else 0.0
+
+    def _rollup(self, now: float) -> int:
+        cutoff = (now // ROLLUP_SECONDS) * ROLLUP_SECONDS  # only complete hours
+        with self._lock:
+            try:
+                with self._conn:
+                    # Take the write lock before reading rolled_until, so concurrent workers
+                    # cannot both roll up the same range.
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    row = self._conn.execute("SELECT rolled_until FROM usage_rollup_state WHERE id = 1").fetchone()
+                    since = row[0] if row else 0.0
+                    if cutoff <= since:
+                        return 0
+                    cursor = self._conn.execute(
+                        f"""
+                        INSERT INTO usage_rollups (bucket_start, endpoint, project_type, model, cache_outcome,
+                                                   requests, prompt_tokens, completion_tokens, latency_ms_sum,
+                                                   cached_prompt_tokens)
+                        SELECT CAST(ts / {ROLLUP_SECONDS} AS INTEGER) * {ROLLUP_SECONDS},
+                               endpoint, project_type, model, cache_outcome,
+                               COUNT(*), SUM(prompt_tokens), SUM(completion_tokens), SUM(latency_ms),
+                               SUM(cached_prompt_tokens)
+                        FROM usage_events WHERE ts >= ? AND ts < ?
+                        GROUP BY 1, 2, 3, 4, 5
+                        ON CONFLICT (bucket_start, endpoint, project_type, model, cache_outcome) DO UPDATE SET
+                            requests = requests + excluded.requests,
+                            prompt_tokens = prompt_tokens + excluded.prompt_tokens,
+                            completion_tokens = completion_tokens + excluded.completion_tokens,
+                            latency_ms_sum = latency_ms_sum + excluded.latency_ms_sum,
+                            cached_prompt_tokens = cached_prompt_tokens + excluded.cached_prompt_tokens
+                        """,
+                        (since, cutoff),
+                    )
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO usage_rollup_state (id, rolled_until) VALUES (1, ?)", (cutoff,)
+                    )
+                    return cursor.rowcount
+            except sqlite3.Error as e:
+                logger.error(f"Usage rollup failed: {e}", exc_info=True)
+                raise StorageError(f"Usage rollup failed: {e}") from e
+
+    def _query(self, bucket_seconds: int, start: float, end: float, group_by: str | None, filters: dict) -> list[tuple]:
+        group = group_by or "''"
+        where = " AND ".join(f"{column} = :{column}" for column in filters)
+        where = f" AND {where}" if where else ""
+        rolled_until = self._rolled_until()
+        params = {"start": start, "end": end, "rolled_until": rolled_until, **filters}
+        return self._execute(
+            f"""
+            SELECT CAST(bucket_start / {bucket_seconds} AS INTEGER) * {bucket_seconds} AS bucket, key,
+                   SUM(requests), SUM(prompt_tokens), SUM(completion_tokens), SUM(latency_ms_sum),
+                   SUM(cached_prompt_tokens)
+            FROM (
+                SELECT bucket_start, {group} AS key, requests, prompt_tokens, completion_tokens, latency_ms_sum,
+                       cached_prompt_tokens
+                FROM usage_rollups
+                WHERE bucket_start >= :start AND bucket_start < :end AND bucket_start < :rolled_until{where}
+                UNION ALL
+                SELECT ts AS bucket_start, {group} AS key, 1, prompt_tokens, completion_tokens, latency_ms,
+                       cached_prompt_tokens
+                FROM usage_events
+                WHERE ts >= MAX(:start, :rolled_until) AND ts < :end{where}
+            )
+            GROUP BY bucket, key
+            ORDER BY bucket, key
+            """,
+            params,
+        )
+
+    async def record(self, event: UsageEvent) -> None:
+        """Appends a usage event."""
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO usage_events (ts, endpoint, project_type, model, cache_outcome, prompt_tokens, "
+            "completion_tokens, latency_ms, cached_prompt_tokens) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                event.ts or time.time(),
+                event.endpoint,
+                event.project_type,
+                event.model,
+                event.cache_outcome,
+                event.prompt_tokens,
+                event.completion_tokens,
+                event.latency_ms,
+                event.cached_prompt_tokens,
+            ),
+        )
+
+    async def rollup(self, now: float | None = None) -> int:
+        """Folds events from complete hours into the rollup table; returns the rows written."""
+        return await asyncio.to_thread(self._rollup, now or time.time())
+
+    async def query(
+        self,
+        bucket: str,
+        start: float,
+        end: float,
+        group_by: str | None = None,
+        filters: dict[str, str] | None = None,
+    ) -> list[tuple]:
+        """Returns usage aggregated into `bucket`-sized time buckets.
+
+        Args:
+            bucket: "hour" or "day".
+            start, end: The time range as Unix timestamps (end exclusive).
+            group_by: Optional dimension to break buckets down by (see `GROUP_COLUMNS`).
+            filters: Optional exact-match filters on `GROUP_COLUMNS`.
+
+        Returns:
+            Rows of (bucket_start, key, requests, prompt_tokens, completion_tokens, latency_ms_sum,
+            cached_prompt_tokens).
+        """
+        if bucket not in BUCKET_SECONDS:
+            raise ValueError(f"Unsupported bucket '{bucket}'.")
+        if group_by is not None and group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Unsupported group_by '{group_by}'.")
+        filters = {column: value for column, value in (filters or {}).items() if value is not None}
+        if any(column not in GROUP_COLUMNS for column in filters):
+            raise ValueError("Unsupported usage filter.")
+        return await asyncio.to_thread(self._query, BUCKET_SECONDS[bucket], start, end, group_by, filters)
+
+
+@lru_cache
+def get_usage_store() -> UsageStore:
+    """Returns the process-wide UsageStore (usable as a FastAPI dependency)."""
+    return UsageStore(settings.USAGE_DB_PATH)
+
+
+async def record_usage(event: UsageEvent) -> None:
+    """Records a usage event if accounting is enabled; failures are logged, never raised."""
+    if not settings.USAGE_ACCOUNTING_ENABLED:
+        return
+    try:
+        await get_usage_store().record(event)
+    except Exception as e:
+        logger.warning(f"Failed to record usage: {e}")
@@ -0,0 +1,37 @@
+"""Generic helpers for dependency graphs."""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def dependency_waves(dependencies: dict[str, set[str]]) -> list[list[str]]:
+    """Groups nodes into waves that can be processed in parallel.
+
+    Every node appears in a later wave than all of its dependencies. Dependencies on
+    unknown nodes are ignored. Cycles are broken rather than rejected: when no node is
+    free of pending dependencies, the nodes with the fewest pending dependencies are
+    released together as the next wave.
+
+    Args:
+        dependencies: Mapping of node -> set of nodes it depends on.
+
+    Returns:
+        A list of waves, each a sorted list of node names.
+    """
+    pending = {node: {dep for dep in deps if dep in dependencies and dep != node}
+               for node, deps in dependencies.items()}
+    waves: list[list[str]] = []
+
+    while pending:
+        ready = sorted(node for node, deps in pending.items() if not deps)
+        if not ready:
+            fewest = min(len(deps) for deps in pending.values())
+            ready = sorted(node for node, deps in pending.items() if len(deps) == fewest)
+            logger.warning(f"Dependency cycle detected; releasing {ready} early.")
+        waves.append(ready)
+        for node in ready:
+            del pending[node]
+        for deps in pending.values():
+            deps.difference_update(ready)
+    return waves
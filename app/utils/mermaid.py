@@ -0,0 +1,209 @@
+"""Helpers for working with the Mermaid flowchart syntax produced by the AI model.
+
+Only the flowchart subset (`graph` / `flowchart`) is understood. Styling, class and
+interaction statements are skipped, and subgraph boundaries are flattened so that
+every node ends up in a single graph.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+# --- Constants ---
+DEFAULT_DIRECTION = "TD"
+
+# Node shape openers mapped to their closers, longest openers first so that
+# e.g. "[(" is not mistaken for a plain "[".
+SHAPE_DELIMITERS = [
+    ("[[", "]]"),
+    ("[(", ")]"),
+    ("[/", "/]"),
+    ("[\\", "\\]"),
+    ("((", "))"),
+    ("{{", "}}"),
+    ("([", "])"),
+    ("[", "]"),
+    ("(", ")"),
+    ("{", "}"),
+    (">", "]"),
+]
+
+SKIPPED_KEYWORDS = ("subgraph", "end", "classDef", "class", "style", "linkStyle", "click", "direction")
+
+HEADER_RE = re.compile(r"^(?:graph|flowchart)\b\s*(?P<direction>TB|TD|BT|RL|LR)?", re.IGNORECASE)
+NODE_ID_RE = re.compile(r"\s*(?P<id>[A-Za-z0-9_]+)")
+CLASS_SUFFIX_RE = re.compile(r":::[A-Za-z0-9_\-]+")
+EDGE_RE = re.compile(
+    r"\s*(?:(?:--|==|-\.)\s+(?P<text>[^|>\-=]+?)\s+)?"
+    r"(?P<arrow><?(?:-{2,}|={2,}|-?\.+-?)(?:>|o|x)?)"
+    r"\s*(?:\|(?P<label>[^|]*)\|)?"
+)
+NODE_SEPARATOR_RE = re.compile(r"\s*&")
+
+
+@dataclass
+class MermaidNode:
+    """A single node of a flowchart."""
+    id: str
+    label: str
+    shape: str = "[]"
+
+
+@dataclass
+class MermaidEdge:
+    """A directed edge between two nodes of a flowchart."""
+    source: str
+    target: str
+    label: str = ""
+
+
+@dataclass
+class MermaidGraph:
+    """A flattened flowchart: nodes keyed by id, edges in declaration order."""
+    direction: str = DEFAULT_DIRECTION
+    nodes: dict[str, MermaidNode] = field(default_factory=dict)
+    edges: list[MermaidEdge] = field(default_factory=list)
+
+    def dependencies(self) -> dict[str, set[str]]:
+        """Returns, for every node, the set of nodes it points to.
+
+        An edge `A --> B` is read as "A depends on B", so B must be built first.
+        """
+        deps: dict[str, set[str]] = {node_id: set() for node_id in self.nodes}
+        for edge in self.edges:
+            if edge.source != edge.target:
+                deps[edge.source].add(edge.target)
+        return deps
+
+
+def strip_code_fences(diagram: str) -> str:
+    """Removes markdown code fences the model sometimes wraps diagrams in."""
+    text = diagram.strip()
+    text = re.sub(r"^```(?:mermaid)?\s*", "", text)
+    text = re.sub(r"\s*```$", "", text)
+    return text
+
+
+def _split_statements(diagram: str) -> list[str]:
+    statements = []
+    for line in strip_code_fences(diagram).splitlines():
+        line = line.split("%%", 1)[0]
+        statements.extend(part.strip() for part in line.split(";") if part.strip())
+    return statements
+
+
+def _parse_node(statement: str, pos: int, graph: MermaidGraph) -> tuple[str, int] | None:
+    """Parses a node reference (with optional shape and label) starting at `pos`."""
+    match = NODE_ID_RE.match(statement, pos)
+    if not match:
+        return None
+    node_id = match.group("id")
+    pos = match.end()
+
+    for opener, closer in SHAPE_DELIMITERS:
+        if statement.startswith(opener, pos):
+            end = statement.find(closer, pos + len(opener))
+            if end == -1:
+                continue
+            label = statement[pos + len(opener):end].strip().strip('"').strip()
+            graph.nodes[node_id] = MermaidNode(id=node_id, label=label or node_id, shape=opener + closer)
+            pos = end + len(closer)
+            break
+    else:
+        if node_id not in graph.nodes:
+            graph.nodes[node_id] = MermaidNode(id=node_id, label=node_id)
+
+    suffix = CLASS_SUFFIX_RE.match(statement, pos)
+    if suffix:
+        pos = suffix.end()
+    return node_id, pos
+
+
+def _parse_node_group(statement: str, pos: int, graph: MermaidGraph) -> tuple[list[str], int] | None:
+    """Parses `A & B & C` style node groups."""
+    parsed = _parse_node(statement, pos, graph)
+    if not parsed:
+        return None
+    node_ids = [parsed[0]]
+    pos = parsed[1]
+    while True:
+        separator = NODE_SEPARATOR_RE.match(statement, pos)
+        if not separator:
+            return node_ids, pos
+        parsed = _parse_node(statement, separator.end(), graph)
+        if not parsed:
+            return node_ids, pos
+        node_ids.append(parsed[0])
+        pos = parsed[1]
+
+
+def parse_flowchart(diagram: str) -> MermaidGraph:
+    """Parses a Mermaid flowchart into a `MermaidGraph`.
+
+    Statements that cannot be understood are skipped rather than rejected, since the
+    diagrams come from a language model and are not guaranteed to be well-formed.
+
+    Args:
+        diagram: The Mermaid source, optionally wrapped in markdown code fences.
+
+    Returns:
+        The parsed graph. Non-flowchart diagrams yield an empty graph.
+    """
+    graph = MermaidGraph()
+    statements = _split_statements(diagram)
+    if not statements:
+        return graph
+
+    header = HEADER_RE.match(statements[0])
+    if not header:
+        return graph
+    graph.direction = (header.group("direction") or DEFAULT_DIRECTION).upper()
+    # "graph TD A-->B" on a single line is valid Mermaid too
+    first = statements[0][header.end():].strip()
+    statements = ([first] if first else []) + statements[1:]
+
+    for statement in statements:
+        keyword = statement.split(None, 1)[0]
+        if keyword in SKIPPED_KEYWORDS:
+            continue
+
+        parsed = _parse_node_group(statement, 0, graph)
+        if not parsed:
+            continue
+        sources, pos = parsed
+        while pos < len(statement):
+            edge = EDGE_RE.match(statement, pos)
+            if not edge or not edge.group("arrow"):
+                break
+            targets = _parse_node_group(statement, edge.end(), graph)
+            if not targets:
+                break
+            label = (edge.group("label") or edge.group("text") or "").strip().strip('"')
+            for source in sources:
+                for target in targets[0]:
+                    graph.edges.append(MermaidEdge(source=source, target=target, label=label))
+            sources, pos = targets
+    return graph
+
+
+def _format_label(label: str) -> str:
+    """Quotes a label when it contains characters that are significant in Mermaid."""
+    if re.search(r'[\[\]{}()|<>";&]', label):
+        return '"' + label.replace('"', "#quot;") + '"'
+    return label
+
+
+def to_mermaid(graph: MermaidGraph) -> str:
+    """Serializes a `MermaidGraph` back to flowchart source.
+
+    Every node is declared once with its shape and label, followed by the edges in
+    order. The output round-trips through `parse_flowchart`.
+    """
+    shapes = {opener + closer: (opener, closer) for opener, closer in SHAPE_DELIMITERS}
+    lines = [f"graph {graph.direction}"]
+    for node in graph.nodes.values():
+        opener, closer = shapes.get(node.shape, ("[", "]"))
+        lines.append(f"    {node.id}{opener}{_format_label(node.label)}{closer}")
+    for edge in graph.edges:
+        label = f"|{_format_label(edge.label)}|" if edge.label else ""
+        lines.append(f"    {edge.source} -->{label} {edge.target}")
+    return "\n".join(lines)
@@ -0,0 +1,53 @@
+"""Helpers for the local SQLite files used for persistence and shared state."""
+
+import logging
+import os
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+# How long a writer waits for another process's lock before failing.
+BUSY_TIMEOUT_MS = 5000
+
+
+def open_sqlite(path: str) -> sqlite3.Connection:
+    """Opens a SQLite database configured for concurrent use by several worker processes.
+
+    WAL journaling lets readers proceed while one process writes, and the busy
+    timeout makes writers wait for each other instead of failing immediately.
+    The connection may be shared between threads; callers serialize access.
+    """
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=BUSY_TIMEOUT_MS / 1000)
+    if path != ":memory:":
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    return conn
+
+
+def apply_migrations(conn: sqlite3.Connection, migrations: list[str], name: str) -> None:
+    """Applies the pending `migrations` in order, recording progress in PRAGMA user_version.
+
+    Several worker processes may open the same database at once, so the version is
+    read again after taking the write lock (BEGIN IMMEDIATE) and each migration is
+    applied by exactly one of them. Migrations are lists of `;`-separated statements,
+    never edited once released; append new ones instead.
+    """
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= len(migrations):
+        return
+    conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        applied = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, migration in enumerate(migrations[applied:], start=applied + 1):
+            for statement in migration.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+            logger.info(f"Applied {name} migration {number}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
@@ -0,0 +1,288 @@
+"""Renders parsed Mermaid flowcharts to standalone SVG without a browser.
+
+The layout is a simple layered (Sugiyama-style) drawing:
+
+1. Nodes are assigned to layers so every edge points to a later layer (cycles are
+   broken by ignoring the back edges of a depth-first search).
+2. Nodes within a layer are ordered by the barycenter of their neighbours, sweeping
+   down and up a few times to reduce crossings.
+3. Layers are centred on a common axis; the flow direction (TD/BT/LR/RL) decides
+   whether layers are stacked vertically or horizontally.
+
+Edges are drawn as curves between node borders, with their label at the midpoint.
+It is not pixel-identical to mermaid.js, but renders the same graph readably.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from html import escape
+
+from app.utils.graph import dependency_waves
+from app.utils.mermaid import MermaidGraph
+
+# --- Layout constants (pixels) ---
+FONT_SIZE = 14
+CHAR_WIDTH = 7.5
+LINE_HEIGHT = 18
+NODE_PADDING_X = 16
+NODE_PADDING_Y = 10
+MIN_NODE_WIDTH = 60
+NODE_GAP = 40
+LAYER_GAP = 70
+MARGIN = 20
+ORDERING_SWEEPS = 4
+
+NODE_FILL = "#ECECFF"
+NODE_STROKE = "#9370DB"
+EDGE_STROKE = "#333333"
+
+LINE_BREAK_RE = re.compile(r"<br\s*/?>", re.IGNORECASE)
+
+
+@dataclass
+class _Box:
+    x: float  # centre
+    y: float  # centre
+    width: float
+    height: float
+
+
+def _label_lines(label: str) -> list[str]:
+    return [line.strip() for line in LINE_BREAK_RE.split(label)] or [""]
+
+
+def _node_size(label: str, shape: str) -> tuple[float, float]:
+    lines = _label_lines(label)
+    width = max(MIN_NODE_WIDTH, max(len(line) for line in lines) * CHAR_WIDTH + 2 * NODE_PADDING_X)
+    height = len(lines) * LINE_HEIGHT + 2 * NODE_PADDING_Y
+    if shape in ("{}", "{{}}"):
+        # Rhombus/hexagon corners eat into the usable area.
+        width, height = width * 1.4, height * 1.3
+    elif shape == "(())":
+        width = height = max(width, height)
+    return width, height
+
+
+def _forward_edges(graph: MermaidGraph) -> list[tuple[str, str]]:
+    """Returns the edges minus the back edges of a depth-first search in declaration order.
+
+    Dropping back edges makes the graph acyclic while keeping the direction the
+    diagram was written in (a feedback edge like `Queue --> Orders` is drawn upwards).
+    """
+    successors: dict[str, list[str]] = {node_id: [] for node_id in graph.nodes}
+    for edge in graph.edges:
+        if edge.source != edge.target:
+            successors[edge.source].append(edge.target)
+    state: dict[str, int] = {}  # 1 = on the DFS stack, 2 = finished
+    forward: list[tuple[str, str]] = []
+    for root in graph.nodes:
+        if root in state:
+            continue
+        state[root] = 1
+        stack = [(root, iter(successors[root]))]
+        while stack:
+            node_id, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                state[node_id] = 2
+                stack.pop()
+            elif state.get(child) != 1:
+                forward.append((node_id, child))
+                if child not in state:
+                    state[child] = 1
+                    stack.append((child, iter(successors[child])))
+    return forward
+
+
+def _layers(graph: MermaidGraph) -> list[list[str]]:
+    predecessors: dict[str, set[str]] = {node_id: set() for node_id in graph.nodes}
+    for source, target in _forward_edges(graph):
+        predecessors[target].add(source)
+    layers = dependency_waves(predecessors)
+
+    # Keep declaration order as the initial in-layer order, then reduce crossings.
+    declared = {node_id: i for i, node_id in enumerate(graph.nodes)}
+    layers = [sorted(layer, key=declared.__getitem__) for layer in layers]
+    neighbours: dict[str, set[str]] = {node_id: set() for node_id in graph.nodes}
+    for edge in graph.edges:
+        neighbours[edge.source].add(edge.target)
+        neighbours[edge.target].add(edge.source)
+
+    for sweep in range(ORDERING_SWEEPS):
+        indices = range(1, len(layers)) if sweep % 2 == 0 else range(len(layers) - 2, -1, -1)
+        for i in indices:
+            reference = layers[i - 1] if sweep % 2 == 0 else layers[i + 1]
+            position = {node_id: p for p, node_id in enumerate(reference)}
+
+            def barycenter(node_id: str, current: int) -> float:
+                linked = [position[n] for n in neighbours[node_id] if n in position]
+                return sum(linked) / len(linked) if linked else current
+
+            layers[i] = [
+                node_id for _, _, node_id in sorted(
+                    (barycenter(node_id, p), p, node_id) for p, node_id in enumerate(layers[i])
+                )
+            ]
+    return layers
+
+
+def _layout(graph: MermaidGraph) -> tuple[dict[str, _Box], float, float]:
+    horizontal = graph.direction in ("LR", "RL")
+    sizes = {node_id: _node_size(node.label, node.shape) for node_id, node in graph.nodes.items()}
+    layers = _layers(graph)
+
+    # Work in (along-layer, across-layer) coordinates, then map to x/y.
+    def breadth(node_id: str) -> float:
+        return sizes[node_id][1] if horizontal else sizes[node_id][0]
+
+    def depth(node_id: str) -> float:
+        return sizes[node_id][0] if horizontal else sizes[node_id][1]
+
+    layer_breadths = [sum(breadth(n) for n in layer) + NODE_GAP * (len(layer) - 1) for layer in layers]
+    layer_depths = [max(depth(n) for n in layer) for layer in layers]
+    total_breadth = max(layer_breadths)
+    total_depth = sum(layer_depths) + LAYER_GAP * (len(layers) - 1)
+
+    boxes: dict[str, _Box] = {}
+    across = 0.0
+    for layer, layer_breadth, layer_depth in zip(layers, layer_breadths, layer_depths):
+        along = (total_breadth - layer_breadth) / 2
+        for node_id in layer:
+            centre_along = along + breadth(node_id) / 2
+            centre_across = across + layer_depth / 2
+            if graph.direction in ("BT", "RL"):
+                centre_across = total_depth - centre_across
+            width, height = sizes[node_id]
+            if horizontal:
+                boxes[node_id] = _Box(MARGIN + centre_across, MARGIN + centre_along, width, height)
+            else:
+                boxes[node_id] = _Box(MARGIN + centre_along, MARGIN + centre_across, width, height)
+            along += breadth(node_id) + NODE_GAP
+        across += layer_depth + LAYER_GAP
+
+    width, height = (total_depth, total_breadth) if horizontal else (total_breadth, total_depth)
+    return boxes, width + 2 * MARGIN, height + 2 * MARGIN
+
+
+def _border_point(box: _Box, towards_x: float, towards_y: float) -> tuple[float, float]:
+    """Where the segment from the box centre towards a point leaves the box."""
+    dx, dy = towards_x - box.x, towards_y - box.y
+    if dx == 0 and dy == 0:
+        return box.x, box.y
+    scale = min(
+        (box.width / 2) / abs(dx) if dx else math.inf,
+        (box.height / 2) / abs(dy) if dy else math.inf,
+    )
+    return box.x + dx * scale, box.y + dy * scale
+
+
+def _shape_svg(shape: str, box: _Box) -> str:
+    left, right = box.x - box.width / 2, box.x + box.width / 2
+    top, bottom = box.y - box.height / 2, box.y + box.height / 2
+    style = f'fill="{NODE_FILL}" stroke="{NODE_STROKE}" stroke-width="1.5"'
+
+    def polygon(points: list[tuple[float, float]]) -> str:
+        return f'<polygon points="{" ".join(f"{x:.1f},{y:.1f}" for x, y in points)}" {style}/>'
+
+    if shape == "{}":
+        return polygon([(box.x, top), (right, box.y), (box.x, bottom), (left, box.y)])
+    if shape == "{{}}":
+        inset = box.height / 3
+        return polygon([(left + inset, top), (right - inset, top), (right, box.y),
+                        (right - inset, bottom), (left + inset, bottom), (left, box.y)])
+    if shape in ("[//]", "[\\\\]"):
+        inset = box.height / 3
+        if shape == "[//]":
+            return polygon([(left + inset, top), (right, top), (right - inset, bottom), (left, bottom)])
+        return polygon([(left, top), (right - inset, top), (right, bottom), (left + inset, bottom)])
+    if shape == ">]":
+        return polygon([(left, top), (right, top), (right, bottom), (left, bottom), (left + box.height / 3, box.y)])
+    if shape == "(())":
+        return f'<circle cx="{box.x:.1f}" cy="{box.y:.1f}" r="{box.width / 2:.1f}" {style}/>'
+    if shape == "[()]":
+        ry = min(8.0, box.height / 6)
+        return (
+            f'<path d="M{left:.1f},{top + ry:.1f} A{box.width / 2:.1f},{ry:.1f} 0 0 0 {right:.1f},{top + ry:.1f} '
+            f'A{box.width / 2:.1f},{ry:.1f} 0 0 0 {left:.1f},{top + ry:.1f} L{left:.1f},{bottom - ry:.1f} '
+            f'A{box.width / 2:.1f},{ry:.1f} 0 0 0 {right:.1f},{bottom - ry:.1f} L{right:.1f},{top + ry:.1f}" {style}/>'
+        )
+    radius = {"()": 8, "([])": box.height / 2}.get(shape, 0)
+    rect = (
+        f'<rect x="{left:.1f}" y="{top:.1f}" width="{box.width:.1f}" height="{box.height:.1f}" '
+        f'rx="{radius:.1f}" {style}/>'
+    )
+    if shape == "[[]]":
+        rect += (
+            f'<line x1="{left + 8:.1f}" y1="{top:.1f}" x2="{left + 8:.1f}" y2="{bottom:.1f}" stroke="{NODE_STROKE}"/>'
+            f'<line x1="{right - 8:.1f}" y1="{top:.1f}" x2="{right - 8:.1f}" y2="{bottom:.1f}" stroke="{NODE_STROKE}"/>'
+        )
+    return rect
+
+
+def _text_svg(label: str, x: float, y: float) -> str:
+    lines = _label_lines(label)
+    first_y = y - (len(lines) - 1) * LINE_HEIGHT / 2
+    spans = "".join(
+        f'<tspan x="{x:.1f}" y="{first_y + i * LINE_HEIGHT:.1f}">{escape(line)}</tspan>'
+        for i, line in enumerate(lines)
+    )
+    return f'<text text-anchor="middle" dominant-baseline="central">{spans}</text>'
+
+
+def render_svg(graph: MermaidGraph) -> str:
+    """Renders a parsed flowchart as a standalone SVG document.
+
+    Args:
+        graph: The graph from `parse_flowchart`.
+
+    Returns:
+        The SVG markup. An empty graph renders as an empty canvas.
+    """
+    if not graph.nodes:
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{2 * MARGIN}" height="{2 * MARGIN}" '
+            f'viewBox="0 0 {2 * MARGIN} {2 * MARGIN}"></svg>'
+        )
+    boxes, width, height = _layout(graph)
+    horizontal = graph.direction in ("LR", "RL")
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+        f'viewBox="0 0 {width:.0f} {height:.0f}" font-family="sans-serif" font-size="{FONT_SIZE}">',
+        '<defs><marker id="arrow" viewBox="0 0 10 10" refX="9" refY="5" markerWidth="8" markerHeight="8" '
+        f'orient="auto-start-reverse"><path d="M0,0 L10,5 L0,10 z" fill="{EDGE_STROKE}"/></marker></defs>',
+    ]
+
+    for edge in graph.edges:
+        source, target = boxes[edge.source], boxes[edge.target]
+        if edge.source == edge.target:
+            x, y = source.x + source.width / 2, source.y
+            path = f"M{x:.1f},{y - 6:.1f} C{x + 30:.1f},{y - 30:.1f} {x + 30:.1f},{y + 30:.1f} {x:.1f},{y + 6:.1f}"
+            mid_x, mid_y = x + 24, y
+        else:
+            x1, y1 = _border_point(source, target.x, target.y)
+            x2, y2 = _border_point(target, source.x, source.y)
+            # Bend along the flow direction so parallel edges stay distinguishable.
+            if horizontal:
+                c1, c2 = (x1 + (x2 - x1) / 2, y1), (x1 + (x2 - x1) / 2, y2)
+            else:
+                c1, c2 = (x1, y1 + (y2 - y1) / 2), (x2, y1 + (y2 - y1) / 2)
+            path = f"M{x1:.1f},{y1:.1f} C{c1[0]:.1f},{c1[1]:.1f} {c2[0]:.1f},{c2[1]:.1f} {x2:.1f},{y2:.1f}"
+            mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
+        parts.append(
+            f'<path d="{path}" fill="none" stroke="{EDGE_STROKE}" stroke-width="1.5" marker-end="url(#arrow)"/>'
+        )
+        if edge.label:
+            label_width = len(edge.label) * CHAR_WIDTH + 8
+            parts.append(
+                f'<rect x="{mid_x - label_width / 2:.1f}" y="{mid_y - LINE_HEIGHT / 2:.1f}" '
+                f'width="{label_width:.1f}" height="{LINE_HEIGHT}" fill="#FFFFFF" opacity="0.85"/>'
+            )
+            parts.append(_text_svg(edge.label, mid_x, mid_y))
+
+    for node_id, node in graph.nodes.items():
+        box = boxes[node_id]
+        parts.append(f'<g id="node-{escape(node_id)}">{_shape_svg(node.shape, box)}{_text_svg(node.label, box.x, box.y)}</g>')
+
+    parts.append("</svg>")
+    return "".join(parts)
@@ -16,6 +16,9 @@ Command Line Options:
   python code_dump.py -t, --tokens NUM     # Set maximum tokens per output file
   python code_dump.py -o, --output PREFIX  # Set output file prefix
   python code_dump.py --output-dir DIR     # Set output directory (default: 'code_dumps')
+  python code_dump.py --format FORMAT      # text (numbered dump files), pack or both
+  python code_dump.py --git                # List files with `git ls-files` (falls back to walking)
+  python code_dump.py --no-gitignore       # Do not apply .gitignore files
   python code_dump.py -v, --verbose        # Enable verbose logging
   python code_dump.py --write-default-config  # Write default config to code_dump_config.json
 
@@ -33,6 +36,26 @@ Examples:
   
   # Specify output directory
   python code_dump.py --output-dir ./my_dumps
+
+  # Write a single indexed pack file instead of numbered dump files
+  python code_dump.py --format pack
+
+Library Usage:
+  iter_chunks() yields the same token-bounded chunks one at a time without writing
+  any files, so callers (such as the repository analysis API) keep memory bounded.
+  tiktoken is optional; without it token counts are estimated.
+
+  The directory walk uses os.scandir, applies every .gitignore in the tree with git's
+  semantics (anchoring, ** and ! negations, deeper files taking precedence) and skips
+  ignored directories without descending into them.
+
+  write_pack() stores the chunks in one pack file that ends with an index of
+  path -> (chunk, byte offset, length, tokens, sha256). PackReader memory-maps a pack
+  and returns single files or chunks as zero-copy memoryviews, so tools can load
+  just the files they need:
+
+    with PackReader("code_dumps/code_dump_pack.cdpack") as pack:
+        source = pack.read_file("app/main.py")
 """
 
 import os
@@ -40,21 +63,22 @@ import re
 import logging
 import argparse
 import fnmatch
-import tiktoken
+import hashlib
+import mmap
+import struct
+import subprocess
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 import time
-from typing import List, Set, Dict, Optional, Tuple
+from typing import Callable, Iterable, Iterator, List, Set, Dict, Optional, Tuple
 import json
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler("code_dump.log")
-    ]
-)
+try:
+    import tiktoken
+except ImportError:  # optional dependency; token counts are estimated without it
+    tiktoken = None
+
 logger = logging.getLogger("code_dump")
 
 # Default configuration
@@ -147,6 +171,7 @@ DEFAULT_CONFIG = {
         "code_dump.py",
         "code_dump.log",
         "code_dump_*.txt",
+        "code_dump_*.cdpack",
         "code_dumps/",
         "**/code_dumps/**",
     ],
@@ -155,13 +180,20 @@ DEFAULT_CONFIG = {
     "encoding_name": "cl100k_base",  # GPT-4 encoding
     "output_prefix": "code_dump_",
     "output_extension": ".txt",
+    "output_format": "text",  # text, pack or both
     "output_directory": "code_dumps",  # Default output directory
     "code_block_style": "```",  # Can be ```language or other styles
     "root_dir": ".",
+    "use_gitignore": True,  # apply the .gitignore files of the tree
+    "use_git_ls_files": False,  # list files with `git ls-files` in git repositories
 }
 
 def load_gitignore(root_dir: str) -> List[str]:
-    """Load patterns from .gitignore files."""
+    """Load the patterns of the root .gitignore for should_ignore, without negations.
+
+    The walker no longer needs this: it applies every .gitignore in the tree itself
+    (see parse_gitignore).
+    """
     gitignore_patterns = []
     gitignore_path = os.path.join(root_dir, ".gitignore")
     
@@ -231,14 +263,152 @@ def should_include(path: str, include_patterns: List[str]) -> bool:
     
     return False
 
+class IgnorePatterns:
+    """Ignore patterns compiled once, with the semantics of should_ignore.
+
+    matches() checks a single path on the assumption that its parent directories
+    were already checked (and not ignored), as they are when walking top-down, so
+    the parent-directory loop of should_ignore is not repeated for every file.
+    """
+
+    def __init__(self, patterns: List[str]):
+        self._rules = []
+        for pattern in patterns:
+            star_regex = None
+            if "**" in pattern:
+                star_regex = re.compile(
+                    "^" + pattern.replace(".", "\\.").replace("**", ".*").replace("*", "[^/]*") + "$"
+                )
+            self._rules.append((
+                re.compile(fnmatch.translate(pattern)),
+                re.compile(fnmatch.translate(pattern.rstrip('/'))),
+                [re.compile(fnmatch.translate(p)) for p in (pattern[:-1], f"{pattern[:-1]}/**")]
+                if pattern.endswith('/') else [],
+                star_regex,
+            ))
+
+    def matches(self, rel_path: str, name: str) -> bool:
+        nested = os.sep in rel_path
+        for full, stripped, dir_regexes, star_regex in self._rules:
+            if full.match(rel_path) or full.match(name):
+                return True
+            if any(regex.match(rel_path) for regex in dir_regexes):
+                return True
+            if star_regex is not None and star_regex.match(rel_path):
+                return True
+            if nested and stripped.match(name):
+                return True
+        return False
+
+    def matches_with_parents(self, rel_path: str, checked: Dict[str, bool]) -> bool:
+        """Like matches(), also checking parent directories (memoized in `checked`)."""
+        parent, name = os.path.split(rel_path)
+        if parent:
+            if parent not in checked:
+                checked[parent] = self.matches_with_parents(parent, checked)
+            if checked[parent]:
+                return True
+        return self.matches(rel_path, name)
+
+@dataclass
+class GitignoreRule:
+    """One .gitignore pattern, compiled to match paths relative to the walk root."""
+    regex: "re.Pattern[str]"
+    negate: bool
+    dir_only: bool
+
+def _translate_gitignore_glob(pattern: str) -> str:
+    """Translate a gitignore glob to a regex fragment (`*` and `?` do not cross `/`)."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i) and (i == 0 or pattern[i - 1] == "/"):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i) and (i == 0 or pattern[i - 1] == "/") and i + 2 == len(pattern):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "\\" and i + 1 < len(pattern):
+            i += 1
+            out.append(re.escape(pattern[i]))
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append("\\[")
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+                i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+def parse_gitignore(lines: Iterable[str], base: str = "") -> List[GitignoreRule]:
+    """Compile the patterns of a .gitignore located in `base` (relative to the walk root, '/'-separated)."""
+    prefix = re.escape(f"{base}/") if base else ""
+    rules = []
+    for line in lines:
+        line = line.rstrip("\n").rstrip("\r")
+        if not line.strip() or line.startswith("#"):
+            continue
+        if not line.endswith("\\ "):
+            line = line.rstrip()
+        negate = line.startswith("!")
+        if negate or line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        if "/" in line:
+            # Anchored to the directory of the .gitignore
+            regex = prefix + _translate_gitignore_glob(line.lstrip("/"))
+        else:
+            regex = prefix + "(?:.*/)?" + _translate_gitignore_glob(line)
+        rules.append(GitignoreRule(re.compile(f"^{regex}$", re.DOTALL), negate, dir_only))
+    return rules
+
+def gitignore_matches(rules: List[GitignoreRule], rel_path: str, is_dir: bool) -> bool:
+    """Whether the last rule matching the path (if any) ignores it."""
+    ignored = False
+    for rule in rules:
+        if rule.dir_only and not is_dir:
+            continue
+        if rule.regex.match(rel_path):
+            ignored = not rule.negate
+    return ignored
+
+def _read_gitignore(path: str, base: str) -> List[GitignoreRule]:
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return parse_gitignore(f, base)
+    except OSError as e:
+        logger.warning(f"Could not read {path}: {e}")
+        return []
+
+@lru_cache(maxsize=None)
+def _get_encoding(encoding_name: str):
+    return tiktoken.get_encoding(encoding_name)
+
 def count_tokens(text: str, encoding_name: str) -> int:
     """Count the number of tokens in the text."""
+    if tiktoken is None:
+        # Fallback: estimate ~4 characters per token
+        return len(text) // 4
     try:
-        encoding = tiktoken.get_encoding(encoding_name)
-        return len(encoding.encode(text))
+        return len(_get_encoding(encoding_name).encode(text, disallowed_special=()))
     except Exception as e:
         logger.warning(f"Error counting tokens: {e}. Using approximate count.")
-        # Fallback: estimate ~4 characters per token
         return len(text) // 4
 
 def is_binary_file(file_path: str) -> bool:
@@ -312,28 +482,436 @@ def get_language_from_extension(file_path: str) -> str:
     
     return language_map.get(ext, '')
 
-def generate_file_content(file_path: str, code_block_style: str) -> Tuple[str, int]:
+def _file_header(display_path: str, code_block_style: str) -> str:
+    lang = get_language_from_extension(display_path)
+    lang_specifier = f"{code_block_style}{lang}" if lang else code_block_style
+    return (
+        f"{'=' * 80}\n"
+        f"FILE: {display_path}\n"
+        f"{'=' * 80}\n"
+        f"{lang_specifier}\n"
+    )
+
+def _file_footer(code_block_style: str) -> str:
+    return f"\n{code_block_style}\n\n"
+
+def format_file_content(display_path: str, content: str, code_block_style: str) -> str:
+    """Format (part of) a file's content as a headed code block."""
+    return f"{_file_header(display_path, code_block_style)}{content}{_file_footer(code_block_style)}"
+
+def generate_file_content(file_path: str, code_block_style: str, display_path: Optional[str] = None) -> Tuple[str, int]:
     """Generate formatted content for a file and count its tokens."""
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
-            
-        lang = get_language_from_extension(file_path)
-        lang_specifier = f"{code_block_style}{lang}" if lang else code_block_style
-        
-        formatted_content = (
-            f"{'=' * 80}\n"
-            f"FILE: {file_path}\n"
-            f"{'=' * 80}\n"
-            f"{lang_specifier}\n"
-            f"{content}\n"
-            f"{code_block_style}\n\n"
-        )
-        
-        return formatted_content, len(content)
+        return format_file_content(display_path or file_path, content, code_block_style), len(content)
     except Exception as e:
         logger.error(f"Error reading file {file_path}: {e}")
-        return f"# ERROR: Could not read {file_path}: {e}\n\n", 0
+        return f"# ERROR: Could not read {display_path or file_path}: {e}\n\n", 0
+
+def new_stats() -> Dict[str, int]:
+    """Return an empty statistics dict, filled in by iter_source_files/iter_chunks."""
+    return {
+        "total_files": 0,
+        "included_files": 0,
+        "ignored_files": 0,
+        "binary_files": 0,
+        "total_lines": 0,
+        "total_tokens": 0,
+        "dump_files_created": 0,
+    }
+
+def default_ignore_patterns(root_dir: str) -> List[str]:
+    """Return the default ignore patterns.
+
+    .gitignore files (including the one in root_dir) are applied by the walker.
+    """
+    return list(DEFAULT_CONFIG["ignore_patterns"])
+
+def _walk_tree(
+    root_dir: str, use_gitignore: bool, skip_dir: Callable[[str], bool]
+) -> Iterator[Tuple[str, str, bool]]:
+    """Yield (path, rel_path, gitignored) for the files under root_dir, top-down.
+
+    A directory's files come before its subdirectories, each sorted by name. Ignored
+    directories (by .gitignore or skip_dir) are pruned without being read. Type
+    information comes from the DirEntry, so no extra stat calls are made.
+    """
+    stack: List[Tuple[str, str, List[GitignoreRule]]] = [(root_dir, "", [])]
+    while stack:
+        dir_path, rel_dir, rules = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError as e:
+            logger.warning(f"Could not read directory {dir_path}: {e}")
+            continue
+        if use_gitignore and any(entry.name == ".gitignore" for entry in entries):
+            # Rules of deeper .gitignore files come later, so they take precedence
+            rules = rules + _read_gitignore(os.path.join(dir_path, ".gitignore"), rel_dir.replace(os.sep, "/"))
+
+        subdirs = []
+        for entry in entries:
+            rel_path = os.path.join(rel_dir, entry.name)
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            gitignored = bool(rules) and gitignore_matches(rules, rel_path.replace(os.sep, "/"), is_dir)
+            if not is_dir:
+                yield entry.path, rel_path, gitignored
+            elif gitignored or skip_dir(rel_path):
+                logger.debug(f"Ignoring directory: {rel_path}")
+            # Like os.walk, do not follow symlinked directories
+            elif not entry.is_symlink():
+                subdirs.append((entry.path, rel_path, rules))
+        stack.extend(reversed(subdirs))
+
+def _git_ls_files(root_dir: str) -> Optional[List[str]]:
+    """Return the tracked and untracked, not ignored files under root_dir, or None outside a git repo."""
+    try:
+        result = subprocess.run(
+            ["git", "-C", root_dir, "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            capture_output=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.info(f"Not using git ls-files for {root_dir}: {e}")
+        return None
+    paths = {os.path.normpath(os.fsdecode(p)) for p in result.stdout.split(b"\0") if p}
+    # Same order as the directory walk, so both modes produce identical chunks:
+    # at every level, files before subdirectories, each sorted by name
+    return sorted(paths, key=lambda p: [(1, part) for part in p.split(os.sep)[:-1]] + [(0, os.path.basename(p))])
+
+def iter_source_files(
+    root_dir: str,
+    ignore_patterns: List[str],
+    include_patterns: List[str],
+    stats: Optional[Dict[str, int]] = None,
+    use_gitignore: bool = True,
+    use_git: bool = False,
+) -> Iterator[Tuple[str, str]]:
+    """Yield (file_path, rel_path) for every text file that is not ignored.
+
+    Args:
+        root_dir: Directory to crawl.
+        ignore_patterns: should_ignore-style patterns, matched relative to root_dir.
+        include_patterns: If given, only matching files are included.
+        stats: Optional dict (see new_stats) updated while crawling.
+        use_gitignore: Apply the .gitignore files found in the tree.
+        use_git: List files with `git ls-files` (which applies .gitignore itself)
+            when root_dir is in a git repository; otherwise walk the tree.
+    """
+    stats = stats if stats is not None else new_stats()
+    patterns = IgnorePatterns(ignore_patterns)
+
+    def accept(file_path: str, rel_path: str, gitignored: bool = False) -> bool:
+        stats["total_files"] += 1
+        if gitignored or patterns.matches(rel_path, os.path.basename(rel_path)):
+            logger.debug(f"Ignoring file: {rel_path}")
+            stats["ignored_files"] += 1
+            return False
+        # Skip if file isn't explicitly included when include patterns are specified
+        if not should_include(rel_path, include_patterns):
+            logger.debug(f"Not included: {rel_path}")
+            stats["ignored_files"] += 1
+            return False
+        if is_binary_file(file_path):
+            logger.debug(f"Skipping binary file: {rel_path}")
+            stats["binary_files"] += 1
+            return False
+        return True
+
+    listed = _git_ls_files(root_dir) if use_git else None
+    if listed is not None:
+        checked_dirs: Dict[str, bool] = {}
+        for rel_path in listed:
+            file_path = os.path.join(root_dir, rel_path)
+            # Deleted but still tracked files, and submodules, are skipped
+            if not os.path.isfile(file_path):
+                continue
+            parent = os.path.dirname(rel_path)
+            if parent and patterns.matches_with_parents(parent, checked_dirs):
+                continue
+            if accept(file_path, rel_path):
+                yield file_path, rel_path
+        return
+
+    skip_dir = lambda rel_path: patterns.matches(rel_path, os.path.basename(rel_path))
+    for file_path, rel_path, gitignored in _walk_tree(root_dir, use_gitignore, skip_dir):
+        if accept(file_path, rel_path, gitignored):
+            yield file_path, rel_path
+
+def split_file_parts(
+    display_path: str, content: str, max_tokens: int, encoding_name: str, code_block_style: str
+) -> Iterator[Tuple[str, str]]:
+    """Split a file too large for one chunk into (label, content) parts on line boundaries."""
+    lines = content.splitlines(keepends=True)
+    # Leave room for the header and fences added around each part
+    overhead = count_tokens(format_file_content(f"{display_path} (part {len(lines)})", "", code_block_style), encoding_name)
+    max_tokens = max(1, max_tokens - overhead)
+    # Estimate line tokens from the file's average, rather than tokenizing every line
+    tokens_per_char = count_tokens(content, encoding_name) / max(1, len(content))
+    part: List[str] = []
+    part_tokens = 0.0
+    number = 1
+    for line in lines:
+        line_tokens = len(line) * tokens_per_char
+        if part and part_tokens + line_tokens > max_tokens:
+            yield f"{display_path} (part {number})", "".join(part)
+            part, part_tokens, number = [], 0.0, number + 1
+        part.append(line)
+        part_tokens += line_tokens
+    if part:
+        yield f"{display_path} (part {number})", "".join(part)
+
+def split_file_content(
+    display_path: str, content: str, max_tokens: int, encoding_name: str, code_block_style: str
+) -> Iterator[Tuple[str, int]]:
+    """Split a file too large for one chunk into formatted parts on line boundaries."""
+    for label, part in split_file_parts(display_path, content, max_tokens, encoding_name, code_block_style):
+        text = format_file_content(label, part, code_block_style)
+        yield text, count_tokens(text, encoding_name)
+
+@dataclass
+class FileSegment:
+    """Where (part of) a file's raw content lies within a chunk, in UTF-8 bytes."""
+    path: str
+    offset: int
+    length: int
+    tokens: int
+    sha256: str
+
+@dataclass
+class Chunk:
+    """A token-bounded group of formatted files, as written to one dump file."""
+    index: int
+    content: str
+    tokens: int
+    files: List[str] = field(default_factory=list)
+    segments: List[FileSegment] = field(default_factory=list)
+
+def iter_chunks(
+    root_dir: str,
+    ignore_patterns: Optional[List[str]] = None,
+    include_patterns: Optional[List[str]] = None,
+    max_tokens: int = DEFAULT_CONFIG["max_tokens_per_file"],
+    encoding_name: str = DEFAULT_CONFIG["encoding_name"],
+    code_block_style: str = DEFAULT_CONFIG["code_block_style"],
+    stats: Optional[Dict[str, int]] = None,
+    relative_paths: bool = False,
+    split_large_files: bool = False,
+    use_gitignore: bool = True,
+    use_git: bool = False,
+) -> Iterator[Chunk]:
+    """Yield the code of a directory as token-bounded chunks, one at a time.
+
+    Args:
+        root_dir: Directory to crawl.
+        ignore_patterns: Patterns to skip; defaults to default_ignore_patterns(root_dir).
+        include_patterns: If given, only matching files are included.
+        max_tokens: Token budget per chunk. A single larger file gets a chunk of its own
+            unless split_large_files is set, in which case it is split on line boundaries.
+        encoding_name: tiktoken encoding used to count tokens.
+        code_block_style: Fence used around each file.
+        stats: Optional dict (see new_stats) updated while crawling.
+        relative_paths: Label files by their path relative to root_dir.
+        split_large_files: Split files over max_tokens across several chunks.
+        use_gitignore: Apply the .gitignore files found in the tree.
+        use_git: List files with `git ls-files` in git repositories.
+    """
+    if ignore_patterns is None:
+        ignore_patterns = default_ignore_patterns(root_dir)
+    stats = stats if stats is not None else new_stats()
+    footer = _file_footer(code_block_style)
+    footer_bytes = len(footer.encode('utf-8'))
+    parts: List[str] = []
+    files: List[str] = []
+    segments: List[FileSegment] = []
+    tokens = 0
+    size = 0  # UTF-8 bytes of the current chunk
+    index = 0
+
+    source_files = iter_source_files(
+        root_dir, ignore_patterns, include_patterns or [], stats, use_gitignore=use_gitignore, use_git=use_git
+    )
+    for file_path, rel_path in source_files:
+        logger.info(f"Processing: {rel_path}")
+        display_path = rel_path if relative_paths else file_path
+
+        # Generate content and get token count
+        file_content, file_lines = generate_file_content(file_path, code_block_style, display_path)
+        file_tokens = count_tokens(file_content, encoding_name)
+        
+        stats["included_files"] += 1
+        stats["total_lines"] += file_lines
+        stats["total_tokens"] += file_tokens
+
+        # (formatted text, tokens, label, raw content); raw is None for read errors
+        if split_large_files and file_tokens > max_tokens:
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                parts_of_file = split_file_parts(display_path, f.read(), max_tokens, encoding_name, code_block_style)
+                pieces = []
+                for label, raw in parts_of_file:
+                    text = format_file_content(label, raw, code_block_style)
+                    pieces.append((text, count_tokens(text, encoding_name), label, raw))
+        else:
+            header = _file_header(display_path, code_block_style)
+            raw = file_content[len(header):-len(footer)] if file_content.startswith(header) else None
+            pieces = [(file_content, file_tokens, display_path, raw)]
+
+        for piece, piece_tokens, label, raw in pieces:
+            # Check if we need to start a new chunk
+            if tokens + piece_tokens > max_tokens and tokens > 0:
+                yield Chunk(index, "".join(parts), tokens, files, segments)
+                parts, files, segments, tokens, size, index = [], [], [], 0, 0, index + 1
+            parts.append(piece)
+            files.append(rel_path)
+            tokens += piece_tokens
+            if raw is None:
+                size += len(piece.encode('utf-8'))
+                continue
+            header_bytes = len(_file_header(label, code_block_style).encode('utf-8'))
+            raw_bytes = raw.encode('utf-8')
+            segments.append(FileSegment(
+                rel_path, size + header_bytes, len(raw_bytes), piece_tokens, hashlib.sha256(raw_bytes).hexdigest()
+            ))
+            size += header_bytes + len(raw_bytes) + footer_bytes
+
+    if parts:
+        yield Chunk(index, "".join(parts), tokens, files, segments)
+
+PACK_MAGIC = b"CDPACK01"
+PACK_EXTENSION = ".cdpack"
+# Trailer: index offset, index length (little-endian uint64), then the magic again
+_PACK_TRAILER = struct.Struct("<QQ8s")
+
+class PackWriter:
+    """Writes chunks to a pack file one at a time and appends their index on close.
+
+    Layout: magic, the UTF-8 content of every chunk back to back, the JSON index,
+    and a fixed-size trailer locating the index. Only one chunk is held in memory.
+    """
+
+    def __init__(self, path: str, metadata: Optional[Dict] = None):
+        self.path = path
+        self._file = open(path, 'wb')
+        self._file.write(PACK_MAGIC)
+        self.index: Dict = {"version": 1, "metadata": metadata or {}, "chunks": [], "files": {}}
+
+    def add(self, chunk: Chunk) -> None:
+        data = chunk.content.encode('utf-8')
+        offset = self._file.tell()
+        self._file.write(data)
+        self.index["chunks"].append({
+            "index": chunk.index, "offset": offset, "length": len(data), "tokens": chunk.tokens,
+        })
+        for segment in chunk.segments:
+            self.index["files"].setdefault(segment.path, []).append({
+                "chunk": chunk.index,
+                "offset": offset + segment.offset,
+                "length": segment.length,
+                "tokens": segment.tokens,
+                "sha256": segment.sha256,
+            })
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        index = json.dumps(self.index, separators=(',', ':')).encode('utf-8')
+        index_offset = self._file.tell()
+        self._file.write(index)
+        self._file.write(_PACK_TRAILER.pack(index_offset, len(index), PACK_MAGIC))
+        self._file.close()
+
+    def __enter__(self) -> "PackWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+def write_pack(chunks: Iterable[Chunk], path: str, metadata: Optional[Dict] = None) -> Dict:
+    """Write chunks (e.g. from iter_chunks) to a pack file and return its index."""
+    with PackWriter(path, metadata) as writer:
+        for chunk in chunks:
+            writer.add(chunk)
+    return writer.index
+
+class PackReader:
+    """Random access to the files and chunks of a pack file through mmap.
+
+    file_view() and chunk_view() return memoryviews into the mapping without
+    copying; release them before closing the reader.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._mmap) < len(PACK_MAGIC) + _PACK_TRAILER.size or self._mmap[:len(PACK_MAGIC)] != PACK_MAGIC:
+                raise ValueError(f"{path} is not a code dump pack file")
+            index_offset, index_length, magic = _PACK_TRAILER.unpack_from(self._mmap, len(self._mmap) - _PACK_TRAILER.size)
+            if magic != PACK_MAGIC:
+                raise ValueError(f"{path} is truncated or corrupt")
+            self.index = json.loads(self._mmap[index_offset:index_offset + index_length])
+        except Exception:
+            self._mmap.close()
+            raise
+        self._view = memoryview(self._mmap)
+
+    @property
+    def files(self) -> List[str]:
+        return list(self.index["files"])
+
+    @property
+    def metadata(self) -> Dict:
+        return self.index["metadata"]
+
+    def __len__(self) -> int:
+        """Number of chunks."""
+        return len(self.index["chunks"])
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.index["files"]
+
+    def entries(self, path: str) -> List[Dict]:
+        """Index entries of a file: one per part, in order. Raises KeyError if absent."""
+        return self.index["files"][path]
+
+    def file_view(self, path: str) -> memoryview:
+        """The raw UTF-8 content of a file; zero-copy unless the file was split."""
+        entries = self.entries(path)
+        if len(entries) == 1:
+            return self._view[entries[0]["offset"]:entries[0]["offset"] + entries[0]["length"]]
+        return memoryview(b"".join(self._view[e["offset"]:e["offset"] + e["length"]] for e in entries))
+
+    def read_file(self, path: str, verify: bool = False) -> str:
+        """The content of a file; with verify, its parts are checked against their hashes."""
+        if verify:
+            for entry in self.entries(path):
+                data = self._view[entry["offset"]:entry["offset"] + entry["length"]]
+                if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+                    raise ValueError(f"Content of {path} does not match its hash in {self.path}")
+        return str(self.file_view(path), 'utf-8')
+
+    def chunk_view(self, index: int) -> memoryview:
+        """The formatted content of a chunk, as written to a numbered dump file."""
+        chunk = self.index["chunks"][index]
+        return self._view[chunk["offset"]:chunk["offset"] + chunk["length"]]
+
+    def read_chunk(self, index: int) -> str:
+        return str(self.chunk_view(index), 'utf-8')
+
+    def close(self) -> None:
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "PackReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
 def crawl_directory(
     root_dir: str,
@@ -344,7 +922,10 @@ def crawl_directory(
     output_prefix: str,
     output_extension: str,
     output_directory: str,
-    code_block_style: str
+    code_block_style: str,
+    output_format: str = "text",
+    use_gitignore: bool = True,
+    use_git: bool = False,
 ) -> None:
     """Crawl directory and generate dump files."""
     start_time = time.time()
@@ -354,89 +935,42 @@ def crawl_directory(
     os.makedirs(output_directory, exist_ok=True)
     logger.info(f"Output files will be saved to: {os.path.abspath(output_directory)}")
     
-    # Statistics
-    stats = {
-        "total_files": 0,
-        "included_files": 0,
-        "ignored_files": 0,
-        "binary_files": 0,
-        "total_lines": 0,
-        "total_tokens": 0,
-        "dump_files_created": 0,
-    }
-    
-    # Current dump file content and tokens
-    current_content = ""
-    current_tokens = 0
-    dump_file_counter = 1
-    
-    # Helper function to write to dump file
-    def write_dump_file():
-        nonlocal current_content, current_tokens, dump_file_counter, stats
-        
-        if not current_content:
-            return
-            
-        output_filename = os.path.join(output_directory, f"{output_prefix}{dump_file_counter}{output_extension}")
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            f.write(current_content)
-            
-        logger.info(f"Wrote {output_filename} with {current_tokens} tokens")
-        stats["dump_files_created"] += 1
-        dump_file_counter += 1
-        current_content = ""
-        current_tokens = 0
-    
-    # Walk through the directory tree
-    for dirpath, dirnames, filenames in os.walk(root_dir):
-        # Skip directories that match ignore patterns
-        dirnames[:] = [d for d in dirnames if not should_ignore(os.path.join(dirpath, d), ignore_patterns)]
-        
-        for filename in filenames:
-            file_path = os.path.join(dirpath, filename)
-            rel_path = os.path.relpath(file_path, root_dir)
-            
-            stats["total_files"] += 1
-            
-            # Skip if file should be ignored
-            if should_ignore(rel_path, ignore_patterns):
-                logger.debug(f"Ignoring file: {rel_path}")
-                stats["ignored_files"] += 1
-                continue
-                
-            # Skip if file isn't explicitly included when include patterns are specified
-            if not should_include(rel_path, include_patterns):
-                logger.debug(f"Not included: {rel_path}")
-                stats["ignored_files"] += 1
-                continue
-                
-            # Skip binary files
-            if is_binary_file(file_path):
-                logger.debug(f"Skipping binary file: {rel_path}")
-                stats["binary_files"] += 1
-                continue
-                
-            logger.info(f"Processing: {rel_path}")
-            
-            # Generate content and get token count
-            file_content, file_lines = generate_file_content(file_path, code_block_style)
-            file_tokens = count_tokens(file_content, encoding_name)
-            
-            stats["included_files"] += 1
-            stats["total_lines"] += file_lines
-            stats["total_tokens"] += file_tokens
-            
-            # Check if we need to start a new dump file
-            if current_tokens + file_tokens > max_tokens_per_file and current_tokens > 0:
-                write_dump_file()
-                
-            # Add to current dump file
-            current_content += file_content
-            current_tokens += file_tokens
-    
-    # Write the final dump file if there's any content
-    if current_content:
-        write_dump_file()
+    stats = new_stats()
+    chunks = iter_chunks(
+        root_dir,
+        ignore_patterns,
+        include_patterns,
+        max_tokens=max_tokens_per_file,
+        encoding_name=encoding_name,
+        code_block_style=code_block_style,
+        stats=stats,
+        use_gitignore=use_gitignore,
+        use_git=use_git,
+    )
+    pack_path = os.path.join(output_directory, f"{output_prefix}pack{PACK_EXTENSION}")
+    pack = None
+    if output_format in ("pack", "both"):
+        pack = PackWriter(pack_path, {
+            "root_dir": os.path.abspath(root_dir),
+            "max_tokens_per_file": max_tokens_per_file,
+            "encoding_name": encoding_name,
+            "code_block_style": code_block_style,
+        })
+    try:
+        for chunk in chunks:
+            if pack is not None:
+                pack.add(chunk)
+            if output_format in ("text", "both"):
+                output_filename = os.path.join(output_directory, f"{output_prefix}{chunk.index + 1}{output_extension}")
+                with open(output_filename, 'w', encoding='utf-8') as f:
+                    f.write(chunk.content)
+                logger.info(f"Wrote {output_filename} with {chunk.tokens} tokens")
+                stats["dump_files_created"] += 1
+    finally:
+        if pack is not None:
+            pack.close()
+    if pack is not None:
+        logger.info(f"Wrote {pack_path} with {len(pack.index['chunks'])} chunks and {len(pack.index['files'])} files")
         
     # Print statistics
     elapsed_time = time.time() - start_time
@@ -456,6 +990,8 @@ def crawl_directory(
                 "max_tokens_per_file": max_tokens_per_file,
                 "encoding_name": encoding_name,
                 "output_directory": output_directory,
+                "output_format": output_format,
+                "pack_file": pack_path if pack is not None else None,
             }
         }, f, indent=2)
 
@@ -483,10 +1019,25 @@ def main():
     parser.add_argument('-t', '--tokens', type=int, help='Maximum tokens per output file')
     parser.add_argument('-o', '--output', help='Output file prefix')
     parser.add_argument('--output-dir', help='Output directory for dump files')
+    parser.add_argument('--format', choices=['text', 'pack', 'both'],
+                        help='Write numbered text dumps, a single indexed pack file, or both')
+    parser.add_argument('--git', action='store_true',
+                        help='List files with git ls-files when the directory is a git repository')
+    parser.add_argument('--no-gitignore', action='store_true', help='Do not apply .gitignore files')
     parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose logging')
     parser.add_argument('--write-default-config', action='store_true', 
                         help='Write default configuration to code_dump_config.json and exit')
     args = parser.parse_args()
+
+    # Set up logging (here rather than at import, so importing the library stays silent)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.StreamHandler(),
+            logging.FileHandler("code_dump.log")
+        ]
+    )
     
     # Set logging level
     if args.verbose:
@@ -511,10 +1062,12 @@ def main():
         config['output_prefix'] = args.output
     if args.output_dir:
         config['output_directory'] = args.output_dir
-        
-    # Load gitignore patterns and add them to the ignore list
-    gitignore_patterns = load_gitignore(config['root_dir'])
-    config['ignore_patterns'].extend(gitignore_patterns)
+    if args.format:
+        config['output_format'] = args.format
+    if args.git:
+        config['use_git_ls_files'] = True
+    if args.no_gitignore:
+        config['use_gitignore'] = False
     
     # Run the crawler
     crawl_directory(
@@ -526,7 +1079,10 @@ def main():
         output_prefix=config['output_prefix'],
         output_extension=config['output_extension'],
         output_directory=config['output_directory'],
-        code_block_style=config['code_block_style']
+        code_block_style=config['code_block_style'],
+        output_format=config['output_format'],
+        use_gitignore=config['use_gitignore'],
+        use_git=config['use_git_ls_files'],
     )
 
 if __name__ == "__main__":
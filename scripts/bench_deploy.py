@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Deployment pipeline benchmark.
+
+Deploys a synthetic architecture to the LOCAL (file-backed) target and prints the
+per-stage timing breakdown, so parallelism settings can be compared offline.
+
+Usage:
+  python scripts/bench_deploy.py --services 50 --latency 0.05 --parallel 8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.schemas.architecture import ArchitectureResponse  # noqa: E402
+from app.schemas.deploy import DeploymentTarget  # noqa: E402
+from app.services.architecture_store import ArchitectureStore  # noqa: E402
+from app.services.deploy_targets import LocalDeploymentBackend  # noqa: E402
+from app.services.deployment_engine import DeploymentEngine  # noqa: E402
+
+
+def synthetic_diagram(services: int) -> str:
+    """A gateway fanning out to N services, each with its own database."""
+    lines = ["graph TD", "GW{Gateway}"]
+    for i in range(services):
+        lines.append(f"GW --> S{i}(Service {i})")
+        lines.append(f"S{i} --> D{i}[(DB {i})]")
+    return "\n".join(lines)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ArchitectureStore(os.path.join(tmp, "arch.db"))
+        engine = DeploymentEngine(
+            store,
+            backend_factory=lambda target: LocalDeploymentBackend(os.path.join(tmp, "cloud"), args.latency),
+            max_parallel=args.parallel,
+        )
+        architecture = ArchitectureResponse(
+            architecture_diagram=synthetic_diagram(args.services), description="benchmark", recommendations=[]
+        )
+        record = await store.save("benchmark", "microservices", [], architecture)
+        start = time.perf_counter()
+        deployment = await engine.start(record.id, DeploymentTarget.LOCAL, {})
+        deployment = await engine.wait(deployment.id)
+        return {
+            "status": deployment.status,
+            "resources": len(deployment.resources),
+            "total_ms": round((time.perf_counter() - start) * 1000, 1),
+            "stages_ms": {name: stage.duration_ms for name, stage in deployment.stages.items()},
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the deployment pipeline against the LOCAL target")
+    parser.add_argument("--services", type=int, default=50, help="Number of services in the synthetic architecture")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated provider latency per operation (s)")
+    parser.add_argument("--parallel", type=int, default=8, help="Maximum concurrent resource operations")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
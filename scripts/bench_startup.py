@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark.
+
+Starts a fresh interpreter N times per startup mode and measures, inside each one,
+the time to import `app.main`, to run the lifespan startup and to serve the first
+request (through the in-process TestClient). Reports the median and worst run.
+
+Usage:
+  python scripts/bench_startup.py --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in a fresh interpreter for every run.
+PROBE = """
+import json, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    ready = time.perf_counter()
+    client.get("/")
+    first_request = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "ready_ms": (ready - start) * 1000,
+    "first_request_ms": (first_request - start) * 1000,
+}))
+"""
+
+
+def run_once(lazy: bool) -> dict:
+    env = dict(os.environ, LAZY_STARTUP="1" if lazy else "0")
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark application cold start, eager vs lazy")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per mode")
+    args = parser.parse_args()
+
+    summary = {}
+    for lazy in (False, True):
+        runs = [run_once(lazy) for _ in range(args.runs)]
+        summary["lazy" if lazy else "eager"] = {
+            key: {
+                "median": round(statistics.median(run[key] for run in runs), 1),
+                "max": round(max(run[key] for run in runs), 1),
+            }
+            for key in runs[0]
+        }
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
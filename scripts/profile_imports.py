@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Import-time profile of the application.
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter and prints
+the modules with the highest cumulative import time, for eager and/or lazy startup.
+
+Usage:
+  python scripts/profile_imports.py                # compare eager and lazy startup
+  python scripts/profile_imports.py --mode lazy --top 30
+  python scripts/profile_imports.py --module app.services.architecture_service
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORTTIME_RE = re.compile(r"^import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \|(?P<indent>\s+)(?P<module>\S+)")
+
+
+def profile(module: str, lazy: bool) -> list[tuple[str, int, int, int]]:
+    """Returns (module, self_us, cumulative_us, depth) for every import of `module`."""
+    env = dict(os.environ, LAZY_STARTUP="1" if lazy else "0")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            depth = (len(match.group("indent")) - 1) // 2
+            entries.append((match.group("module"), int(match.group("self")), int(match.group("cumulative")), depth))
+    return entries
+
+
+def report(module: str, lazy: bool, top: int) -> None:
+    entries = profile(module, lazy)
+    total = next((e[2] for e in entries if e[0] == module), sum(e[1] for e in entries))
+    print(f"\n== {module} ({'lazy' if lazy else 'eager'} startup): {total / 1000:.1f} ms total ==")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative_us, depth in sorted(entries, key=lambda e: e[2], reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {'  ' * depth}{name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile import time with -X importtime")
+    parser.add_argument("--module", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--mode", choices=["eager", "lazy", "both"], default="both", help="Startup mode(s) to profile")
+    parser.add_argument("--top", type=int, default=20, help="Number of modules to show")
+    args = parser.parse_args()
+
+    modes = {"eager": [False], "lazy": [True], "both": [False, True]}[args.mode]
+    for lazy in modes:
+        report(args.module, lazy, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Traffic replay.
+
+Re-drives requests captured with TRAFFIC_CAPTURE_ENABLED against a running
+instance, at the captured timing or a multiple of it, and reports the latency
+distribution per path. Start the instance with the capture log as its offline
+recordings, so it answers with the recorded upstream responses and latencies:
+
+  LLM_PROVIDER=offline LLM_OFFLINE_RECORDINGS_PATH=traffic.ndjson uvicorn app.main:app
+
+Requests that reference stored architectures by ID need the captured instance's
+ARCHITECTURE_DB_PATH (or a copy of it) to succeed.
+
+Usage:
+  python scripts/replay_traffic.py traffic.ndjson --speed 2 --output build-a.json
+  python scripts/replay_traffic.py traffic.ndjson --baseline build-a.json --output build-b.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.traffic_capture import compare, load_requests, replay, summarize  # noqa: E402
+
+
+async def run(args: argparse.Namespace) -> dict:
+    requests = load_requests(args.capture)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+        results = await replay(client, requests, speed=args.speed, concurrency=args.concurrency)
+    return {
+        "capture": args.capture,
+        "speed": args.speed,
+        "replayed": summarize(results),
+        "recorded": summarize(results, field="recorded_latency_ms"),
+    }
+
+
+def print_comparison(rows: list[dict]) -> None:
+    print(f"{'path':<48} {'count':>6} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10}", file=sys.stderr)
+    for row in rows:
+        cells = []
+        for stat in ("p50_ms", "p90_ms", "p99_ms"):
+            change = row[f"{stat}_change"]
+            cells.append(f"{row[stat]:.0f}" + ("" if change is None else f" {change:+.0%}"))
+        print(f"{row['path']:<48} {row['count']:>6} " + " ".join(f"{cell:>10}" for cell in cells), file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured API traffic and compare latency distributions")
+    parser.add_argument("capture", help="Traffic capture log (NDJSON)")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="Instance to replay against")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Timing multiplier (2 = twice as fast); 0 sends requests back to back")
+    parser.add_argument("--concurrency", type=int, default=64, help="Maximum requests in flight")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout (s)")
+    parser.add_argument("--output", help="Write the summary JSON here, for use as a later --baseline")
+    parser.add_argument("--baseline", help="Summary JSON of an earlier run (e.g. another build) to compare with")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print_comparison(compare(baseline["replayed"], report["replayed"]))
+    else:
+        # Without a baseline, compare with the latencies seen at capture time.
+        print_comparison(compare(report["recorded"], report["replayed"]))
+    print(json.dumps(report["replayed"], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from app.core.admission import AdmissionController, AdmissionRejected
+
+
+def test_requests_queue_behind_the_limit_and_excess_is_shed():
+    controller = AdmissionController(limit=2, max_queue=1, max_wait_seconds=5, target_latency_seconds=1)
+
+    async def run():
+        await controller.acquire()
+        await controller.acquire()
+        queued = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0)
+        assert controller.queued == 1
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire()
+        assert rejected.value.reason == "queue_full"
+        assert rejected.value.retry_after >= 1
+
+        controller.release(latency=0.1)
+        await queued
+        assert controller.in_flight == 2 and controller.queued == 0
+
+    asyncio.run(run())
+
+
+def test_request_is_rejected_when_expected_wait_exceeds_its_deadline():
+    controller = AdmissionController(limit=1, max_queue=10, max_wait_seconds=5, target_latency_seconds=20)
+
+    async def run():
+        await controller.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire(max_wait=2)
+        return rejected.value
+
+    rejected = asyncio.run(run())
+    assert rejected.reason == "deadline"
+    assert rejected.retry_after == 10
+    assert controller.queued == 0
+
+
+def test_queued_request_times_out():
+    controller = AdmissionController(limit=1, max_queue=10, max_wait_seconds=0.05, target_latency_seconds=0.01)
+
+    async def run():
+        await controller.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire()
+        return rejected.value
+
+    assert asyncio.run(run()).reason == "timeout"
+    assert controller.queued == 0 and controller.in_flight == 1
+
+
+def test_adaptive_limit_backs_off_on_slow_responses_and_recovers():
+    controller = AdmissionController(
+        limit=8, max_queue=10, max_wait_seconds=5, adaptive=True, min_limit=2, target_latency_seconds=1
+    )
+
+    async def run(latency):
+        await controller.acquire()
+        controller.release(latency)
+
+    for _ in range(10):
+        asyncio.run(run(latency=5))
+    assert controller.limit == 2
+
+    for _ in range(50):
+        asyncio.run(run(latency=0.1))
+    assert 2 < controller.limit <= 8
@@ -0,0 +1,87 @@
+import asyncio
+import csv
+import io
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import architecture
+from app.core.config import settings
+from app.schemas.architecture import ArchitectureExportFormat, ArchitectureResponse
+from app.services.architecture_export import CSV_COLUMNS, export_architectures
+from app.services.architecture_store import ArchitectureStore, get_architecture_store
+
+
+def fill_store(store, count):
+    async def run():
+        for i in range(count):
+            await store.save(
+                prompt=f"prompt {i}",
+                project_type="web" if i % 2 == 0 else "mobile",
+                constraints=["Low cost"],
+                architecture=ArchitectureResponse(
+                    architecture_diagram=f"graph TD\n  A{i} --> B", description=f"Design {i}, with a comma",
+                    recommendations=["Cache reads"],
+                ),
+            )
+    asyncio.run(run())
+    # Give some records identical timestamps; pagination must neither skip nor repeat them.
+    store._execute("UPDATE architectures SET created_at = '2026-01-01T00:00:00+00:00' WHERE prompt IN ('prompt 3', 'prompt 4', 'prompt 5')")
+
+
+def test_iter_records_pages_through_ties_with_filters(tmp_path):
+    store = ArchitectureStore(str(tmp_path / "arch.db"))
+    fill_store(store, 11)
+
+    async def collect(**kwargs):
+        return [record async for record in store.iter_records(**kwargs)]
+
+    every = asyncio.run(collect(batch_size=2))
+    assert len(every) == 11 and len({r.id for r in every}) == 11
+    assert [(r.created_at, r.id) for r in every] == sorted((r.created_at, r.id) for r in every)
+    assert len(asyncio.run(collect(project_type="web", batch_size=2))) == 6
+    after = every[5].created_at
+    assert [r.id for r in asyncio.run(collect(start=after, batch_size=3))] == [r.id for r in every[5:]]
+    assert [r.id for r in asyncio.run(collect(end=after, batch_size=3))] == [r.id for r in every[:5]]
+
+    async def blocks():
+        return [block async for block in export_architectures(store, ArchitectureExportFormat.NDJSON, batch_size=4)]
+
+    # One block per batch, so at most batch_size records are buffered.
+    assert [len(block.splitlines()) for block in asyncio.run(blocks())] == [4, 4, 3]
+
+
+def test_export_endpoint_streams_ndjson_and_csv(tmp_path, monkeypatch):
+    store = ArchitectureStore(str(tmp_path / "arch.db"))
+    fill_store(store, 5)
+    app = FastAPI()
+    app.include_router(architecture.router, prefix="/api/v1")
+    app.dependency_overrides[get_architecture_store] = lambda: store
+    client = TestClient(app)
+
+    # Admin-only: unavailable without ADMIN_TOKEN, forbidden without the right token.
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "")
+    assert client.get("/api/v1/architectures/export").status_code == 404
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    assert client.get("/api/v1/architectures/export", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    client.headers["X-Admin-Token"] = "secret"
+
+    response = client.get("/api/v1/architectures/export?batch_size=2")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 5
+    assert lines[0]["architecture"]["architecture_id"] == lines[0]["id"]
+
+    response = client.get("/api/v1/architectures/export?format=csv&project_type=mobile")
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="architectures.csv"' in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert list(rows[0]) == CSV_COLUMNS
+    assert [row["project_type"] for row in rows] == ["mobile", "mobile"]
+    assert json.loads(rows[0]["recommendations"]) == ["Cache reads"]
+
+    assert client.get("/api/v1/architectures/export?start=2030-01-01").text == ""
+    assert client.get("/api/v1/architectures/export?start=2030-01-01&end=2029-01-01").status_code == 422
+    assert client.get("/api/v1/architectures/export?batch_size=100000").status_code == 422
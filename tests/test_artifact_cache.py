@@ -0,0 +1,23 @@
+import asyncio
+
+from app.services.artifact_cache import ArtifactCache, artifact_key
+
+
+def test_artifact_cache_hits_stale_and_evicts(tmp_path):
+    cache = ArtifactCache(str(tmp_path), max_bytes=10)
+    first = artifact_key("arch", "Auth Service", "python", "model")
+    second = artifact_key("arch", "Order Service", "python", "model")
+
+    async def run():
+        await cache.put(first, b"123456", "upstream-v1")
+        assert await cache.get(first, "upstream-v1") == b"123456"
+        assert await cache.get(first, "upstream-v2") is None
+        # Pushes the total over 10 bytes, evicting the least recently used entry.
+        await cache.put(second, b"abcdef", "")
+        assert await cache.get(first, "upstream-v1") is None
+        assert await cache.get(second, "") == b"abcdef"
+
+    asyncio.run(run())
+    assert cache.stats["evictions"] == 1
+    assert cache.stats["stale"] == 1
+    assert len([p for p in (tmp_path / "blobs").rglob("*") if p.is_file()]) == 1
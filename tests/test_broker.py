@@ -0,0 +1,18 @@
+import asyncio
+
+from app.core.broker import EventBroker
+
+
+def test_slow_subscriber_drops_oldest_without_blocking_publisher():
+    broker = EventBroker(buffer_size=3)
+
+    async def run():
+        subscription = broker.subscribe("deployment:1")
+        for i in range(5):
+            assert broker.publish("deployment:1", {"type": "log", "n": i}) == 1
+        broker.close_topic("deployment:1")
+        return [message async for message in subscription], subscription.dropped
+
+    messages, dropped = asyncio.run(run())
+    assert dropped == 2
+    assert messages == [{"type": "lagged", "dropped": 2}] + [{"type": "log", "n": i} for i in (2, 3, 4)]
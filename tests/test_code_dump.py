@@ -0,0 +1,104 @@
+import json
+import subprocess
+
+import pytest
+
+import code_dump
+
+
+def write_tree(root):
+    (root / "app").mkdir(parents=True)
+    (root / "app" / "main.py").write_text("print('héllo wörld')\n" * 5, encoding="utf-8")
+    (root / "app" / "util.js").write_text("export const x = 1;\n", encoding="utf-8")
+    (root / "big.py").write_text("".join(f"value_{i} = {i}\n" for i in range(3000)), encoding="utf-8")
+
+
+def test_pack_round_trips_files_and_chunks(tmp_path):
+    write_tree(tmp_path / "src")
+    chunks = list(code_dump.iter_chunks(
+        str(tmp_path / "src"), max_tokens=2000, relative_paths=True, split_large_files=True
+    ))
+    index = code_dump.write_pack(chunks, str(tmp_path / "dump.cdpack"), {"root_dir": "src"})
+    assert len(index["files"]["big.py"]) > 1
+
+    with code_dump.PackReader(str(tmp_path / "dump.cdpack")) as pack:
+        assert len(pack) == len(chunks)
+        assert pack.metadata == {"root_dir": "src"}
+        assert sorted(pack.files) == ["app/main.py", "app/util.js", "big.py"]
+        for path in pack.files:
+            assert pack.read_file(path, verify=True) == (tmp_path / "src" / path).read_text(encoding="utf-8")
+        view = pack.file_view("app/util.js")
+        assert bytes(view) == b"export const x = 1;\n"
+        view.release()
+        assert [pack.read_chunk(i) for i in range(len(pack))] == [chunk.content for chunk in chunks]
+        segment = next(seg for chunk in chunks for seg in chunk.segments if seg.path == "app/main.py")
+        assert pack.entries("app/main.py")[0]["sha256"] == segment.sha256
+        with pytest.raises(KeyError):
+            pack.entries("missing.py")
+
+
+def test_crawl_directory_writes_pack_format(tmp_path):
+    write_tree(tmp_path / "src")
+    out = tmp_path / "out"
+    code_dump.crawl_directory(
+        root_dir=str(tmp_path / "src"),
+        ignore_patterns=code_dump.default_ignore_patterns(str(tmp_path / "src")),
+        include_patterns=[],
+        max_tokens_per_file=100000,
+        encoding_name="cl100k_base",
+        output_prefix="code_dump_",
+        output_extension=".txt",
+        output_directory=str(out),
+        code_block_style="```",
+        output_format="pack",
+    )
+    assert sorted(p.name for p in out.iterdir()) == ["code_dump_pack.cdpack", "code_dump_stats.json"]
+    stats = json.loads((out / "code_dump_stats.json").read_text())
+    assert stats["config"]["pack_file"].endswith("code_dump_pack.cdpack")
+    with code_dump.PackReader(str(out / "code_dump_pack.cdpack")) as pack:
+        assert pack.read_file("app/main.py").startswith("print('héllo")
+        assert "FILE: " in pack.read_chunk(0)
+
+    (tmp_path / "bad.cdpack").write_bytes(b"not a pack file at all, definitely not")
+    with pytest.raises(ValueError):
+        code_dump.PackReader(str(tmp_path / "bad.cdpack"))
+
+
+def source_files(root, **kwargs):
+    return [rel for _, rel in code_dump.iter_source_files(str(root), code_dump.default_ignore_patterns(str(root)), [], **kwargs)]
+
+
+def test_walk_applies_nested_gitignore_files(tmp_path):
+    files = {
+        ".gitignore": "*.gen.py\n/secrets/\nlogs/\n!keep.gen.py\n",
+        "keep.gen.py": "", "drop.gen.py": "", "main.py": "",
+        "secrets/key.py": "", "pkg/secrets/ok.py": "", "pkg/logs/x.py": "",
+        "pkg/.gitignore": "!drop.gen.py\nlocal_*.py\nsub/**/deep.py\n",
+        "pkg/drop.gen.py": "", "pkg/local_settings.py": "", "pkg/sub/a/b/deep.py": "", "pkg/sub/shallow.py": "",
+        "docs/.gitignore": "*\n!*.md\n", "docs/readme.md": "", "docs/notes.txt": "",
+    }
+    for name, content in files.items():
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text(content)
+
+    assert source_files(tmp_path) == [
+        "keep.gen.py", "main.py", "docs/readme.md", "pkg/drop.gen.py", "pkg/secrets/ok.py", "pkg/sub/shallow.py",
+    ]
+    assert len(source_files(tmp_path, use_gitignore=False)) == 12
+
+
+def test_git_ls_files_mode_matches_the_walk(tmp_path):
+    repo = tmp_path / "repo"
+    write_tree(repo)
+    (repo / ".gitignore").write_text("big.py\n")
+    (repo / "node_modules").mkdir()
+    (repo / "node_modules" / "dep.js").write_text("ignored")
+    subprocess.run(["git", "init", "-q", str(repo)], check=True)
+    subprocess.run(["git", "-C", str(repo), "add", "app"], check=True)
+    (repo / "app" / "new.py").write_text("untracked = True\n")
+
+    assert source_files(repo, use_git=True) == source_files(repo) == ["app/main.py", "app/new.py", "app/util.js"]
+
+    # Outside a git repository it falls back to walking
+    write_tree(tmp_path / "plain")
+    assert source_files(tmp_path / "plain", use_git=True) == source_files(tmp_path / "plain")
@@ -0,0 +1,84 @@
+import asyncio
+
+from app.core.config import settings
+from app.schemas.architecture import ArchitectureResponse
+from app.services.architecture_store import ArchitectureStore
+from app.services.artifact_cache import ArtifactCache
+from app.services.code_service import (
+    build_code_generation_plan,
+    generate_architecture_code,
+    generate_code_service,
+    generate_component_cached,
+)
+from app.utils.graph import dependency_waves
+from app.utils.mermaid import parse_flowchart
+
+DIAGRAM = """```mermaid
+graph TD
+    UI[Web UI] --> API(API Gateway);
+    API --> Auth(Auth Service) & Orders(Order Service)
+    Orders -->|reads| DB[(Order DB)]
+    Auth -.-> DB
+    classDef db fill:#eee;
+```"""
+
+
+def test_parse_flowchart():
+    graph = parse_flowchart(DIAGRAM)
+    assert graph.direction == "TD"
+    assert graph.nodes["DB"].label == "Order DB"
+    assert graph.nodes["DB"].shape == "[()]"
+    assert ("Orders", "DB", "reads") in [(e.source, e.target, e.label) for e in graph.edges]
+    assert graph.dependencies()["API"] == {"Auth", "Orders"}
+
+
+def test_dependency_waves_breaks_cycles():
+    assert dependency_waves({"a": {"b"}, "b": set(), "c": {"a", "b"}}) == [["b"], ["a"], ["c"]]
+    assert dependency_waves({"a": {"b"}, "b": {"a"}}) == [["a", "b"]]
+
+
+def test_generate_architecture_code_streams_in_dependency_order(tmp_path):
+    store = ArchitectureStore(str(tmp_path / "arch.db"))
+    architecture = ArchitectureResponse(architecture_diagram=DIAGRAM, description="d", recommendations=[])
+
+    async def run():
+        record = await store.save("todo app", "web", [], architecture)
+        plan = build_code_generation_plan(record)
+        return [event async for event in generate_architecture_code(plan, "python", max_concurrency=2)]
+
+    events = asyncio.run(run())
+    assert events[0]["waves"] == [["Order DB"], ["Auth Service", "Order Service"], ["API Gateway"], ["Web UI"]]
+    completed = [e["component"] for e in events if e["event"] == "component_completed"]
+    assert completed.index("Order DB") < completed.index("API Gateway") < completed.index("Web UI")
+    gateway = next(e for e in events if e["event"] == "component_completed" and e["component"] == "API Gateway")
+    assert "# depends on: Auth Service" in gateway["result"]["code"]
+    assert events[-1]["succeeded"] == 5
+
+
+def test_standalone_and_whole_architecture_artifacts_do_not_evict_each_other(tmp_path, monkeypatch):
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=1024 * 1024)
+    calls = []
+
+    async def generate(**kwargs):
+        calls.append(kwargs["upstream_interfaces"])
+        return await generate_code_service(**kwargs)
+
+    async def component(upstream_interfaces=None):
+        return await generate_component_cached(
+            generate, cache, "arch-hash", "arch-1", "API Gateway", "python", upstream_interfaces
+        )
+
+    async def run():
+        interfaces = {"Auth Service": "def login(user): ..."}
+        # Alternate between /generate_code (no interfaces) and a whole-architecture run.
+        outcomes = [await component(), await component(interfaces), await component(), await component(interfaces)]
+        return [cached for _, cached in outcomes]
+
+    assert asyncio.run(run()) == [False, False, True, True]
+    assert len(calls) == 2
+
+    # Artifacts generated by another model are not reused.
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "openai_compatible")
+    monkeypatch.setattr(settings, "LLM_MODEL", "local-coder")
+    assert asyncio.run(component())[1] is False
+    assert len(calls) == 3
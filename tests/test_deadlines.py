@@ -0,0 +1,155 @@
+import asyncio
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import architecture
+from app.core.admission import AdmissionControlMiddleware
+from app.core.config import settings
+from app.core.deadlines import RequestDeadlineMiddleware, UpstreamCostTracker, request_timeout
+from app.core.metrics import metrics
+from app.core.model_routes import model_route
+from app.schemas.architecture import ArchitectureResponse
+from app.services import architecture_service, llm_providers
+from app.services.architecture_service import ArchitectureService
+from app.services.architecture_store import ArchitectureStore, get_architecture_store
+from app.services.llm_providers import OfflineProvider
+
+
+def test_request_timeout_header_is_clamped_and_falls_back_to_default(monkeypatch):
+    from app.core.deadlines import settings
+
+    monkeypatch.setattr(settings, "REQUEST_TIMEOUT_SECONDS", 120)
+    monkeypatch.setattr(settings, "REQUEST_TIMEOUT_MAX_SECONDS", 600)
+    assert request_timeout([(b"x-request-timeout", b"15")]) == 15
+    assert request_timeout([(b"X-Request-Timeout", b"9999")]) == 600
+    assert request_timeout([(b"x-request-timeout", b"soon")]) == 120
+    assert request_timeout([]) == 120
+    assert request_timeout([], default=600) == 600
+
+
+def test_model_calling_routes_are_found_from_their_dependencies():
+    from app.main import app
+
+    def scope(method, path):
+        return {"type": "http", "method": method, "path": path, "root_path": "", "app": app}
+
+    for path in (
+        "/api/v1/generate_architecture",
+        "/api/v1/architecture/abc/refine",
+        "/api/v1/generate_code",
+        "/api/v1/generate_architecture_code",
+        "/api/v1/analyze_repository",
+    ):
+        assert model_route(scope("POST", path)) is not None, path
+        assert AdmissionControlMiddleware(app).applies_to(scope("POST", path))
+    for method, path in (
+        ("GET", "/api/v1/architecture/abc"),
+        ("GET", "/api/v1/architectures/export"),
+        ("POST", "/api/v1/deploy"),
+        ("GET", "/api/v1/metrics"),
+        ("GET", "/api/v1/missing"),
+    ):
+        assert model_route(scope(method, path)) is None, path
+
+    analysis = model_route(scope("POST", "/api/v1/analyze_repository"))
+    assert analysis.default_timeout() == settings.REPOSITORY_ANALYSIS_TIMEOUT_SECONDS
+    assert model_route(scope("POST", "/api/v1/generate_architecture")).default_timeout is None
+
+
+def test_refine_request_past_its_deadline_gets_504(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "offline")
+    monkeypatch.setattr(settings, "LLM_OFFLINE_LATENCY_SECONDS", 5.0)
+    monkeypatch.setattr(settings, "USAGE_ACCOUNTING_ENABLED", False)
+    llm_providers.get_llm_provider.cache_clear()
+    try:
+        service = ArchitectureService()
+    finally:
+        llm_providers.get_llm_provider.cache_clear()
+    store = ArchitectureStore(str(tmp_path / "architectures.db"))
+    record = asyncio.run(store.save(
+        prompt="A chat app",
+        project_type="Web Application",
+        constraints=[],
+        architecture=ArchitectureResponse(
+            architecture_diagram="graph TD\n  A --> B", description="d", recommendations=[]
+        ),
+    ))
+    app = FastAPI()
+    app.add_middleware(RequestDeadlineMiddleware)
+    app.include_router(architecture.router, prefix="/api/v1")
+    app.dependency_overrides[get_architecture_store] = lambda: store
+    app.dependency_overrides[ArchitectureService] = lambda: service
+
+    response = TestClient(app).post(
+        f"/api/v1/architecture/{record.id}/refine",
+        json={"instruction": "Add a cache"},
+        headers={"X-Request-Timeout": "0.1"},
+    )
+    assert response.status_code == 504
+
+
+def test_client_disconnect_cancels_upstream_call_and_records_savings(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "offline")
+    monkeypatch.setattr(settings, "USAGE_ACCOUNTING_ENABLED", False)
+    costs = UpstreamCostTracker()
+    costs.observe(seconds=10.0, tokens=1000)
+    monkeypatch.setattr(architecture_service, "upstream_costs", costs)
+    metrics.reset()
+    seen = {}
+
+    class SlowProvider(OfflineProvider):
+        async def generate(self, messages, **kwargs):
+            seen["timeout"] = kwargs.get("timeout")
+            try:
+                return await super().generate(messages, **kwargs)
+            except asyncio.CancelledError:
+                seen["cancelled"] = True
+                raise
+
+    llm_providers.get_llm_provider.cache_clear()
+    try:
+        service = ArchitectureService()
+    finally:
+        llm_providers.get_llm_provider.cache_clear()
+    service.provider = SlowProvider(latency_seconds=30)
+    app = FastAPI()
+    app.add_middleware(RequestDeadlineMiddleware)
+    app.include_router(architecture.router, prefix="/api/v1")
+    app.dependency_overrides[get_architecture_store] = lambda: ArchitectureStore(str(tmp_path / "architectures.db"))
+    app.dependency_overrides[ArchitectureService] = lambda: service
+
+    scope = {
+        "type": "http", "method": "POST", "path": "/api/v1/generate_architecture",
+        "headers": [(b"content-type", b"application/json"), (b"x-request-timeout", b"20")],
+        "query_string": b"", "http_version": "1.1", "scheme": "http", "server": ("test", 80),
+        "client": ("test", 1234), "root_path": "",
+    }
+    body = json.dumps({"prompt": "A chat app", "project_type": "Web Application"}).encode()
+
+    async def run():
+        disconnect = asyncio.Event()
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            seen.setdefault("sent", []).append(message)
+
+        call = asyncio.create_task(app(scope, receive, send))
+        await asyncio.sleep(0.2)
+        assert "timeout" in seen, "the upstream call should be in flight"
+        disconnect.set()
+        await asyncio.wait_for(call, 1)
+
+    asyncio.run(run())
+    assert 19 < seen["timeout"] <= 20
+    assert seen["cancelled"] and "sent" not in seen
+    assert metrics.counter_value("requests.cancelled", reason="disconnect") == 1
+    assert 9 < metrics.counter_value("upstream.cancelled.saved_seconds", reason="disconnect") <= 10
+    assert metrics.counter_value("upstream.cancelled.saved_tokens", reason="disconnect") > 900
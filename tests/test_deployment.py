@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from app.core.exceptions import DeploymentNotFoundError
+from app.schemas.architecture import ArchitectureResponse
+from app.schemas.deploy import DeploymentTarget
+from app.services.architecture_store import ArchitectureStore
+from app.services.deploy_targets import LocalDeploymentBackend
+from app.services.deployment_engine import DeploymentEngine
+
+DIAGRAM = "graph TD\nWeb[Web App] --> API{API Gateway}\nAPI --> Orders(Orders)\nAPI --> Users(Users)\nOrders --> DB[(Main DB)]"
+
+
+def test_local_deployment_fails_and_resumes(tmp_path):
+    store = ArchitectureStore(str(tmp_path / "arch.db"))
+    engine = DeploymentEngine(store, backend_factory=lambda target: LocalDeploymentBackend(str(tmp_path / "cloud")))
+    architecture = ArchitectureResponse(architecture_diagram=DIAGRAM, description="d", recommendations=[])
+
+    async def run():
+        record = await store.save("shop", "web", [], architecture)
+        deployment = await engine.start(record.id, DeploymentTarget.LOCAL, {"fail_resources": ["Orders"]})
+        deployment = await engine.wait(deployment.id)
+        assert deployment.status == "failed"
+        assert deployment.stages["package"].status == "succeeded"
+        assert deployment.stages["provision"].status == "failed"
+        # Independent resources in the failing wave still complete.
+        assert deployment.resource_status == {
+            "DB": "provisioned", "Orders": "failed", "Users": "provisioned", "API": "packaged", "Web": "packaged",
+        }
+
+        await engine.resume(deployment.id, {"fail_resources": []})
+        return await engine.wait(deployment.id)
+
+    deployment = asyncio.run(run())
+    assert deployment.status == "succeeded"
+    assert set(deployment.resource_status.values()) == {"provisioned"}
+    assert all(stage.duration_ms is not None for stage in deployment.stages.values())
+    assert deployment.deployment_url.startswith("file://")
+    assert (tmp_path / "cloud" / deployment.id / "resources" / "Web.json").exists()
+
+
+def test_finished_deployments_are_evicted_but_failed_ones_stay_resumable(tmp_path):
+    store = ArchitectureStore(str(tmp_path / "arch.db"))
+    engine = DeploymentEngine(
+        store,
+        backend_factory=lambda target: LocalDeploymentBackend(str(tmp_path / "cloud")),
+        retention_seconds=60,
+        resume_window_seconds=600,
+        max_retained=1,
+    )
+    architecture = ArchitectureResponse(architecture_diagram=DIAGRAM, description="d", recommendations=[])
+
+    async def deploy(record_id, configuration=None):
+        deployment = await engine.start(record_id, DeploymentTarget.LOCAL, configuration or {})
+        return await engine.wait(deployment.id)
+
+    async def run():
+        record = await store.save("shop", "web", [], architecture)
+        failed = await deploy(record.id, {"fail_resources": ["Orders"]})
+        first = await deploy(record.id)
+        second = await deploy(record.id)
+        return record, failed, first, second
+
+    record, failed, first, second = asyncio.run(run())
+    assert engine._tasks == {}
+    # Over the cap: the older success goes, the failure stays resumable.
+    with pytest.raises(DeploymentNotFoundError):
+        engine.get(first.id)
+    assert engine.get(second.id) is second and engine.get(failed.id) is failed
+
+    second.finished_at -= 61
+    asyncio.run(deploy(record.id))
+    with pytest.raises(DeploymentNotFoundError):
+        engine.get(second.id)
+    assert engine.get(failed.id) is failed
+
+    failed.finished_at -= 601
+    asyncio.run(deploy(record.id))
+    with pytest.raises(DeploymentNotFoundError):
+        engine.get(failed.id)
@@ -0,0 +1,57 @@
+import asyncio
+import xml.etree.ElementTree as ET
+
+from app.services.diagram_service import DiagramRenderer
+from app.utils.mermaid import parse_flowchart
+from app.utils.svg import render_svg
+
+DIAGRAM = """graph TD
+    U((User)) --> FE[Web Frontend]
+    FE -->|REST| API{{API Gateway}}
+    API --> Auth(Auth Service) & Orders[Order Service]
+    Orders --> DB[(Postgres)]
+    Auth --> DB
+    Orders -.-> Q>Queue] --> Orders
+"""
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def test_render_produces_valid_svg_with_layered_layout():
+    svg = render_svg(parse_flowchart(DIAGRAM))
+    root = ET.fromstring(svg)
+    groups = {g.get("id"): g for g in root.iter(f"{SVG}g")}
+    assert set(groups) == {f"node-{n}" for n in ("U", "FE", "API", "Auth", "Orders", "DB", "Q")}
+    assert groups["node-U"].find(f"{SVG}circle") is not None
+    assert groups["node-DB"].find(f"{SVG}path") is not None
+    assert len(root.findall(f"{SVG}path")) == 8  # one per edge
+
+    def centre_y(node_id):
+        text = groups[f"node-{node_id}"].find(f"{SVG}text/{SVG}tspan")
+        return float(text.get("y"))
+
+    assert centre_y("U") < centre_y("FE") < centre_y("API") < centre_y("Orders") < centre_y("DB")
+    assert "REST" in svg
+
+
+def test_left_to_right_layout_and_escaping():
+    svg = render_svg(parse_flowchart('flowchart LR\n  A["a < b & c"] --> B[Next]'))
+    root = ET.fromstring(svg)
+    xs = [float(t.get("x")) for t in root.iter(f"{SVG}tspan")]
+    assert xs[0] < xs[1]
+    assert "a &lt; b &amp; c" in svg
+
+
+def test_renderer_caches_by_diagram_hash():
+    renderer = DiagramRenderer(max_entries=2)
+
+    async def run():
+        first = await renderer.render(DIAGRAM)
+        second = await renderer.render(DIAGRAM)
+        other = await renderer.render("graph TD\n  A --> B")
+        return first, second, other
+
+    first, second, other = asyncio.run(run())
+    assert first is not None and first == second
+    assert other[1] != first[1]
+    assert len(renderer._memory) == 2
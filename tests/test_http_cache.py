@@ -0,0 +1,69 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import architecture
+from app.core.http_cache import CompressionMiddleware, choose_encoding, etag_matches
+from app.schemas.architecture import ArchitectureResponse
+from app.services.architecture_store import ArchitectureStore, get_architecture_store
+
+
+def test_choose_encoding_honours_quality_values():
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0, identity") is None
+    assert choose_encoding("*") in ("br", "gzip")
+    assert choose_encoding("") is None
+
+
+def test_large_responses_are_gzipped_and_small_ones_are_not():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/large")
+    async def large():
+        return {"description": "layered architecture " * 100}
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    client = TestClient(app)
+    response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json()["description"].startswith("layered")
+
+    assert "content-encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/large", headers={"Accept-Encoding": "identity"}).headers
+
+
+def test_get_architecture_answers_304_for_matching_etag(tmp_path):
+    store = ArchitectureStore(str(tmp_path / "architectures.db"))
+    record = asyncio.run(store.save(
+        prompt="p",
+        project_type="web",
+        constraints=[],
+        architecture=ArchitectureResponse(
+            architecture_diagram="graph TD\n  A --> B", description="d" * 2000, recommendations=[]
+        ),
+    ))
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    app.include_router(architecture.router, prefix="/api/v1")
+    app.dependency_overrides[get_architecture_store] = lambda: store
+    client = TestClient(app)
+    url = f"/api/v1/architecture/{record.id}"
+
+    first = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200
+    assert first.headers["etag"] == f'"{record.content_hash}-gzip"'
+
+    revalidated = client.get(url, headers={"If-None-Match": first.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == f'"{record.content_hash}"'
+
+    assert etag_matches('W/"other", "abc"', '"abc"')
+    assert client.get(url, headers={"If-None-Match": '"stale"'}).status_code == 200
@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.schemas.architecture import ArchitecturePatch, ArchitectureResponse
+from app.services import llm_providers
+from app.services.architecture_service import ArchitectureService
+from app.services.llm_providers import OfflineProvider, recording_key
+
+
+def generation_messages(prompt: str) -> list[dict]:
+    service = ArchitectureService.__new__(ArchitectureService)
+    return service._build_openai_prompt(prompt, "Web Application", ["Low cost"])
+
+
+def test_offline_provider_is_deterministic_and_schema_valid():
+    provider = OfflineProvider()
+    messages = generation_messages("A booking site for yoga classes")
+
+    first = asyncio.run(provider.generate(messages, max_tokens=100, temperature=0.7))
+    second = asyncio.run(provider.generate(messages, max_tokens=100, temperature=0.7))
+    assert first.content == second.content
+    architecture = ArchitectureResponse.model_validate_json(first.content)
+    assert architecture.architecture_diagram.startswith("graph TD")
+    assert "Web Application" in architecture.description
+    assert first.usage.prompt_tokens == provider.count_tokens(messages)
+
+    other = asyncio.run(provider.generate(generation_messages("A chat app"), max_tokens=100, temperature=0.7))
+    assert other.content != first.content
+
+    async def collect():
+        return "".join([chunk async for chunk in provider.stream(messages, max_tokens=100, temperature=0.7)])
+
+    assert asyncio.run(collect()) == first.content
+
+
+def test_offline_provider_replays_recordings_and_synthesizes_patches(tmp_path):
+    messages = generation_messages("A booking site for yoga classes")
+    recordings = tmp_path / "recordings.jsonl"
+    recordings.write_text(json.dumps({"key": recording_key(messages), "content": '{"recorded": true}'}) + "\n")
+    provider = OfflineProvider(str(recordings))
+
+    assert provider.respond(messages) == '{"recorded": true}'
+    refine = [{"role": "system", "content": "Reply with keys: 'diagram_edits' (list)"}, {"role": "user", "content": "x"}]
+    assert ArchitecturePatch.model_validate_json(provider.respond(refine)).recommendations_add
+
+
+def test_offline_provider_latency_respects_timeout():
+    provider = OfflineProvider(latency_seconds=5.0)
+    with pytest.raises(TimeoutError):
+        asyncio.run(provider.generate(generation_messages("x"), max_tokens=100, temperature=0.7, timeout=0.01))
+
+
+def test_architecture_service_runs_on_the_offline_provider(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "offline")
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_TTL_SECONDS", 0)
+    monkeypatch.setattr(settings, "USAGE_ACCOUNTING_ENABLED", False)
+    llm_providers.get_llm_provider.cache_clear()
+    try:
+        service = ArchitectureService()
+        result = asyncio.run(service.generate("A booking site for yoga classes", "Web Application", ["Low cost"]))
+        assert service.provider.model == "offline"
+        assert result.recommendations
+    finally:
+        llm_providers.get_llm_provider.cache_clear()
+
+
+def test_static_prefix_layout_keeps_variables_in_the_last_message(monkeypatch):
+    monkeypatch.setattr(settings, "PROMPT_LAYOUT", "static_prefix")
+    first = generation_messages("A booking site for yoga classes")
+    service = ArchitectureService.__new__(ArchitectureService)
+    second = service._build_openai_prompt("A chat app", "Mobile Application", [])
+
+    assert first[:-1] == second[:-1]
+    assert "yoga" not in json.dumps(first[:-1])
+    assert first[-1]["content"].startswith("Project type: Web Application\nConstraints: Low cost")
+    assert OfflineProvider().count_tokens(first[:-1]) >= 1024
+    architecture = ArchitectureResponse.model_validate_json(OfflineProvider().respond(first))
+    assert "Web Application" in architecture.description
+
+
+def test_cached_prompt_tokens_reads_provider_usage_details():
+    from types import SimpleNamespace
+
+    usage = SimpleNamespace(prompt_tokens=1500, prompt_tokens_details=SimpleNamespace(cached_tokens=1280))
+    assert llm_providers.cached_prompt_tokens(usage) == 1280
+    assert llm_providers.cached_prompt_tokens(SimpleNamespace(prompt_tokens=10)) == 0
+    assert llm_providers.cached_prompt_tokens(None) == 0
@@ -0,0 +1,58 @@
+import asyncio
+
+from app.core.exceptions import ServiceError
+from app.core.shared_state import MemoryStateBackend
+from app.schemas.architecture import ArchitectureResponse
+from app.services.presets import CONSTRAINT_PRESETS, PROJECT_TYPES, PresetLibrary, all_presets, warm_presets
+
+
+class FakeService:
+    def __init__(self, fail_for: str | None = None):
+        self.calls = 0
+        self.fail_for = fail_for
+
+    async def generate(self, prompt, project_type, constraints, use_presets=True):
+        assert use_presets is False
+        self.calls += 1
+        if project_type == self.fail_for:
+            raise ServiceError("upstream down")
+        return ArchitectureResponse(
+            architecture_diagram=f"graph TD\n  A[{project_type}] --> B[DB]",
+            description=f"Baseline for {project_type} with {constraints}.",
+            recommendations=[],
+        )
+
+
+def test_warm_up_generates_once_and_shares_through_state():
+    state = MemoryStateBackend()
+    service = FakeService(fail_for="desktop")
+    library = PresetLibrary(serve_threshold=0.9, seed_threshold=0.2)
+
+    counts = asyncio.run(warm_presets(library, service, state))
+    per_type = len(CONSTRAINT_PRESETS)
+    assert counts == {"loaded": 0, "generated": len(all_presets()) - per_type, "failed": per_type}
+    assert library.size == (len(PROJECT_TYPES) - 1) * per_type
+
+    # A second worker loads the stored presets and only retries the failed ones.
+    other = PresetLibrary(serve_threshold=0.9, seed_threshold=0.2)
+    service = FakeService()
+    counts = asyncio.run(warm_presets(other, service, state))
+    assert counts["loaded"] == len(all_presets()) - per_type
+    assert service.calls == per_type
+    assert other.size == len(all_presets())
+
+
+def test_match_serves_seeds_or_misses():
+    state = MemoryStateBackend()
+    library = PresetLibrary(serve_threshold=0.9, seed_threshold=0.2)
+    asyncio.run(warm_presets(library, FakeService(), state))
+    preset = next(p for p in all_presets() if p.project_type == "web" and p.name == "low_cost")
+
+    served = library.match(preset.prompt, "web", ["low cost "])
+    assert served.serve and "web" in served.architecture.architecture_diagram
+
+    seeded = library.match("A typical web application for booking yoga classes.", "web", ["Low cost"])
+    assert seeded is not None and not seeded.serve
+
+    assert library.match(preset.prompt, "web", ["Low cost", "GDPR"]) is None
+    assert library.match("Quantum chemistry simulation toolkit", "web", []) is None
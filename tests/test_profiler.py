@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import admin
+from app.core.config import settings
+from app.core.profiler import profile_worker
+
+
+def busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_profile_reports_stacks_lag_and_slow_callbacks():
+    async def run():
+        loop = asyncio.get_running_loop()
+        capture = asyncio.create_task(profile_worker(0.4, interval=0.002, slow_callback_ms=50))
+        await asyncio.sleep(0.05)
+        loop.call_soon(busy_wait, 0.15)
+        profiler, report = await capture
+        return loop.get_debug(), profiler, report
+
+    debug, profiler, report = asyncio.run(run())
+    assert debug is False
+    assert report["samples"] > 10
+    assert report["lag"]["max_ms"] >= 100
+    assert any("busy_wait" in warning for warning in report["slow_callbacks"])
+
+    collapsed = profiler.collapsed()
+    assert "test_profiler:busy_wait" in collapsed
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.splitlines())
+
+    document = profiler.speedscope()
+    frames = document["shared"]["frames"]
+    assert any(frame["name"] == "test_profiler:busy_wait" for frame in frames)
+    for profile in document["profiles"]:
+        assert len(profile["samples"]) == len(profile["weights"])
+        assert all(0 <= index < len(frames) for sample in profile["samples"] for index in sample)
+
+
+def test_profile_endpoint_is_admin_only_and_disabled_by_default(monkeypatch):
+    app = FastAPI()
+    app.include_router(admin.router, prefix="/api/v1")
+    client = TestClient(app)
+
+    assert client.get("/api/v1/admin/profile").status_code == 404
+
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    assert client.get("/api/v1/admin/profile", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.get("/api/v1/admin/profile", headers={"X-Admin-Token": "secret"}).status_code == 404
+
+    monkeypatch.setattr(settings, "PROFILER_ENABLED", True)
+    headers = {"X-Admin-Token": "secret"}
+    assert client.get("/api/v1/admin/profile?seconds=600", headers=headers).status_code == 422
+
+    response = client.get("/api/v1/admin/profile?seconds=0.1&format=speedscope", headers=headers)
+    assert response.status_code == 200
+    assert "X-Event-Loop-Lag-Max-Ms" in response.headers
+    assert response.json()["$schema"].startswith("https://www.speedscope.app")
+
+    response = client.get("/api/v1/admin/profile?seconds=0.1", headers=headers)
+    assert response.status_code == 200
+    assert set(response.json()) == {"event_loop", "collapsed"}
@@ -0,0 +1,122 @@
+import asyncio
+import sqlite3
+
+from app.schemas.architecture import ArchitecturePatch, ArchitectureResponse
+from app.services.architecture_store import MIGRATIONS, ArchitectureStore
+from app.services.refinement import apply_patch, compact_state, diff_architectures, merge_constraints
+from app.utils.sqlite import apply_migrations
+
+ARCHITECTURE = ArchitectureResponse(
+    architecture_diagram="graph TD\n  FE[Frontend] --> API[API]\n  API --> DB[(Postgres)]\n  API --> Mail[Mailer]",
+    description="A three-tier web app. The API is stateless. Mail is sent synchronously.",
+    recommendations=["Use a CDN.", "Send mail synchronously.", "Add monitoring."],
+)
+
+
+def test_patch_is_applied_and_diffed_structurally():
+    patch = ArchitecturePatch.model_validate({
+        "diagram_edits": [
+            {"op": "add_node", "id": "Cache", "label": "Redis", "shape": "[()]"},
+            {"op": "add_edge", "source": "API", "target": "Cache"},
+            {"op": "remove_node", "id": "Mail"},
+            {"op": "add_edge", "source": "API", "target": "Queue", "label": "jobs"},
+            {"op": "relabel_node", "id": "FE", "label": "React SPA"},
+            {"op": "relabel_node", "id": "Ghost", "label": "ignored"},
+        ],
+        "description_edits": [
+            {"op": "replace", "sentence": 3, "text": "Mail is sent from a background queue."},
+            {"op": "insert", "sentence": 2, "text": "Hot reads are served from Redis."},
+            {"op": "delete", "sentence": 99},
+        ],
+        "recommendations_add": ["Size the cache for the working set."],
+        "recommendations_remove": [2],
+    })
+    refined = apply_patch(ARCHITECTURE, patch)
+
+    assert refined.description == (
+        "A three-tier web app. The API is stateless. Hot reads are served from Redis. "
+        "Mail is sent from a background queue."
+    )
+    assert refined.recommendations == ["Use a CDN.", "Add monitoring.", "Size the cache for the working set."]
+
+    diff = diff_architectures(ARCHITECTURE, refined)
+    assert diff.added_nodes == ["Cache", "Queue"]
+    assert diff.removed_nodes == ["Mail"]
+    assert diff.relabeled_nodes == ["FE"]
+    assert diff.added_edges == ["API -> Cache", "API -> Queue"]
+    assert diff.removed_edges == ["API -> Mail"]
+    assert diff.description_changed
+    assert diff.recommendations_removed == ["Send mail synchronously."]
+
+
+def test_compact_state_numbers_sentences_and_recommendations():
+    state = compact_state(ARCHITECTURE)
+    assert "DB[(Postgres)]" in state
+    assert "[2] The API is stateless." in state
+    assert "[3] Add monitoring." in state
+
+
+def test_merge_constraints():
+    assert merge_constraints(["Low cost", "GDPR"], add=["gdpr", "High availability"], remove=["low cost"]) == [
+        "GDPR", "High availability"
+    ]
+
+
+def test_store_migrates_legacy_database_and_tracks_versions(tmp_path):
+    db_path = str(tmp_path / "architectures.db")
+    legacy = sqlite3.connect(db_path)
+    legacy.executescript(
+        "CREATE TABLE architectures (id TEXT PRIMARY KEY, prompt TEXT NOT NULL, project_type TEXT NOT NULL, "
+        "constraints TEXT NOT NULL, payload TEXT NOT NULL, content_hash TEXT NOT NULL, created_at TEXT NOT NULL);"
+        "INSERT INTO architectures VALUES ('old', 'p', 'web', '[]', "
+        "'{\"architecture_diagram\": \"graph TD\", \"description\": \"d\", \"recommendations\": []}', 'h', "
+        "'2025-01-01T00:00:00+00:00');"
+    )
+    legacy.close()
+
+    store = ArchitectureStore(db_path)
+
+    async def run():
+        old = await store.get("old")
+        child = await store.save("p", "web", ["GDPR"], ARCHITECTURE, parent_id=old.id, version=old.version + 1)
+        return old, await store.get(child.id)
+
+    old, child = asyncio.run(run())
+    assert (old.parent_id, old.version) == (None, 1)
+    assert (child.parent_id, child.version) == ("old", 2)
+    assert ArchitectureStore(db_path)._conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+
+
+class StaleVersionConnection:
+    """A connection whose first user_version read predates another worker's migration."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._stale = True
+
+    def execute(self, query, *args):
+        if query == "PRAGMA user_version" and self._stale:
+            self._stale = False
+            return self._conn.execute("SELECT 0")
+        return self._conn.execute(query, *args)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+
+def test_migration_race_between_workers_applies_each_step_once(tmp_path):
+    db_path = str(tmp_path / "architectures.db")
+    legacy = sqlite3.connect(db_path)
+    legacy.executescript(
+        "CREATE TABLE architectures (id TEXT PRIMARY KEY, prompt TEXT NOT NULL, project_type TEXT NOT NULL, "
+        "constraints TEXT NOT NULL, payload TEXT NOT NULL, content_hash TEXT NOT NULL, created_at TEXT NOT NULL);"
+    )
+    legacy.close()
+
+    ArchitectureStore(db_path)  # the worker that wins the race
+    loser = sqlite3.connect(db_path)
+    apply_migrations(StaleVersionConnection(loser), MIGRATIONS, "architecture store")
+    assert loser.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
@@ -0,0 +1,107 @@
+import asyncio
+import io
+import zipfile
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import code_dump
+from app.api.v1.endpoints import repository
+from app.core.config import settings
+from app.core.exceptions import RepositoryTooLargeError
+from app.services import llm_providers
+from app.services.architecture_service import ArchitectureService
+from app.services.architecture_store import ArchitectureStore, get_architecture_store
+from app.services.artifact_cache import ArtifactCache, get_artifact_cache
+from app.services.repository_service import RepositoryAnalyzer, extract_archive
+
+
+@pytest.fixture
+def offline_service(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "offline")
+    monkeypatch.setattr(settings, "USAGE_ACCOUNTING_ENABLED", False)
+    llm_providers.get_llm_provider.cache_clear()
+    yield ArchitectureService()
+    llm_providers.get_llm_provider.cache_clear()
+
+
+def write_repo(root, files: int = 12):
+    for i in range(files):
+        module = root / "pkg" / f"module_{i}.py"
+        module.parent.mkdir(parents=True, exist_ok=True)
+        module.write_text(f"def handler_{i}(request):\n    return {{'id': {i}}}\n" * 20)
+    (root / "node_modules" / "dep.js").parent.mkdir(parents=True)
+    (root / "node_modules" / "dep.js").write_text("ignored")
+
+
+def test_iter_chunks_is_token_bounded_and_splits_large_files(tmp_path):
+    write_repo(tmp_path, files=3)
+    (tmp_path / "big.py").write_text("x = 1\n" * 2000)
+    stats = code_dump.new_stats()
+    chunks = list(code_dump.iter_chunks(
+        str(tmp_path), max_tokens=500, stats=stats, relative_paths=True, split_large_files=True
+    ))
+    assert all(chunk.tokens <= 500 for chunk in chunks)
+    assert [chunk.index for chunk in chunks] == list(range(len(chunks)))
+    assert "FILE: big.py (part 2)" in "".join(chunk.content for chunk in chunks)
+    assert stats["included_files"] == 4
+    assert not any("node_modules" in f for chunk in chunks for f in chunk.files)
+
+
+def test_map_reduce_caches_chunk_summaries(tmp_path, offline_service):
+    write_repo(tmp_path / "repo")
+    cache = ArtifactCache(str(tmp_path / "cache"), max_bytes=10 * 1024 * 1024)
+    analyzer = RepositoryAnalyzer(offline_service, cache, concurrency=3, chunk_tokens=300, reduce_tokens=150)
+
+    first = asyncio.run(analyzer.analyze(str(tmp_path / "repo"), "Web Application", []))
+    assert first.chunks > 3 and first.cached_chunks == 0
+    assert first.reduce_rounds >= 1
+    assert first.architecture.architecture_diagram.startswith("graph TD")
+
+    (tmp_path / "repo" / "pkg" / "module_0.py").write_text("def changed():\n    pass\n")
+    second = asyncio.run(analyzer.analyze(str(tmp_path / "repo"), "Web Application", []))
+    assert second.cached_chunks == second.chunks - 1
+
+    with pytest.raises(RepositoryTooLargeError):
+        asyncio.run(RepositoryAnalyzer(offline_service, None, chunk_tokens=300, max_chunks=2).analyze(
+            str(tmp_path / "repo"), "Web Application", []
+        ))
+
+
+def test_extract_archive_skips_escaping_members_and_enforces_size(tmp_path):
+    archive = tmp_path / "repo.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("app/main.py", "print('hi')\n")
+        zf.writestr("../evil.py", "boom")
+    extract_archive(str(archive), str(tmp_path / "out"), max_bytes=1024)
+    assert (tmp_path / "out" / "app" / "main.py").exists()
+    assert not (tmp_path / "evil.py").exists()
+
+    with pytest.raises(RepositoryTooLargeError):
+        extract_archive(str(archive), str(tmp_path / "small"), max_bytes=5)
+
+
+def test_analyze_repository_endpoint_accepts_uploads(tmp_path, offline_service):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        zf.writestr("service/api.py", "def get_orders():\n    return []\n")
+    store = ArchitectureStore(str(tmp_path / "architectures.db"))
+    app = FastAPI()
+    app.include_router(repository.router, prefix="/api/v1")
+    app.dependency_overrides[get_architecture_store] = lambda: store
+    app.dependency_overrides[get_artifact_cache] = lambda: None
+    app.dependency_overrides[ArchitectureService] = lambda: offline_service
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/v1/analyze_repository",
+        files={"file": ("repo.zip", buffer.getvalue(), "application/zip")},
+        data={"project_type": "Backend Service"},
+    )
+    assert response.status_code == 201
+    architecture_id = response.json()["architecture_id"]
+    assert asyncio.run(store.get(architecture_id)).project_type == "Backend Service"
+
+    assert client.post("/api/v1/analyze_repository", data={"path": str(tmp_path)}).status_code == 400
+    assert client.post("/api/v1/analyze_repository").status_code == 400
@@ -0,0 +1,58 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import metrics as metrics_endpoint
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.schemas.architecture import ArchitectureResponse
+from app.services.semantic_cache import CacheEntry, HashedNgramEmbedder, SemanticCache, SemanticIndex
+
+ARCHITECTURE = ArchitectureResponse(
+    architecture_diagram="graph TD\n  A[Client] --> B[API]",
+    description="A simple two-tier web app.",
+    recommendations=["Use a CDN."],
+)
+
+
+def test_near_duplicate_prompt_is_served_from_cache():
+    metrics.reset()
+    cache = SemanticCache(threshold=0.8, dim=1024, capacity=8, sample_rate=1.0)
+    cache.add("Build a todo list web app with user login", "web", ["Low cost"], ARCHITECTURE)
+    cache.add("Design a realtime chat service with message history", "web", ["Low cost"], ARCHITECTURE)
+
+    hit = cache.lookup("build a to-do list web app with user login!", "web", ["low cost"])
+    assert hit == ARCHITECTURE
+    assert cache.samples[0]["matched_prompt"] == "Build a todo list web app with user login"
+
+    # Different project type, different constraints or an unrelated prompt are misses.
+    assert cache.lookup("Build a todo list web app with user login", "mobile", ["Low cost"]) is None
+    assert cache.lookup("Build a todo list web app with user login", "web", ["HIPAA"]) is None
+    assert cache.lookup("Train a recommendation model on clickstream data", "web", ["Low cost"]) is None
+    assert metrics.counter_value("architecture.semantic_cache", outcome="hit") == 1
+    assert metrics.counter_value("architecture.semantic_cache", outcome="miss") == 3
+
+
+def test_index_overwrites_oldest_entry_when_full():
+    embedder = HashedNgramEmbedder(256)
+    index = SemanticIndex(dim=256, capacity=2)
+    for prompt in ("first prompt", "second prompt", "third prompt"):
+        index.add(embedder.embed(prompt), CacheEntry(prompt, "", "{}", 0.0))
+
+    assert index.size == 2
+    assert sorted(entry.prompt for entry in index.entries) == ["second prompt", "third prompt"]
+    entry, similarity = index.nearest(embedder.embed("third prompt"), "")
+    assert entry.prompt == "third prompt" and similarity > 0.99
+
+
+def test_semantic_cache_samples_are_admin_only(monkeypatch):
+    app = FastAPI()
+    app.include_router(metrics_endpoint.router, prefix="/api/v1")
+    client = TestClient(app)
+    url = "/api/v1/metrics/semantic_cache/samples"
+
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "")
+    assert client.get(url).status_code == 404
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    assert client.get(url, headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert client.get(url, headers={"X-Admin-Token": "secret"}).status_code == 200
+    assert client.get("/api/v1/metrics").status_code == 200
@@ -0,0 +1,30 @@
+import asyncio
+
+from app.core.shared_state import MemoryStateBackend, SQLiteStateBackend
+
+
+def test_sqlite_token_bucket_is_shared_between_workers(tmp_path):
+    # Two backends on one file stand in for two worker processes.
+    worker_a = SQLiteStateBackend(str(tmp_path / "state.db"))
+    worker_b = SQLiteStateBackend(str(tmp_path / "state.db"))
+
+    async def run():
+        waits = [await worker.take_token("rate:client", rate=1 / 60, capacity=3)
+                 for worker in (worker_a, worker_b, worker_a, worker_b)]
+        await worker_a.set("architecture:key", b"cached", ttl_seconds=60)
+        return waits, await worker_b.get("architecture:key")
+
+    waits, cached = asyncio.run(run())
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert 55 < waits[3] <= 60
+    assert cached == b"cached"
+
+
+def test_memory_cache_expires():
+    backend = MemoryStateBackend()
+
+    async def run():
+        await backend.set("key", b"value", ttl_seconds=-1)
+        return await backend.get("key")
+
+    assert asyncio.run(run()) is None
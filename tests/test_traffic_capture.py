@@ -0,0 +1,134 @@
+import asyncio
+import json
+import threading
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core import traffic_capture
+from app.core.metrics import metrics
+from app.core.traffic_capture import (
+    REDACTED,
+    TrafficCaptureMiddleware,
+    TrafficRecorder,
+    compare,
+    load_requests,
+    replay,
+    summarize,
+)
+from app.services.llm_providers import OfflineProvider, RecordingProvider, recording_key
+
+
+def make_app(provider) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/api/v1/generate")
+    async def generate(request: Request):
+        body = await request.json()
+        messages = [{"role": "user", "content": body["prompt"]}]
+        completion = await provider.generate(messages, max_tokens=100, temperature=0.0)
+        return json.loads(completion.content)
+
+    return app
+
+
+def read_log(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_capture_records_sanitized_requests_and_upstream_responses(tmp_path):
+    log = tmp_path / "traffic.ndjson"
+    recorder = TrafficRecorder(str(log))
+    app = make_app(RecordingProvider(OfflineProvider(latency_seconds=0.05), recorder))
+    app.add_middleware(TrafficCaptureMiddleware, recorder=recorder)
+    client = TestClient(app)
+
+    response = client.post(
+        "/api/v1/generate?access_token=sk-secret&verbose=1",
+        json={"prompt": "A chat app", "options": {"api_key": "sk-secret"}},
+        headers={"Authorization": "Bearer sk-secret", "X-Request-Timeout": "30"},
+    )
+    client.get("/")  # not under /api/v1, not captured
+    recorder.close()
+
+    assert response.status_code == 200
+    assert "sk-secret" not in log.read_text()
+    upstream, request = read_log(log)
+    assert request["type"] == "request"
+    assert request["body"] == {"prompt": "A chat app", "options": {"api_key": REDACTED}}
+    assert request["query"] == "access_token=%5BREDACTED%5D&verbose=1"
+    assert "authorization" not in request["headers"]
+    assert request["headers"]["x-request-timeout"] == "30"
+    assert request["status"] == 200 and request["latency_ms"] >= 50
+    assert upstream["request_id"] == request["id"]
+    assert upstream["key"] == recording_key([{"role": "user", "content": "A chat app"}])
+    assert json.loads(upstream["content"]) == response.json()
+
+    # The capture log doubles as offline recordings, latency included.
+    replayed = OfflineProvider(recordings_path=str(log))
+    assert replayed.respond([{"role": "user", "content": "A chat app"}]) == upstream["content"]
+    assert replayed.recorded_latency[upstream["key"]] >= 0.05
+
+
+def test_replay_keeps_timing_and_compares_latency(tmp_path):
+    log = tmp_path / "traffic.ndjson"
+    recorder = TrafficRecorder(str(log))
+    for i, ts in enumerate((100.0, 100.2, 100.4)):
+        recorder.write({
+            "type": "request", "id": str(i), "ts": ts, "method": "POST", "path": "/api/v1/generate",
+            "query": "", "headers": {"content-type": "application/json"}, "body": {"prompt": f"app {i}"},
+            "status": 200, "latency_ms": 10.0,
+        })
+    recorder.write({"type": "request", "id": "upload", "ts": 100.5, "method": "POST",
+                    "path": "/api/v1/analyze_repository", "body": None, "body_omitted": 1000})
+    recorder.close()
+    requests = load_requests(str(log))
+    assert [r["id"] for r in requests] == ["0", "1", "2"]
+
+    async def run(speed):
+        transport = httpx.ASGITransport(app=make_app(OfflineProvider()))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.perf_counter()
+            results = await replay(client, requests, speed=speed)
+            return results, time.perf_counter() - start
+
+    results, elapsed = asyncio.run(run(speed=2.0))
+    assert [r["status"] for r in results] == [200, 200, 200]
+    assert 0.2 <= elapsed < 0.4
+
+    replayed = summarize(results)
+    assert replayed["paths"]["/api/v1/generate"]["count"] == 3
+    assert replayed["overall"]["errors"] == 0
+    rows = compare(summarize(results, field="recorded_latency_ms"), replayed)
+    assert [row["path"] for row in rows] == ["overall", "/api/v1/generate"]
+    assert rows[0]["p50_ms_change"] is not None
+
+
+def test_recorder_writes_in_the_background_and_drops_when_backed_up(tmp_path, monkeypatch):
+    metrics.reset()
+    entered, release = threading.Event(), threading.Event()
+    makedirs = traffic_capture.os.makedirs
+
+    def slow_makedirs(*args, **kwargs):
+        entered.set()
+        release.wait(5)
+        return makedirs(*args, **kwargs)
+
+    monkeypatch.setattr(traffic_capture.os, "makedirs", slow_makedirs)
+    log = tmp_path / "capture" / "traffic.ndjson"
+    recorder = TrafficRecorder(str(log), max_pending=1)
+
+    recorder.write({"type": "request", "id": "1"})
+    assert entered.wait(5)
+    # The writer is stuck on the disk; writes still return at once, dropping the overflow.
+    started = time.perf_counter()
+    recorder.write({"type": "request", "id": "2"})
+    recorder.write({"type": "request", "id": "3"})
+    assert time.perf_counter() - started < 0.5
+    assert metrics.counter_value("traffic_capture.dropped", type="request") == 1
+
+    release.set()
+    recorder.close()
+    assert [record["id"] for record in read_log(log)] == ["1", "2"]
@@ -0,0 +1,140 @@
+import asyncio
+import sqlite3
+import threading
+
+from app.services.usage_store import MIGRATIONS, SCHEMA, UsageEvent, UsageStore
+
+HOUR = 3600
+DAY_START = 1_700_006_400  # a UTC midnight
+
+
+def event(ts, project_type="web", cache_outcome="miss", prompt_tokens=100, completion_tokens=50):
+    return UsageEvent(
+        endpoint="generate_architecture",
+        project_type=project_type,
+        model="test-model",
+        cache_outcome=cache_outcome,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        latency_ms=200.0,
+        ts=ts,
+    )
+
+
+def test_aggregates_match_before_and_after_rollup(tmp_path):
+    store = UsageStore(str(tmp_path / "usage.db"))
+
+    async def run():
+        for e in (
+            event(DAY_START + 10),
+            event(DAY_START + 20, cache_outcome="exact_hit", prompt_tokens=0, completion_tokens=0),
+            event(DAY_START + HOUR + 5, project_type="mobile"),
+            event(DAY_START + 2 * HOUR + 5),
+        ):
+            await store.record(e)
+        query = lambda **kw: store.query(start=DAY_START, end=DAY_START + 3 * HOUR, **kw)
+        before = (await query(bucket="hour"), await query(bucket="day", group_by="project_type"))
+        rolled = await store.rollup(now=DAY_START + 2 * HOUR + 30)
+        after = (await query(bucket="hour"), await query(bucket="day", group_by="project_type"))
+        filtered = await query(bucket="day", filters={"project_type": "mobile"})
+        return before, rolled, after, filtered
+
+    before, rolled, after, filtered = asyncio.run(run())
+    assert rolled == 3  # (hour 0, miss), (hour 0, exact_hit), (hour 1, mobile)
+    assert before == after
+    hourly, by_project = after
+    assert hourly == [
+        (DAY_START, "", 2, 100, 50, 400.0, 0),
+        (DAY_START + HOUR, "", 1, 100, 50, 200.0, 0),
+        (DAY_START + 2 * HOUR, "", 1, 100, 50, 200.0, 0),
+    ]
+    assert by_project == [(DAY_START, "mobile", 1, 100, 50, 200.0, 0), (DAY_START, "web", 3, 200, 100, 600.0, 0)]
+    assert filtered == [(DAY_START, "", 1, 100, 50, 200.0, 0)]
+
+
+def test_existing_databases_are_migrated_for_cached_prompt_tokens(tmp_path):
+    path = str(tmp_path / "usage.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.execute(
+        "INSERT INTO usage_events (ts, endpoint, project_type, model, cache_outcome, prompt_tokens, "
+        "completion_tokens, latency_ms) VALUES (?, 'generate_architecture', 'web', 'm', 'miss', 100, 50, 200.0)",
+        (DAY_START,),
+    )
+    conn.commit()
+    conn.close()
+
+    store = UsageStore(path)
+    cached = event(DAY_START + 10)
+    cached.cached_prompt_tokens = 80
+    asyncio.run(store.record(cached))
+    rows = asyncio.run(store.query(bucket="hour", start=DAY_START, end=DAY_START + HOUR))
+    assert rows == [(DAY_START, "", 2, 200, 100, 400.0, 80)]
+
+
+class PausingConnection:
+    """Runs a callback just before the first usage_rollups write, to interleave two rollups."""
+
+    def __init__(self, conn, before_write):
+        self._conn = conn
+        self._before_write = before_write
+
+    def execute(self, query, *args):
+        if "INSERT INTO usage_rollups" in query and self._before_write:
+            before_write, self._before_write = self._before_write, None
+            before_write()
+        return self._conn.execute(query, *args)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc_info):
+        return self._conn.__exit__(*exc_info)
+
+
+def test_concurrent_rollups_from_two_workers_count_events_once(tmp_path):
+    path = str(tmp_path / "usage.db")
+    first, second = UsageStore(path), UsageStore(path)
+    asyncio.run(first.record(event(DAY_START + 10)))
+    now = DAY_START + HOUR + 30
+
+    other = threading.Thread(target=second._rollup, args=(now,))
+
+    def race():
+        # The second worker starts its rollup while the first is mid-transaction.
+        other.start()
+        other.join(timeout=0.5)
+
+    first._conn = PausingConnection(first._conn, race)
+    first._rollup(now)
+    other.join()
+
+    rows = asyncio.run(second.query(bucket="hour", start=DAY_START, end=DAY_START + HOUR))
+    assert rows == [(DAY_START, "", 1, 100, 50, 200.0, 0)]
+    assert second._execute("SELECT SUM(requests) FROM usage_rollups") == [(1,)]
+
+
+def test_a_second_worker_opening_an_old_database_does_not_migrate_again(tmp_path):
+    path = str(tmp_path / "usage.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.close()
+
+    stores = []
+    errors = []
+    barrier = threading.Barrier(4)
+
+    def open_store():
+        barrier.wait()
+        try:
+            stores.append(UsageStore(path))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=open_store) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert stores[0]._execute("PRAGMA user_version") == [(len(MIGRATIONS),)]